@@ -2,30 +2,7 @@ from openpyxl import load_workbook
 from openpyxl.styles import Font
 from openpyxl.styles import Border, Side
 from copy import copy
-import re
-def normalize_text(text):
-    if text is None:
-        return ""
-    # 全角转半角
-    text = text.translate(str.maketrans(
-        '　，。！？（）［］｛｝【】《》＂＇＾～｜＼',
-        ' ,.!?()[]{}【】《》"\'^~|\\'
-    ))
-    # 去掉所有空白字符（包括空格、制表符、换行等）
-    text = re.sub(r'\s+', '', text)
-    return text
-
-def find_b_column_header(ws, target_text):
-    result = None
-    target_text = normalize_text(target_text)
-    for row in ws.iter_rows(min_col=2, max_col=2):
-        cell = row[0]
-        if normalize_text(cell.value) == target_text:
-            result = ws.cell(row=cell.row, column=3).value
-            break
-    # 4. 输出结果
-    # print(f"找到 '{target_text}' 在B{cell.row}，对应C列值为: {result}")
-    return result
+from excel_tools import normalize_text, find_b_column_header
 
 if __name__ == "__main__":
 
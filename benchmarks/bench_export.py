@@ -0,0 +1,109 @@
+"""
+列式导出基准: 分析任务取每块板卡的成本时，读取导出数据与重新打开输出工作簿的耗时对比
+
+1. 用合成 ME 文件夹 (--boards) 运行一次报价，同时导出 csv 与 sqlite (export_formats)
+2. 查询 "每块板卡的未税/含税合计" 的耗时 (取 --repeat 次中的最小值):
+    workbook  openpyxl 只读打开输出文件，读取板卡行 X/Y 列的缓存值
+    csv       csv 模块读取 me_boards.csv
+    sqlite    SELECT board_no, total, total_tax FROM me_boards
+3. 检查三种方式得到的结果一致，不一致时以退出码 1 结束
+
+用法:
+    python benchmarks/bench_export.py --boards 500
+    python benchmarks/bench_export.py --boards 2000 --repeat 5
+"""
+import argparse
+import copy
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_manager import ConfigManager  # noqa: E402
+from quote_pipeline import run_me_quote  # noqa: E402
+
+
+def query_workbook(output_path, boards):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(output_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        return [(n - 2, x, y) for n, (x, y) in enumerate(
+            ws.iter_rows(min_row=3, max_row=boards + 2, min_col=24, max_col=25, values_only=True), start=3)]
+    finally:
+        wb.close()
+
+
+def query_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [(int(row['board_no']), float(row['total']), float(row['total_tax']))
+                for row in csv.DictReader(f)]
+
+
+def query_sqlite(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT board_no, total, total_tax FROM me_boards ORDER BY board_no").fetchall()
+    finally:
+        connection.close()
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="列式导出查询耗时对比")
+    parser.add_argument('--boards', type=int, default=500, help="合成 ME 文件夹的板卡数")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from synthetic import make_me_folder
+
+    work_dir = tempfile.mkdtemp(prefix='bench_export_')
+    try:
+        folder = make_me_folder(os.path.join(work_dir, 'ME'), args.boards)
+        config = copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+        config['paths'].update({
+            'format_path_tab2': os.path.join(ROOT, 'LogicData', 'FormatME.xlsx'),
+            'decorate_path_tab2': os.path.join(ROOT, 'LogicData', 'DecorateME.xlsx'),
+        })
+        config['options'].update({'cache_dir': os.path.join(work_dir, 'cache'), 'extract_cache': False,
+                                  'export_formats': ['csv', 'sqlite'], 'formula_values': 'cached'})
+        start = time.perf_counter()
+        output_path = run_me_quote(folder, config, output_dir=work_dir)
+        print(f"报价 + 导出: {time.perf_counter() - start:.2f}s ({args.boards} 块板卡)")
+
+        base = os.path.splitext(output_path)[0]
+        timings = {
+            'workbook': best_of(args.repeat, query_workbook, output_path, args.boards),
+            'csv': best_of(args.repeat, query_csv, f"{base}.me_boards.csv"),
+            'sqlite': best_of(args.repeat, query_sqlite, f"{base}.sqlite"),
+        }
+        for name, (seconds, _) in timings.items():
+            print(f"{name:8s}: {seconds * 1000:8.1f} ms")
+        expected = timings['workbook'][1]
+        mismatched = [name for name, (_, result) in timings.items() if result != expected]
+        if mismatched:
+            print(f"结果不一致: {', '.join(mismatched)}")
+            return 1
+        print("结果一致")
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+IE 源文件读取方式对比: xml (直接解析工作表 XML) 与 openpyxl (load_workbook 只读模式)
+
+1. 一致性: 对每个工作表比较两种读取方式逐行产出的值 (默认 A~D 列) 与 IE 提取结果，
+   有差异时打印并以退出码 1 结束
+2. 耗时: 两种方式各自完整提取全部工作表的时间 (取 --repeat 次中的最小值)
+
+默认使用 LogicData/IE.xlsx 与一个合成的大工作簿 (--sheets x --rows)。
+
+用法:
+    python benchmarks/bench_ie_reader.py
+    python benchmarks/bench_ie_reader.py sources/*.xlsx --columns A,B,C,D,E --repeat 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from excel_tools import extract_ie_rows  # noqa: E402
+from xlsx_reader import READERS, open_column_reader  # noqa: E402
+
+
+def read_all(path, reader_name, columns):
+    # {工作表名: [行值元组]}
+    reader = open_column_reader(path, reader_name)
+    try:
+        return {name: list(reader.iter_rows(name, columns)) for name in reader.sheetnames}
+    finally:
+        reader.close()
+
+
+def extract_all(path, reader_name):
+    reader = open_column_reader(path, reader_name)
+    try:
+        records = []
+        for name in reader.sheetnames:
+            rows = reader.iter_rows(name, ('B', 'C'))
+            records.append(extract_ie_rows(rows, name))
+            rows.close()
+        return records
+    finally:
+        reader.close()
+
+
+def check_parity(path, columns):
+    # 返回差异描述列表
+    problems = []
+    expected = read_all(path, 'openpyxl', columns)
+    actual = read_all(path, 'xml', columns)
+    if list(expected) != list(actual):
+        return [f"工作表列表不同: {list(expected)} != {list(actual)}"]
+    for name, rows in expected.items():
+        other = actual[name]
+        if len(rows) != len(other):
+            problems.append(f"[{name}] 行数不同: openpyxl {len(rows)}，xml {len(other)}")
+        for row_idx, (a, b) in enumerate(zip(rows, other), start=1):
+            if a != b or [type(v) for v in a] != [type(v) for v in b]:
+                problems.append(f"[{name}] 第{row_idx}行: openpyxl {a!r}，xml {b!r}")
+                break
+    if extract_all(path, 'openpyxl') != extract_all(path, 'xml'):
+        problems.append("IE 提取结果不同")
+    return problems
+
+
+def time_extract(path, reader_name, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_all(path, reader_name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IE 源文件读取方式一致性与耗时对比")
+    parser.add_argument('sources', nargs='*', help="源 xlsx 文件 (默认 LogicData/IE.xlsx 与合成工作簿)")
+    parser.add_argument('--columns', default='A,B,C,D', help="一致性比较的列，逗号分隔")
+    parser.add_argument('--sheets', type=int, default=200, help="合成工作簿的工作表数量")
+    parser.add_argument('--rows', type=int, default=300, help="合成工作簿每个工作表的行数")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    columns = tuple(args.columns.split(','))
+
+    work_dir = None
+    sources = args.sources
+    if not sources:
+        from synthetic import make_ie_workbook
+
+        work_dir = tempfile.mkdtemp(prefix='bench_ie_reader_')
+        sources = [os.path.join(ROOT, 'LogicData', 'IE.xlsx'),
+                   make_ie_workbook(os.path.join(work_dir, 'synthetic.xlsx'), args.sheets, args.rows)]
+    failed = False
+    try:
+        for path in sources:
+            problems = check_parity(path, columns)
+            status = "一致" if not problems else f"{len(problems)} 处差异"
+            timings = {name: time_extract(path, name, args.repeat) for name in READERS}
+            speedup = timings['openpyxl'] / timings['xml'] if timings['xml'] else float('inf')
+            print(f"{os.path.basename(path)}: {status}  " +
+                  "  ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()) +
+                  f"  加速 {speedup:.1f}x")
+            for problem in problems[:20]:
+                print(f"  {problem}")
+            failed = failed or bool(problems)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
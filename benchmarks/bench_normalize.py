@@ -0,0 +1,92 @@
+"""
+normalize_text 单元格级微基准: 旧实现 (每次调用重建转换表 + re.sub) 与预编译/LRU 缓存实现对比
+
+用法: python benchmarks/bench_normalize.py [源文件.xlsx] [--repeat N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from excel_tools import normalize_text, clear_normalize_cache  # noqa: E402
+
+DEFAULT_SOURCE = os.path.join(ROOT, 'LogicData', 'IE.xlsx')
+
+# 源文件不可用时使用的代表性单元格文本
+FALLBACK_CELLS = [
+    "Project name", "Component", "Panel Qty", "Labor Time(s/pcs)", "Machine Time(s/pcs)",
+    "Station", "Label&Load Carrier", "DEK", "SPI", "X4S (H1)", "IR", "AOI",
+    "Inspection after reflow", "Bottle neck", "B    Labor time(s/pcs)", "Machine time(s/pcs)",
+    "T     Labor time(s/pcs)", "Routing", "R    Labor time(s/pcs)", "贴Carrier", "手插件",
+    "D    Labor time(s/pcs)", "5D    Labor time(s/pcs)", "P    Labor time(s/pcs)",
+    "ICT", "SASM", "FCT", "AVI", "INSP", "PACK", "Labor time\n(s/panel)", None, 30, 25.8947368421053,
+]
+
+
+def legacy_normalize_text(text):
+    # 优化前的实现，仅作对比
+    if text is None:
+        return ""
+    text = str(text)
+    text = text.translate(str.maketrans(
+        '　，。！？（）［］｛｝【】《》＂＇＾～｜＼',
+        ' ,.!?()[]{}【】《》"\'^~|\\'
+    ))
+    text = re.sub(r'\s+', '', text)
+    return text
+
+
+def load_cells(source_path):
+    if not source_path or not os.path.exists(source_path):
+        return list(FALLBACK_CELLS)
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        return list(FALLBACK_CELLS)
+    wb = load_workbook(source_path, read_only=True, data_only=True)
+    cells = []
+    for ws in wb.worksheets:
+        for b_value, c_value in ws.iter_rows(min_col=2, max_col=3, values_only=True):
+            cells.append(b_value)
+            cells.append(c_value)
+    wb.close()
+    return cells
+
+
+def time_per_cell(func, cells, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value in cells:
+            func(value)
+    elapsed = time.perf_counter() - start
+    return elapsed / (len(cells) * repeat) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    cells = load_cells(args.source)
+    # 正确性校验: 新旧实现结果必须完全一致
+    for value in cells:
+        assert normalize_text(value) == legacy_normalize_text(value), value
+
+    legacy_ns = time_per_cell(legacy_normalize_text, cells, args.repeat)
+    clear_normalize_cache()
+    cold_ns = time_per_cell(normalize_text, cells, 1)
+    warm_ns = time_per_cell(normalize_text, cells, args.repeat)
+
+    print(f"单元格数: {len(cells)}  重复: {args.repeat}")
+    print(f"旧实现          : {legacy_ns:8.1f} ns/cell")
+    print(f"新实现 (冷缓存) : {cold_ns:8.1f} ns/cell")
+    print(f"新实现 (热缓存) : {warm_ns:8.1f} ns/cell  ({legacy_ns / warm_ns:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
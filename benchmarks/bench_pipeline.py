@@ -0,0 +1,302 @@
+"""
+报价流程吞吐基准: 用合成数据测量 IE (ExcelWorker) / ME (ExcelWorker2) 各阶段耗时随规模的变化与内存峰值
+
+阶段划分:
+    template  格式/样式模板加载 (含模板缓存)
+    extract   打开源文件并提取标签值/治具明细
+    style     逐行套用样式
+    write     写入单元格值与公式
+    evaluate  公式求值 (formula_values 为 cached/values 时)
+    save      保存输出文件 (含写入缓存值)
+    other     总耗时中其余部分 (插入行、合并单元格、日志等)
+
+每个规模在新的子进程中运行，内存峰值取子进程的最大常驻内存 (不支持时退回 tracemalloc 峰值)。
+默认关闭提取结果缓存，每次都完整解析输入；模板缓存目录为临时目录，首次运行包含模板编译。
+
+用法:
+    python benchmarks/bench_pipeline.py --ie-sheets 10,50,200 --ie-rows 80 --me-boards 10,50,200
+    python benchmarks/bench_pipeline.py --me-boards 100,400 --repeat 3 --json out.json
+    python benchmarks/bench_pipeline.py --no-qt   # 不经过 QThread 工作类，直接调用 quote_pipeline
+    python benchmarks/bench_pipeline.py --ie-sheets 2000 --me-boards 2000 --stream-output
+"""
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ('template', 'extract', 'style', 'write', 'evaluate', 'save', 'other')
+
+
+class StageTimer:
+    # 临时替换流程中用到的函数/方法，按阶段累计耗时；嵌套调用只计入最外层阶段
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self._patches = []
+        self._depth = 0
+
+    def _timed(self, func, stage):
+        timer = self
+
+        def wrapper(*args, **kwargs):
+            if timer._depth:
+                return func(*args, **kwargs)
+            timer._depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.totals[stage] += time.perf_counter() - start
+                timer._depth -= 1
+        return wrapper
+
+    def _timed_iter(self, func, stage):
+        # 生成器: 只统计每次取下一个元素的耗时 (解析发生在取值时)
+        timer = self
+
+        def wrapper(*args, **kwargs):
+            iterator = iter(func(*args, **kwargs))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    timer.totals[stage] += time.perf_counter() - start
+                yield item
+        return wrapper
+
+    def patch(self, owner, name, stage, iterator=False):
+        original = getattr(owner, name)
+        self._patches.append((owner, name, original))
+        setattr(owner, name, (self._timed_iter if iterator else self._timed)(original, stage))
+
+    def restore(self):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+
+
+def instrument():
+    import extract_cache
+    import formula_eval
+    import output_writer
+    import quote_pipeline
+    from excel_tools import RowStyle
+    from openpyxl.workbook.workbook import Workbook
+    from template_cache import TemplateCache
+
+    timer = StageTimer()
+    timer.patch(TemplateCache, 'load_format', 'template')
+    timer.patch(TemplateCache, 'load_decorate', 'template')
+    timer.patch(quote_pipeline, 'open_column_reader', 'extract')
+    timer.patch(quote_pipeline, 'extract_ie_rows', 'extract')
+    timer.patch(quote_pipeline, 'ie_sheet_keys', 'extract')
+    timer.patch(quote_pipeline, 'iter_me_records', 'extract', iterator=True)
+    timer.patch(extract_cache.ExtractCache, 'iter_me_records', 'extract', iterator=True)
+    timer.patch(RowStyle, 'apply', 'style')
+    timer.patch(output_writer, 'write_row', 'write')
+    # 流式输出时样式与值在同一步写出，整体计入 write
+    timer.patch(output_writer.StreamingOutput, 'write_row', 'write')
+    timer.patch(formula_eval, 'evaluate_ie', 'evaluate')
+    timer.patch(formula_eval, 'evaluate_me', 'evaluate')
+    timer.patch(formula_eval, 'apply_values', 'evaluate')
+    timer.patch(formula_eval, 'write_cached_values', 'save')
+    timer.patch(Workbook, 'save', 'save')
+    return timer
+
+
+def _peak_memory_mb(tracemalloc_peak):
+    # Linux 优先读 VmHWM: ru_maxrss 会继承 fork 时父进程 (生成合成数据后) 的峰值
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024, 'rss'
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return tracemalloc_peak / (1024 * 1024), 'tracemalloc'
+    # Linux 下 ru_maxrss 单位为 KB，macOS 下为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak / 1024 if sys.platform != 'darwin' else peak / (1024 * 1024)), 'rss'
+
+
+def run_child(kind, source, config_path, repeat, use_qt):
+    with open(config_path, encoding='utf-8') as f:
+        config = json.load(f)
+    # 没有 resource 模块 (Windows) 时改用 tracemalloc 统计 Python 对象的内存峰值
+    tracing = importlib.util.find_spec('resource') is None
+    if tracing:
+        import tracemalloc
+        tracemalloc.start()
+
+    if use_qt:
+        import main
+        worker_cls = main.ExcelWorker if kind == 'ie' else main.ExcelWorker2
+
+        def pipeline():
+            result = {}
+            worker = worker_cls(source, config)
+            worker.finished_signal.connect(lambda ok, msg: result.update(ok=ok, msg=msg))
+            worker.run()
+            if not result.get('ok'):
+                raise RuntimeError(result.get('msg'))
+    else:
+        from quote_pipeline import run_ie_quote, run_me_quote
+        run_quote = run_ie_quote if kind == 'ie' else run_me_quote
+
+        def pipeline():
+            run_quote(source, config)
+
+    runs = []
+    for _ in range(repeat):
+        timer = instrument()
+        start = time.perf_counter()
+        try:
+            pipeline()
+        finally:
+            total = time.perf_counter() - start
+            timer.restore()
+        stages = dict(timer.totals)
+        stages['other'] = max(0.0, total - sum(stages.values()))
+        stages['total'] = total
+        runs.append(stages)
+
+    tracemalloc_peak = 0
+    if tracing:
+        import tracemalloc
+        tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+    peak_mb, peak_source = _peak_memory_mb(tracemalloc_peak)
+    print(json.dumps({'runs': runs, 'peak_mb': peak_mb, 'peak_source': peak_source}))
+
+
+def run_size(args, kind, source, size, config_path):
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', kind, source, '--child-config', config_path,
+           '--repeat', str(args.repeat)]
+    if args.no_qt:
+        cmd.append('--no-qt')
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=args.timeout)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    # 多次运行时各阶段取中位数
+    median = {name: statistics.median(run[name] for run in result['runs']) for name in result['runs'][0]}
+    return {'kind': kind, 'size': size, 'median': median, 'runs': result['runs'],
+            'peak_mb': result['peak_mb'], 'peak_source': result['peak_source']}
+
+
+def _sizes(text):
+    return [int(value) for value in text.split(',') if value.strip()] if text else []
+
+
+def _slope(points):
+    # 最小二乘拟合 总耗时 = a + b*规模，返回每单位规模的耗时 b
+    if len(points) < 2:
+        return None
+    xs, ys = zip(*points)
+    mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if not denominator:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def print_report(results, unit_names):
+    for kind in ('ie', 'me'):
+        rows = [r for r in results if r['kind'] == kind]
+        if not rows:
+            continue
+        print(f"\n{kind.upper()} ({unit_names[kind]})")
+        header = f"{'规模':>8s}" + ''.join(f"{name:>10s}" for name in STAGES + ('total',))
+        print(header + f"{'峰值MB':>9s}{'单位/秒':>10s}")
+        for r in rows:
+            median = r['median']
+            line = f"{r['size']:8d}" + ''.join(f"{median[name]:10.3f}" for name in STAGES + ('total',))
+            print(line + f"{r['peak_mb']:9.1f}{r['size'] / median['total']:10.1f}")
+        slope = _slope([(r['size'], r['median']['total']) for r in rows])
+        if slope is not None:
+            print(f"拟合: 每个{unit_names[kind]}约 {slope * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="报价流程吞吐基准 (合成数据)")
+    parser.add_argument('--ie-sheets', default='10,50,200', help="IE 工作表数量列表，逗号分隔 (留空跳过)")
+    parser.add_argument('--ie-rows', type=int, default=80, help="每个 IE 工作表的行数")
+    parser.add_argument('--me-boards', default='10,50,200', help="ME 板卡文件数量列表，逗号分隔 (留空跳过)")
+    parser.add_argument('--repeat', type=int, default=1, help="每个规模在同一进程中运行的次数 (取中位数)")
+    parser.add_argument('--workers', type=int, default=1, help="ME 解析进程数 (0 表示全部 CPU 核心)")
+    parser.add_argument('--formula-values', default='cached', choices=('formula', 'cached', 'values'))
+    parser.add_argument('--extract-cache', action='store_true', help="启用提取结果缓存 (默认关闭)")
+    parser.add_argument('--stream-output', action='store_true', help="以只写模式逐行写出输出表")
+    parser.add_argument('--ie-reader', default='xml', choices=('xml', 'openpyxl'), help="IE 源文件读取方式")
+    parser.add_argument('--no-qt', action='store_true', help="直接调用 quote_pipeline，不经过 QThread 工作类")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=1800)
+    parser.add_argument('--json', help="把测量结果写入该 JSON 文件")
+    parser.add_argument('--child', nargs=2, metavar=('KIND', 'SOURCE'), help=argparse.SUPPRESS)
+    parser.add_argument('--child-config', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.child_config, args.repeat, not args.no_qt)
+        return 0
+
+    from config_manager import ConfigManager
+    from synthetic import make_ie_workbook, make_me_folder
+
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        config = json.loads(json.dumps(ConfigManager.DEFAULT_CONFIG))
+        config['paths'].update({
+            'format_path': os.path.join(ROOT, 'LogicData', 'FormatIE.xlsx'),
+            'decorate_path': os.path.join(ROOT, 'LogicData', 'DecorateIE.xlsx'),
+            'format_path_tab2': os.path.join(ROOT, 'LogicData', 'FormatME.xlsx'),
+            'decorate_path_tab2': os.path.join(ROOT, 'LogicData', 'DecorateME.xlsx'),
+        })
+        config['options'].update({
+            'cache_dir': os.path.join(work_dir, 'cache'),
+            'me_workers': args.workers,
+            'formula_values': args.formula_values,
+            'extract_cache': args.extract_cache,
+            'stream_output': args.stream_output,
+            'ie_reader': args.ie_reader,
+        })
+        config_path = os.path.join(work_dir, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+
+        results = []
+        for sheets in _sizes(args.ie_sheets):
+            source = make_ie_workbook(os.path.join(work_dir, f'IE_{sheets}.xlsx'), sheets, args.ie_rows, args.seed)
+            results.append(run_size(args, 'ie', source, sheets, config_path))
+            print(f"IE {sheets} 个工作表: {results[-1]['median']['total']:.3f}s", file=sys.stderr)
+        for boards in _sizes(args.me_boards):
+            folder = make_me_folder(os.path.join(work_dir, f'ME_{boards}', 'boards'), boards, args.seed)
+            results.append(run_size(args, 'me', folder, boards, config_path))
+            print(f"ME {boards} 个板卡: {results[-1]['median']['total']:.3f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(results, {'ie': '工作表', 'me': '板卡'})
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+启动时间基准: 记录界面程序从启动进程到首次绘制窗口 (time-to-first-paint)、
+以及到首次 IE 报价完成 (time-to-first-quote) 的耗时
+
+每次测量都在新的子进程中进行 (冷启动导入)，时间从父进程启动子进程时开始计算。
+每次测量使用单独的临时目录作为工作目录与 cache_dir，模板快照等缓存都是冷的，
+并且不记录提取缓存、断点与报价历史 (不写入仓库或开发者的 .quote_cache)。
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--max-paint 1.0] [--max-quote 5.0] [--json out.json]
+超出 --max-paint / --max-quote 预算时退出码为 1，可用于在 CI 中发现启动性能回退。
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAUNCH_ENV = 'AUTOQUOTE_BENCH_LAUNCH_TIME'
+MILESTONES = ('import_main', 'window_shown', 'first_paint', 'first_quote')
+
+
+def run_child(source, format_path, decorate_path, timeout, work_dir):
+    # 子进程: 按 main.py 的启动流程创建窗口，首次绘制后立即运行一次 IE 报价
+    launch_time = float(os.environ[LAUNCH_ENV])
+    timings = {}
+
+    def mark(name):
+        timings[name] = time.time() - launch_time
+
+    sys.path.insert(0, ROOT)
+    # 界面在工作目录读取/创建 settings.json
+    os.chdir(work_dir)
+    import main
+    mark('import_main')
+
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtGui import QFont
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    app.setFont(QFont("Microsoft YaHei", 9))
+    window = main.MainWindow()
+
+    config = json.loads(json.dumps(main.ConfigManager.DEFAULT_CONFIG))
+    config['paths']['format_path'] = format_path
+    config['paths']['decorate_path'] = decorate_path
+    config['options'].update({'cache_dir': os.path.join(work_dir, 'cache'), 'extract_cache': False,
+                              'quote_history': False, 'checkpoint_interval': 0})
+    workers = []
+
+    def start_quote():
+        worker = main.ExcelWorker(source, config)
+
+        def on_finished(success, message):
+            mark('first_quote')
+            timings['quote_ok'] = success
+            app.quit()
+
+        worker.finished_signal.connect(on_finished)
+        workers.append(worker)
+        worker.start()
+
+    class PaintProbe(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and 'first_paint' not in timings:
+                mark('first_paint')
+                QTimer.singleShot(0, start_quote)
+            return False
+
+    probe = PaintProbe()
+    window.installEventFilter(probe)
+    window.show()
+    mark('window_shown')
+    QTimer.singleShot(0, main.warm_up_pipeline)
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec_()
+    for worker in workers:
+        worker.wait()
+    print(json.dumps(timings))
+
+
+def run_once(args, source, work_dir):
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env[LAUNCH_ENV] = repr(time.time())
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', source,
+           '--format', args.format, '--decorate', args.decorate, '--timeout', str(args.timeout),
+           '--work-dir', work_dir]
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=args.timeout + 30)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动时间基准")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--source', default=os.path.join(ROOT, 'LogicData', 'IE.xlsx'))
+    parser.add_argument('--format', default=os.path.join(ROOT, 'LogicData', 'FormatIE.xlsx'))
+    parser.add_argument('--decorate', default=os.path.join(ROOT, 'LogicData', 'DecorateIE.xlsx'))
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--max-paint', type=float, help="首次绘制耗时预算 (秒)")
+    parser.add_argument('--max-quote', type=float, help="首次报价耗时预算 (秒)")
+    parser.add_argument('--json', help="把每次测量结果写入该 JSON 文件")
+    parser.add_argument('--child', metavar='SOURCE', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.format, args.decorate, args.timeout, args.work_dir)
+        return 0
+
+    # 输出文件写在源文件旁边，复制到临时目录避免污染仓库
+    work_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        source = os.path.join(work_dir, os.path.basename(args.source))
+        shutil.copy(args.source, source)
+        results = []
+        for i in range(args.runs):
+            run_dir = os.path.join(work_dir, f'run{i + 1}')
+            os.makedirs(run_dir)
+            results.append(run_once(args, source, run_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"运行次数: {args.runs}")
+    medians = {}
+    for name in MILESTONES:
+        values = [r[name] for r in results if name in r]
+        if values:
+            medians[name] = statistics.median(values)
+            print(f"{name:14s}: 中位数 {medians[name]:.3f}s  最小 {min(values):.3f}s  最大 {max(values):.3f}s")
+    if not all(r.get('quote_ok') for r in results):
+        print("警告: 有报价运行失败")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': results, 'median': medians}, f, indent=2)
+
+    over_budget = False
+    for name, budget in (('first_paint', args.max_paint), ('first_quote', args.max_quote)):
+        if budget is not None and medians.get(name, float('inf')) > budget:
+            print(f"超出预算: {name} {medians.get(name, float('inf')):.3f}s > {budget:.3f}s")
+            over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
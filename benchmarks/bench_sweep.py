@@ -0,0 +1,95 @@
+"""
+IE 参数扫描基准: 全部方案一次性按数组计算 (quote_sweep.sweep_ie) 与逐个方案调用 formula_eval.ie_columns 的对比
+
+1. 一致性: 每个方案的 P/S/T/X/Y/Z 合计与逐个方案计算的结果完全相同，否则以退出码 1 结束
+2. 耗时: 两种方式各自的耗时 (取 --repeat 次中的最小值)
+
+默认使用合成工作簿 (--sheets) 的提取结果与 --handling/--upusdl/--upusoh 组成的网格。
+
+用法:
+    python benchmarks/bench_sweep.py
+    python benchmarks/bench_sweep.py --sheets 2000 --upusdl 30:40:0.1 --upusoh 150:180:1
+"""
+import argparse
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import formula_eval  # noqa: E402
+from config_manager import ConfigManager  # noqa: E402
+from quote_pipeline import iter_ie_records  # noqa: E402
+from quote_sweep import parse_values, scenario_grid, sweep_ie  # noqa: E402
+
+TOTALS = (('P', 'dl_cost'), ('S', 'oh_cost'), ('T', 'dl_oh_cost'), ('X', 'ohlh'), ('Y', 'sga'), ('Z', 'mva'))
+
+
+def sweep_loop(records, scenarios):
+    # 逐个方案计算: [{合计列名: 值}]
+    inputs = formula_eval.ie_record_inputs(records)
+    results = []
+    for scenario in scenarios:
+        columns = formula_eval.ie_columns(inputs, *scenario)
+        results.append({name: float(np.cumsum(columns[column])[-1]) for column, name in TOTALS})
+    return results
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IE 参数扫描耗时对比")
+    parser.add_argument('source', nargs='?', help="源 xlsx 文件 (默认合成工作簿)")
+    parser.add_argument('--sheets', type=int, default=200, help="合成工作簿的工作表数量")
+    parser.add_argument('--handling', default='50:70:5')
+    parser.add_argument('--upusdl', default='30:40:0.5')
+    parser.add_argument('--upusoh', default='150:180:5')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_sweep_')
+    try:
+        source = args.source
+        if not source:
+            from synthetic import make_ie_workbook
+
+            source = make_ie_workbook(os.path.join(work_dir, 'synthetic.xlsx'), args.sheets, 80)
+        config = copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+        config['options'].update({'cache_dir': None, 'extract_cache': False})
+        start = time.perf_counter()
+        records = list(iter_ie_records(source, config))
+        print(f"提取: {len(records)} 个工作表，{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        scenarios = scenario_grid(parse_values(args.handling), parse_values(args.upusdl),
+                                  parse_values(args.upusoh))
+        baseline = (60.0, 34.3, 162.8)
+        vector_time, (rows, _) = best_of(args.repeat, sweep_ie, records, scenarios, baseline)
+        loop_time, expected = best_of(args.repeat, sweep_loop, records, scenarios)
+        mismatched = sum(1 for row, totals in zip(rows, expected)
+                         if any(row[name] != value for name, value in totals.items()))
+        print(f"{len(scenarios)} 个方案: 数组计算 {vector_time * 1000:.1f} ms，"
+              f"逐个计算 {loop_time * 1000:.1f} ms，加速 {loop_time / vector_time:.1f}x")
+        if mismatched:
+            print(f"{mismatched} 个方案结果不一致")
+            return 1
+        print("结果一致")
+        return 0
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
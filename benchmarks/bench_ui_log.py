@@ -0,0 +1,123 @@
+"""
+界面日志刷新基准: 工作线程大量输出日志/进度时，测量界面事件循环的响应延迟
+
+对比两种投递方式:
+    feed    UiFeed 缓冲 + 定时器按 options.ui_refresh_ms 整批刷新到 QPlainTextEdit (当前实现)
+    signal  每条日志/进度各发一个跨线程信号，逐条追加到 QTextEdit (旧实现)
+
+探测定时器每 --probe-ms 毫秒触发一次，记录实际触发时间比预期晚了多少。
+
+用法:
+    python benchmarks/bench_ui_log.py --lines 20000
+    python benchmarks/bench_ui_log.py --lines 50000 --mode feed --json out.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run_mode(mode, lines, probe_ms):
+    from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+    from PyQt5.QtWidgets import QApplication, QTextEdit
+
+    import main
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = main.MainWindow()
+    window.show()
+    probe = main.LatencyProbe(probe_ms)
+    probe_timer = QTimer()
+    probe_timer.setInterval(probe_ms)
+    probe_timer.timeout.connect(probe.tick)
+    done = threading.Event()
+    appended = [0]
+
+    if mode == 'feed':
+        feed = main.UiFeed()
+        log, progress = feed.log, feed.progress
+        window.watch_feed(feed, window.log_area, window.progress_bar)
+        view = window.log_area
+    else:
+        class Emitter(QObject):
+            log_signal = pyqtSignal(str)
+            progress_signal = pyqtSignal(int)
+
+        view = QTextEdit()
+        view.setReadOnly(True)
+        emitter = Emitter()
+
+        def append(msg):
+            appended[0] += 1
+            view.append(time.strftime("[%H:%M:%S] ") + msg)
+            view.verticalScrollBar().setValue(view.verticalScrollBar().maximum())
+
+        emitter.log_signal.connect(append)
+        emitter.progress_signal.connect(window.progress_bar.setValue)
+        log, progress = emitter.log_signal.emit, emitter.progress_signal.emit
+
+    def produce():
+        for index in range(lines):
+            log(f"处理工作表 [{index + 1}/{lines}]: Sheet{index + 1}")
+            progress((index + 1) * 100 // lines)
+        done.set()
+
+    def check_done():
+        # signal 模式要等队列中的信号全部追加完，时间包含界面逐条追加日志的耗时
+        if done.is_set() and (mode == 'feed' or appended[0] == lines):
+            if mode == 'feed':
+                window.unwatch_feed(feed)
+            app.quit()
+
+    done_timer = QTimer()
+    done_timer.setInterval(probe_ms)
+    done_timer.timeout.connect(check_done)
+
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce, daemon=True)
+    probe_timer.start()
+    done_timer.start()
+    producer.start()
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    probe_timer.stop()
+    done_timer.stop()
+    lags = sorted(probe.lags) or [0.0]
+    result = {
+        'mode': mode, 'lines': lines, 'elapsed': elapsed, 'samples': len(probe.lags),
+        'lag_mean_ms': sum(lags) / len(lags) * 1000,
+        'lag_p95_ms': lags[min(len(lags) - 1, int(len(lags) * 0.95))] * 1000,
+        'lag_max_ms': lags[-1] * 1000,
+        'blocks': view.document().blockCount(),
+    }
+    window.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="界面日志刷新基准")
+    parser.add_argument('--lines', type=int, default=20000, help="工作线程输出的日志条数")
+    parser.add_argument('--mode', choices=('feed', 'signal', 'both'), default='both')
+    parser.add_argument('--probe-ms', type=int, default=10, help="延迟探测定时器间隔 (毫秒)")
+    parser.add_argument('--json', help="把测量结果写入该 JSON 文件")
+    args = parser.parse_args(argv)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    modes = ('feed', 'signal') if args.mode == 'both' else (args.mode,)
+    results = [run_mode(mode, args.lines, args.probe_ms) for mode in modes]
+    for r in results:
+        print(f"{r['mode']:6s}: 总耗时 {r['elapsed']:.2f}s  延迟 平均 {r['lag_mean_ms']:.1f} ms  "
+              f"P95 {r['lag_p95_ms']:.1f} ms  最大 {r['lag_max_ms']:.1f} ms  日志行数 {r['blocks']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
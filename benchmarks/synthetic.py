@@ -0,0 +1,182 @@
+"""
+合成测试数据生成器: IE 源工作簿与 ME 板卡文件夹
+
+- IE: N 个工作表 x M 行，真实标签 (B列) 随机分布在填充行之间，数值在C列；
+  "Panel Qty" 在C列表头，数值在下一行
+- ME: K 个 .xls 板卡文件，结构与 LogicData/ME 一致 (第2-4行钢网/载具，第5-12行治具明细)
+  .xls 由本文件内置的最小 BIFF8 写入器生成，不依赖 xlwt
+
+用法:
+    python benchmarks/synthetic.py ie out/IE_200.xlsx --sheets 200 --rows 300
+    python benchmarks/synthetic.py me out/ME_500 --boards 500
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from excel_tools import IE_LABELS  # noqa: E402
+
+FILLER_LABELS = ('Label&Load Carrier', 'DEK', 'SPI', 'X4S (H1)', 'IR', 'AOI', 'Inspection after reflow',
+                 'Bottle neck', 'Station', 'Routing', 'Touch Up', 'Clean', '总检', 'FCT', 'Machine time(s/pcs)')
+ME_PART_NAMES = ('Routing', '板弯量测', '压合治具', '侧插治具', 'B面组装治具', 'T面组装治具', 'rework Carrier',
+                 'W/S carrier ')
+
+
+# ==========================================
+# IE 源工作簿
+# ==========================================
+def make_ie_workbook(path, sheets, rows, seed=0):
+    # 只写模式生成，内存占用与工作表数量无关
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    for index in range(sheets):
+        ws = wb.create_sheet(str(index + 1))
+        ws.append([None, 'Work Time Calculation'])
+        ws.append([None, 'Project name', f"P{index + 1}.{rng.randint(1, 9)}"])
+        ws.append([None, 'Component', 'Panel Qty', 'Panel Size'])
+        ws.append([None, None, rng.choice((1, 2, 4, 6, 8)), round(rng.uniform(0.1, 0.5), 2)])
+        # 标签行插在随机位置，其余为填充行
+        body = [None] * max(rows, len(IE_LABELS))
+        labels = [label for label in IE_LABELS if label != 'Project name']
+        for label, position in zip(labels, rng.sample(range(len(body)), len(labels))):
+            body[position] = label
+        for label in body:
+            if label is None:
+                ws.append([None, rng.choice(FILLER_LABELS), rng.choice((None, rng.randint(0, 120))),
+                           rng.choice((None, round(rng.uniform(0, 60), 4)))])
+            else:
+                ws.append([None, label, round(rng.uniform(0, 240), 4)])
+    wb.save(path)
+    return path
+
+
+# ==========================================
+# ME 板卡文件 (.xls, BIFF8)
+# ==========================================
+_ENDOFCHAIN = 0xFFFFFFFE
+_FATSECT = 0xFFFFFFFD
+_FREESECT = 0xFFFFFFFF
+_NOSTREAM = 0xFFFFFFFF
+_SECTOR = 512
+_MINI_CUTOFF = 4096
+
+
+def _record(record_id, data=b''):
+    return struct.pack('<HH', record_id, len(data)) + data
+
+
+def _bof(sheet_type):
+    return _record(0x0809, struct.pack('<HHHHII', 0x0600, sheet_type, 0x0DBB, 0x07CC, 0, 6))
+
+
+def _biff_sheet(cells):
+    # cells: {(行, 列): 值}，值为 str 或数值
+    max_row = max(r for r, _ in cells) + 1
+    max_col = max(c for _, c in cells) + 1
+    parts = [_bof(0x0010), _record(0x0200, struct.pack('<IIHHH', 0, max_row, 0, max_col, 0))]
+    for (row, col), value in sorted(cells.items()):
+        if isinstance(value, str):
+            text = value.encode('utf-16-le')
+            parts.append(_record(0x0204, struct.pack('<HHHHB', row, col, 0, len(value), 1) + text))
+        else:
+            parts.append(_record(0x0203, struct.pack('<HHHd', row, col, 0, float(value))))
+    parts.append(_record(0x000A))
+    return b''.join(parts)
+
+
+def _biff_workbook(cells, sheet_name='Sheet1'):
+    name = sheet_name.encode('utf-16-le')
+    boundsheet_size = 4 + 8 + len(name)
+    globals_size = 20 + boundsheet_size + 4
+    sheet_offset = globals_size
+    boundsheet = _record(0x0085, struct.pack('<IBBBB', sheet_offset, 0, 0, len(sheet_name), 1) + name)
+    stream = _bof(0x0005) + boundsheet + _record(0x000A) + _biff_sheet(cells)
+    # 小于 4096 字节的流会存入 mini stream，补齐后只需写普通扇区
+    return stream.ljust(_MINI_CUTOFF, b'\0')
+
+
+def _compound_file(stream, stream_name='Workbook'):
+    # 最小的 OLE2 复合文档: 扇区0 为 FAT，扇区1 为目录，之后为数据流
+    stream_sectors = (len(stream) + _SECTOR - 1) // _SECTOR
+    if stream_sectors + 2 > _SECTOR // 4:
+        raise ValueError("合成板卡文件过大")
+    fat = [_FATSECT, _ENDOFCHAIN] + [2 + i + 1 for i in range(stream_sectors - 1)] + [_ENDOFCHAIN]
+    fat += [_FREESECT] * (_SECTOR // 4 - len(fat))
+
+    header = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1' + b'\0' * 16
+    header += struct.pack('<HHHHH6sIIIIIIIII', 0x003E, 0x0003, 0xFFFE, 9, 6, b'\0' * 6,
+                          0, 1, 1, 0, _MINI_CUTOFF, _ENDOFCHAIN, 0, _ENDOFCHAIN, 0)
+    header += struct.pack('<I', 0) + struct.pack('<I', _FREESECT) * 108
+
+    def entry(name, entry_type, child, start, size):
+        encoded = (name + '\0').encode('utf-16-le') if name else b''
+        return struct.pack('<64sHBBIII16sIQQIQ', encoded, len(encoded), entry_type, 1,
+                           _NOSTREAM, _NOSTREAM, child, b'\0' * 16, 0, 0, 0, start, size)
+
+    directory = entry('Root Entry', 5, 1, _ENDOFCHAIN, 0) + entry(stream_name, 2, _NOSTREAM, 2, len(stream))
+    directory += entry('', 0, _NOSTREAM, 0, 0) * 2
+    data = stream.ljust(stream_sectors * _SECTOR, b'\0')
+    return header + struct.pack(f'<{len(fat)}I', *fat) + directory + data
+
+
+def make_me_board(path, rng):
+    cells = {(0, 0): 'Item', (0, 2): 'Cost (unit:RMB/EA)', (0, 3): '数量',
+             (1, 0): 'SMT', (1, 1): 'Stencil (Top  side)', (2, 1): 'Stencil (bottom side)',
+             (3, 1): 'SMT carrier', (4, 0): 'ASM'}
+    cells[(1, 2)] = rng.choice((500, 750, 900))
+    cells[(2, 2)] = rng.choice((0, 500, 750))
+    cells[(3, 2)] = rng.choice((400, 450, 500, 600))
+    # 第5-12行: 治具明细 (第12行为尾部物料)，数量为 0 的行不计入报价
+    total = 0
+    for row, part_name in enumerate(ME_PART_NAMES, start=4):
+        amount = rng.choice((0, 600, 800, 1200, 1400, 1600))
+        qty = rng.choice((0, 1, 1, 2))
+        cells[(row, 1)] = part_name
+        cells[(row, 2)] = amount
+        cells[(row, 3)] = qty
+        cells[(row, 4)] = amount * qty
+        total += amount * qty
+    cells[(12, 4)] = total
+    with open(path, 'wb') as f:
+        f.write(_compound_file(_biff_workbook(cells)))
+
+
+def make_me_folder(folder, boards, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    for index in range(boards):
+        name = f"{index + 1}.SYN{rng.randint(1000, 9999)}A_Board{index + 1}_V{rng.randint(1, 3)}_PCBA.xls"
+        make_me_board(os.path.join(folder, name), rng)
+    return folder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成 IE/ME 测试数据")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ie_parser = subparsers.add_parser('ie', help="IE 源工作簿")
+    ie_parser.add_argument('path')
+    ie_parser.add_argument('--sheets', type=int, default=50)
+    ie_parser.add_argument('--rows', type=int, default=80)
+    ie_parser.add_argument('--seed', type=int, default=0)
+    me_parser = subparsers.add_parser('me', help="ME 板卡文件夹")
+    me_parser.add_argument('path')
+    me_parser.add_argument('--boards', type=int, default=50)
+    me_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'ie':
+        os.makedirs(os.path.dirname(os.path.abspath(args.path)), exist_ok=True)
+        print(make_ie_workbook(args.path, args.sheets, args.rows, args.seed))
+    else:
+        print(make_me_folder(args.path, args.boards, args.seed))
+
+
+if __name__ == "__main__":
+    main()
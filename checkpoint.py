@@ -0,0 +1,143 @@
+"""
+报价运行的取消与断点续跑 (不依赖 PyQt5)
+
+- CancelToken: 界面/调用方调用 cancel()，报价流程在处理每个工作表/文件之前检查，
+  已取消时抛出 Cancelled
+- Checkpoint: 定期把已提取的记录与处理位置写入 cache_dir/checkpoints 下的文件；
+  运行失败或取消时也会写入。再次对同一源运行时，源文件未改动的部分直接取用断点中的记录，
+  从中断的位置继续提取。运行成功后删除断点文件。
+
+断点只保存提取结果；输出表由全部记录重新写出 (写入远比解析源文件快)，
+所以报价参数在两次运行之间改动也不影响续跑。
+"""
+import hashlib
+import os
+import pickle
+import threading
+
+from config_manager import resolve_cache_dir
+
+# 记录结构或断点格式变更时递增，旧断点作废
+CHECKPOINT_VERSION = 1
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled("任务已取消")
+
+
+class NullCheckpoint:
+    enabled = False
+
+    def resume(self, item_keys=None):
+        return []
+
+    def add(self, item_key, record):
+        pass
+
+    def save(self):
+        pass
+
+    def discard(self):
+        pass
+
+
+NULL_CHECKPOINT = NullCheckpoint()
+
+
+def source_fingerprint(path):
+    # 文件大小与修改时间: 不读取内容，改动后断点即失效
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class Checkpoint:
+    enabled = True
+
+    def __init__(self, path, source_key, interval):
+        self.path = path
+        self.source_key = source_key
+        self.interval = interval
+        # [(条目键, 记录)]，按处理顺序
+        self.entries = []
+        self._unsaved = 0
+
+    def resume(self, item_keys=None):
+        """
+        读取已有断点，返回可直接取用的记录列表 (按处理顺序的前缀)
+        item_keys: 当前各条目的键 (如 ME 各文件的名称与指纹)，只取用与断点一致的前缀；
+        为 None 时只要整体的 source_key 一致即全部取用
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return []
+        if data.get('version') != CHECKPOINT_VERSION or data.get('source_key') != self.source_key:
+            return []
+        entries = data.get('entries', [])
+        if item_keys is not None:
+            count = 0
+            for (key, _), current in zip(entries, item_keys):
+                if key != current:
+                    break
+                count += 1
+            entries = entries[:count]
+        self.entries = list(entries)
+        return [record for _, record in self.entries]
+
+    def add(self, item_key, record):
+        self.entries.append((item_key, record))
+        self._unsaved += 1
+        if self._unsaved >= self.interval:
+            self.save()
+
+    def save(self):
+        if not self._unsaved:
+            return
+        # 先写临时文件再替换，中途被终止也不会留下损坏的断点
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': CHECKPOINT_VERSION, 'source_key': self.source_key,
+                         'entries': self.entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+    def discard(self):
+        self.entries = []
+        self._unsaved = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def open_checkpoint(config, kind, source_path, source_key=None):
+    """
+    kind: 'ie' / 'me'；每个 (kind, 源路径) 一个断点文件
+    options.checkpoint_interval 为 0 或未设置 cache_dir 时不记录断点
+    """
+    options = config.get('options', {})
+    interval = int(options.get('checkpoint_interval', 50))
+    cache_dir = resolve_cache_dir(options.get('cache_dir'))
+    if interval <= 0 or not cache_dir:
+        return NULL_CHECKPOINT
+    digest = hashlib.sha1(f"{kind}:{os.path.abspath(source_path)}".encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, 'checkpoints', f"{kind}_{digest}.pkl")
+    return Checkpoint(path, source_key, interval)
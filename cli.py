@@ -0,0 +1,448 @@
+"""
+命令行批量报价 (不依赖 PyQt5，可在无显示器的服务器/计划任务中运行)
+
+用法示例:
+    python cli.py ie LogicData/IE.xlsx other/IE2.xlsx --upusdl 32
+    python cli.py me LogicData/ME --qty 27 --workers 4
+    python cli.py ie a.xlsx b.xlsx --config settings.json --output-dir out
+    python cli.py ie sources/*.xlsx --jobs 4 --merge
+    python cli.py watch --ie drop/IE --me drop/ME
+    python cli.py sweep LogicData/IE.xlsx --upusdl 30:36:1 --upusoh 150:180:10 --csv sweep.csv
+    python cli.py serve --port 8765 --workers 2
+    python cli.py history --project "2U*" --since 2026-07-01 --until 2026-09-30
+
+未在命令行指定的模板路径与参数取自配置文件 (默认 settings.json)。
+配置文件不存在或格式错误时以退出码 2 结束 (未指定 --config 且没有 settings.json 时使用默认配置，不创建该文件)。
+每个成功生成的输出文件路径打印到标准输出，日志打印到标准错误。
+
+ie 指定多个源文件时在进程池中并行处理 (--jobs)，--merge 合并为一个输出文件。
+watch 持续监视投递文件夹 (也可在配置文件 watch 段中设置)，按 Ctrl+C 结束。
+--export csv,sqlite 在输出文件旁同时写出列式数据 (每个源工作表/板卡一行)，分析时无需再打开输出工作簿。
+sweep 只提取一次源文件，按 Handling/U/P-DL/U/P-OH 的取值组合计算成本并输出对比表 (不生成工作簿)。
+serve 在本机回环地址上提供 HTTP/JSON 报价服务 (见 quote_service.py，也可在配置文件 service 段中设置)。
+history 从报价历史库 (cache_dir/quote_history.sqlite) 查询以往的参数与结果，不打开 Excel 文件。
+处理中失败或按 Ctrl+C 中断时会写入断点，再次运行同一输入时从断点继续 (--checkpoint-interval)。
+
+退出码: 0 全部成功；1 至少一个输入处理失败；2 参数或配置错误；130 被中断
+"""
+import argparse
+import copy
+import csv
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from datetime import datetime
+
+from config_manager import ConfigManager, resolve_cache_dir
+from quote_export import parse_formats
+from quote_history import SUMMARY_COLUMNS, QuoteHistory, format_value, history_path, parse_date
+from quote_pipeline import run_ie_batch, run_ie_quote, run_ie_sweep, run_me_quote
+from quote_sweep import DETAIL_COLUMNS, SWEEP_COLUMNS, format_table, iter_detail_rows, parse_values, \
+    scenario_grid, write_csv
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+# 子命令 -> (流程函数, 格式模板配置键, 样式模板配置键)
+PIPELINES = {
+    'ie': (run_ie_quote, 'format_path', 'decorate_path'),
+    'me': (run_me_quote, 'format_path_tab2', 'decorate_path_tab2'),
+}
+
+# 命令行参数名 -> 配置 params 中的键
+PARAM_ARGS = {
+    'handling': 'Handling',
+    'upusdl': 'UPUSDL',
+    'upusoh': 'UPUSOH',
+    'stencil_qty': 'StencilQty',
+    'smt_qty': 'SMTCarrierQty',
+    'qty': 'Qty',
+}
+
+# watch 子命令中覆盖配置 watch 段的参数
+WATCH_ARGS = ('ie_folders', 'me_folders', 'debounce', 'poll_interval', 'backend')
+
+# serve 子命令中覆盖配置 service 段的参数
+SERVICE_ARGS = ('host', 'port', 'service_workers', 'max_queue', 'timeout', 'max_upload_mb')
+
+
+def export_formats(value):
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    # 各子命令共用的选项
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', help="配置文件路径 (默认 settings.json)")
+    common.add_argument('--output-dir', help="输出目录 (默认与输入文件/文件夹同级)")
+    common.add_argument('-q', '--quiet', action='store_true', help="不输出处理日志")
+    # ie / me 子命令的模板选项
+    templates = argparse.ArgumentParser(add_help=False)
+    templates.add_argument('--format', dest='format_path', help="格式模板路径")
+    templates.add_argument('--decorate', dest='decorate_path', help="样式模板路径")
+    common.add_argument('--no-cache', action='store_true', help="不使用提取结果缓存，重新解析全部输入")
+    common.add_argument('--formula-values', choices=('formula', 'cached', 'values'),
+                        help="公式结果: formula 只写公式 (默认)；cached 附带缓存值；"
+                             "values 只写数值 (引用待填单元格的公式除外)")
+    common.add_argument('--stream-output', action='store_true', help="以只写模式逐行写出输出表，适合超大报价")
+    common.add_argument('--trace', action='store_true', help="记录各阶段耗时，并在输出文件旁写入 .trace.json")
+    common.add_argument('--export', type=export_formats, metavar='FORMATS',
+                        help="同时导出提取结果与成本，逗号分隔: csv,parquet,sqlite")
+    common.add_argument('--checkpoint-interval', type=int, metavar='N',
+                        help="每提取 N 个工作表/文件写一次断点 (0 表示不记录断点)")
+
+    parser = argparse.ArgumentParser(description="自动报价系统 - 命令行批量处理")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ie_parser = subparsers.add_parser('ie', parents=[common, templates], help="IE 报价: 处理一个或多个源 xlsx 文件")
+    ie_parser.add_argument('sources', nargs='+', metavar='SOURCE', help="源 xlsx 文件")
+    ie_parser.add_argument('--handling', type=float, help="Handling")
+    ie_parser.add_argument('--upusdl', type=float, help="U/P(US$)-DL(hr)")
+    ie_parser.add_argument('--upusoh', type=float, help="U/P(US$)-OH(hr)")
+    ie_parser.add_argument('--jobs', type=int, help="并行处理的源文件数 (0 表示全部 CPU 核心)")
+    ie_parser.add_argument('--merge', action='store_true', help="合并为一个输出文件，每个源文件一个工作表")
+    ie_parser.add_argument('--reader', choices=('xml', 'openpyxl'), help="源文件读取方式 (默认取配置 ie_reader，初始为 openpyxl)")
+    ie_parser.add_argument('--quantity-curve', type=sweep_values, metavar='QUANTITIES',
+                           help="增加 Quantity Curve 工作表: 各板卡在这些月需求量下的单价，如 100,500,1000,5000")
+
+    me_parser = subparsers.add_parser('me', parents=[common, templates], help="ME 报价: 处理一个或多个 .xls 文件夹")
+    me_parser.add_argument('sources', nargs='+', metavar='FOLDER', help="包含各板卡 .xls 的文件夹")
+    me_parser.add_argument('--stencil-qty', type=float, help="StencilQty")
+    me_parser.add_argument('--smt-qty', type=float, help="SMTCarrierQty")
+    me_parser.add_argument('--qty', type=float, help="Qty")
+    me_parser.add_argument('--workers', type=int, help="解析进程数 (0 表示全部 CPU 核心)")
+
+    watch_parser = subparsers.add_parser('watch', parents=[common], help="监视投递文件夹，新文件放入后自动报价")
+    watch_parser.add_argument('--ie', dest='ie_folders', nargs='+', metavar='FOLDER', help="IE 源文件投递文件夹")
+    watch_parser.add_argument('--me', dest='me_folders', nargs='+', metavar='FOLDER', help="ME 板卡文件投递文件夹")
+    watch_parser.add_argument('--debounce', type=float, help="最后一次文件变动后等待的秒数")
+    watch_parser.add_argument('--poll-interval', type=float, help="扫描目录的间隔秒数 (无 inotify 时)")
+    watch_parser.add_argument('--backend', choices=('auto', 'inotify', 'polling'), help="文件事件来源")
+
+    sweep_parser = subparsers.add_parser('sweep', parents=[common],
+                                         help="IE 参数扫描: 提取一次，计算多组 Handling/U/P-DL/U/P-OH 的成本")
+    sweep_parser.add_argument('source', metavar='SOURCE', help="源 xlsx 文件")
+    for name, label in (('handling', "Handling"), ('upusdl', "U/P(US$)-DL(hr)"), ('upusoh', "U/P(US$)-OH(hr)")):
+        sweep_parser.add_argument(f'--{name}', dest=f'sweep_{name}', type=sweep_values, metavar='VALUES',
+                                  help=f"{label} 的取值: 34.3 / 32,34.3,36 / 30:40:2 (默认取配置中的值)")
+    sweep_parser.add_argument('--reader', choices=('xml', 'openpyxl'), help="源文件读取方式 (默认取配置 ie_reader，初始为 openpyxl)")
+    sweep_parser.add_argument('--sort', choices=SWEEP_COLUMNS, help="对比表按该列升序排列")
+    sweep_parser.add_argument('--top', type=int, help="只显示前 N 个方案 (CSV 仍包含全部方案)")
+    sweep_parser.add_argument('--csv', help="把对比表写入该 CSV 文件")
+    sweep_parser.add_argument('--detail', help="把每个方案 x 每个工作表的明细写入该 CSV 文件")
+
+    serve_parser = subparsers.add_parser('serve', parents=[common], help="本机 HTTP/JSON 报价服务")
+    serve_parser.add_argument('--host', help="监听地址 (只能是回环地址，默认 127.0.0.1)")
+    serve_parser.add_argument('--port', type=int, help="监听端口 (默认 8765)")
+    serve_parser.add_argument('--workers', dest='service_workers', type=int, help="同时执行的报价任务数")
+    serve_parser.add_argument('--max-queue', type=int, help="最多排队的请求数，超出时返回 503")
+    serve_parser.add_argument('--timeout', type=float, help="单个报价任务的时限 (秒)")
+    serve_parser.add_argument('--max-upload-mb', type=float, help="上传文件的大小上限 (MB)")
+
+    history_parser = subparsers.add_parser('history', help="查询报价历史 (按项目/板卡名称与日期)")
+    history_parser.add_argument('--config', help="配置文件路径 (默认 settings.json)")
+    names = history_parser.add_mutually_exclusive_group()
+    names.add_argument('--project', help="IE: Project name，可用 * / ? 通配符")
+    names.add_argument('--board', help="ME: 板卡名称，可用 * / ? 通配符")
+    history_parser.add_argument('--me', action='store_true', help="查询 ME 报价 (指定 --board 时默认)")
+    history_parser.add_argument('--since', type=history_date, help="起始日期 YYYY-MM-DD")
+    history_parser.add_argument('--until', type=history_date, help="截止日期 YYYY-MM-DD (含当天)")
+    history_parser.add_argument('--limit', type=int, default=200, help="最多显示的行数 (0 表示不限)")
+    history_parser.add_argument('--all-columns', action='store_true', help="输出全部列 (默认只输出主要列)")
+    history_parser.add_argument('--csv', action='store_true', help="以 CSV 格式输出")
+    return parser
+
+
+def sweep_values(value):
+    try:
+        return parse_values(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def history_date(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+def load_config(path):
+    """
+    命令行读取配置: 指定的配置文件必须存在且能解析，否则抛出 ValueError (退出码 2)
+    未指定时使用 settings.json，该文件不存在则使用默认配置；命令行不写入配置文件
+    指定配置文件时，其中相对的 cache_dir 按配置文件所在目录解析 (否则按程序所在目录)
+    """
+    explicit = path is not None
+    if not explicit:
+        path = ConfigManager.CONFIG_FILE
+        if not os.path.exists(path):
+            return copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+    try:
+        config = ConfigManager.read_config(path)
+    except OSError as e:
+        raise ValueError(f"无法读取配置文件 {path}: {e.strerror or e}")
+    except ValueError as e:
+        raise ValueError(f"配置文件格式错误 {path}: {e}")
+    if explicit:
+        options = config['options']
+        options['cache_dir'] = resolve_cache_dir(options.get('cache_dir'), os.path.dirname(os.path.abspath(path)))
+    return config
+
+
+def build_config(args):
+    config = load_config(args.config)
+    if args.command in PIPELINES:
+        _, format_key, decorate_key = PIPELINES[args.command]
+        if args.format_path:
+            config['paths'][format_key] = args.format_path
+        if args.decorate_path:
+            config['paths'][decorate_key] = args.decorate_path
+    for arg_name, param_key in PARAM_ARGS.items():
+        value = getattr(args, arg_name, None)
+        if value is not None:
+            config['params'][param_key] = value
+    if getattr(args, 'workers', None) is not None:
+        config['options']['me_workers'] = args.workers
+    if getattr(args, 'jobs', None) is not None:
+        config['options']['ie_workers'] = args.jobs
+    if getattr(args, 'merge', None):
+        config['options']['ie_merge_output'] = True
+    if getattr(args, 'quantity_curve', None):
+        config['options']['quantity_curve'] = args.quantity_curve
+    if getattr(args, 'reader', None):
+        config['options']['ie_reader'] = args.reader
+    for option in WATCH_ARGS:
+        value = getattr(args, option, None)
+        if value is not None:
+            config['watch'][option] = value
+    for option in SERVICE_ARGS:
+        value = getattr(args, option, None)
+        if value is not None:
+            config['service'][option.replace('service_', '')] = value
+    if args.no_cache:
+        config['options']['extract_cache'] = False
+    if args.formula_values:
+        config['options']['formula_values'] = args.formula_values
+    if args.stream_output:
+        config['options']['stream_output'] = True
+    if args.trace:
+        config['options']['trace'] = True
+    if args.export:
+        config['options']['export_formats'] = args.export
+    if args.checkpoint_interval is not None:
+        config['options']['checkpoint_interval'] = args.checkpoint_interval
+    return config
+
+
+def run_watch(config, args, log):
+    from watcher import FolderWatcher
+
+    watch = config['watch']
+    if not watch['ie_folders'] and not watch['me_folders']:
+        print("错误: 未指定监视文件夹 (--ie / --me 或配置文件 watch 段)", file=sys.stderr)
+        return EXIT_USAGE
+    keys = (['format_path', 'decorate_path'] if watch['ie_folders'] else []) + \
+        (['format_path_tab2', 'decorate_path_tab2'] if watch['me_folders'] else [])
+    for key in keys:
+        if not os.path.exists(config['paths'][key]):
+            print(f"错误: 找不到模板文件 {config['paths'][key]} ({key})", file=sys.stderr)
+            return EXIT_USAGE
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        watcher = FolderWatcher(
+            config, ie_folders=watch['ie_folders'], me_folders=watch['me_folders'],
+            debounce=float(watch['debounce']), poll_interval=float(watch['poll_interval']),
+            backend=watch['backend'], log=log, on_output=lambda path: print(path, flush=True),
+            output_dir=args.output_dir,
+        )
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        log("已停止监视")
+    return EXIT_FAILED if watcher.failed else EXIT_OK
+
+
+def run_history(args):
+    # 只读历史库，结果打印到标准输出
+    try:
+        path = history_path(load_config(args.config))
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if path is None or not os.path.exists(path):
+        print("错误: 没有报价历史 (未设置 cache_dir、已关闭 quote_history 或尚未报价)", file=sys.stderr)
+        return EXIT_USAGE
+    kind = 'me' if args.me or args.board else 'ie'
+    with QuoteHistory(path) as history:
+        rows = history.find(kind, args.project or args.board, args.since, args.until, args.limit)
+    columns = list(rows[0].keys()) if rows and args.all_columns else SUMMARY_COLUMNS[kind]
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows([row[column] for column in columns] for row in rows)
+    else:
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join(format_value(row[column]) for column in columns))
+    print(f"共 {len(rows)} 行", file=sys.stderr)
+    return EXIT_OK
+
+
+def run_serve(config, args, log):
+    from quote_service import QuoteService
+
+    service = config['service']
+    try:
+        server = QuoteService(config, host=service['host'], port=int(service['port']),
+                              workers=int(service['workers']), max_queue=int(service['max_queue']),
+                              timeout=float(service['timeout']), max_upload_mb=float(service['max_upload_mb']),
+                              log=log)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        server.run()
+    except OSError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    return EXIT_OK
+
+
+def run_sweep(config, args, log):
+    # 对比表打印到标准输出
+    if not os.path.exists(args.source):
+        print(f"错误: 找不到输入 {args.source}", file=sys.stderr)
+        return EXIT_USAGE
+    handling, upusdl, upusoh = (float(config['params'][key]) for key in ('Handling', 'UPUSDL', 'UPUSOH'))
+    try:
+        scenarios = scenario_grid(args.sweep_handling or [handling], args.sweep_upusdl or [upusdl],
+                                  args.sweep_upusoh or [upusoh])
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    start = time.perf_counter()
+    try:
+        records, rows, sheet_columns = run_ie_sweep(args.source, config, scenarios, log=log)
+    except KeyboardInterrupt:
+        print("已中断", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"处理失败: {args.source}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    log(f"{len(records)} 个工作表 x {len(scenarios)} 个方案，耗时 {time.perf_counter() - start:.2f}s "
+        f"(对照: Handling {handling:g}, U/P-DL {upusdl:g}, U/P-OH {upusoh:g})")
+
+    if args.csv:
+        write_csv(args.csv, SWEEP_COLUMNS, rows)
+    if args.detail:
+        write_csv(args.detail, DETAIL_COLUMNS, iter_detail_rows(records, sheet_columns))
+    shown = sorted(rows, key=lambda row: row[args.sort]) if args.sort else rows
+    print(format_table(shown[:args.top] if args.top else shown))
+    return EXIT_OK
+
+
+def run_ie_sources(config, args, log):
+    # 多个 IE 源文件: 并行处理，可合并为一个输出文件
+    sources = []
+    failed = []
+    for source in args.sources:
+        if os.path.exists(source):
+            sources.append(source)
+        else:
+            failed.append(source)
+            print(f"处理失败: {source}: 找不到输入", file=sys.stderr)
+    outputs = []
+    if sources:
+        try:
+            results = run_ie_batch(sources, config, log=log, output_dir=args.output_dir,
+                                   merge=config['options'].get('ie_merge_output', False))
+        except KeyboardInterrupt:
+            print("已中断 (再次运行同一输入时从断点继续)", file=sys.stderr)
+            return EXIT_INTERRUPTED
+        for result in results:
+            if result.error is not None:
+                failed.append(result.source_path)
+                print(f"处理失败: {result.source_path}: {result.error}", file=sys.stderr)
+            elif result.output_path not in outputs:
+                outputs.append(result.output_path)
+    for output_path in outputs:
+        print(output_path, flush=True)
+
+    log(f"完成: 成功 {len(args.sources) - len(failed)} 个，失败 {len(failed)} 个")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    def log(msg):
+        if not args.quiet:
+            timestamp = datetime.now().strftime("[%H:%M:%S] ")
+            print(timestamp + msg, file=sys.stderr, flush=True)
+
+    if args.command == 'history':
+        return run_history(args)
+    try:
+        config = build_config(args)
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.command == 'watch':
+        return run_watch(config, args, log)
+    if args.command == 'sweep':
+        return run_sweep(config, args, log)
+    if args.command == 'serve':
+        return run_serve(config, args, log)
+    pipeline, format_key, decorate_key = PIPELINES[args.command]
+
+    # 模板缺失属于配置错误，所有输入都会失败，提前退出
+    for key in (format_key, decorate_key):
+        if not os.path.exists(config['paths'][key]):
+            print(f"错误: 找不到模板文件 {config['paths'][key]} ({key})", file=sys.stderr)
+            return EXIT_USAGE
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.command == 'ie' and (len(args.sources) > 1 or config['options'].get('ie_merge_output')):
+        return run_ie_sources(config, args, log)
+
+    failed = []
+    try:
+        for idx, source in enumerate(args.sources, start=1):
+            log(f"[{idx}/{len(args.sources)}] 开始处理: {source}")
+            try:
+                if not os.path.exists(source):
+                    raise FileNotFoundError(f"找不到输入: {source}")
+                output_path = pipeline(source, config, log=log, output_dir=args.output_dir)
+            except Exception as e:
+                failed.append(source)
+                print(f"处理失败: {source}: {e}", file=sys.stderr)
+                if not args.quiet:
+                    traceback.print_exc()
+                continue
+            print(output_path, flush=True)
+    except KeyboardInterrupt:
+        print("已中断 (再次运行同一输入时从断点继续)", file=sys.stderr)
+        return EXIT_INTERRUPTED
+
+    log(f"完成: 成功 {len(args.sources) - len(failed)} 个，失败 {len(failed)} 个")
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+配置管理 (settings.json)，不依赖 PyQt5
+"""
+import json
+import os
+import sys
+
+# 程序所在目录 (打包后为可执行文件所在目录)；相对的 cache_dir 按此解析，不随启动时的工作目录变化
+if getattr(sys, 'frozen', False):
+    APP_DIR = os.path.dirname(os.path.abspath(sys.executable))
+else:
+    APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def resolve_cache_dir(cache_dir, base_dir=APP_DIR):
+    # 留空返回 None (只在内存中缓存)；相对路径按 base_dir 解析为绝对路径
+    if not cache_dir:
+        return None
+    return os.path.normpath(os.path.join(base_dir, os.path.expanduser(cache_dir)))
+
+
+class ConfigManager:
+    DEFAULT_CONFIG = {
+        "paths": {
+            "format_path": "LogicData/Format.xlsx",
+            "decorate_path": "LogicData/Decorate.xlsx",
+            "format_path_tab2": "LogicData/Format2.xlsx",
+            "decorate_path_tab2": "LogicData/Decorate2.xlsx"
+        },
+        "params": {
+            "Handling": 60,
+            "UPUSDL": 34.3,
+            "UPUSOH": 162.8,
+            "StencilQty": 2,
+            "SMTCarrierQty": 90,
+            "Qty": 1
+        },
+        "options": {
+            # ie_reader 为 openpyxl 时以只读流式方式打开 IE 源文件 (xml 读取方式总是流式的)
+            "ie_streaming": True,
+            # IE 源文件读取方式: openpyxl 经 load_workbook 读取 (默认)；xml 直接解析工作表 XML，只转换 B/C 两列 (更快)
+            "ie_reader": "openpyxl",
+            # IE 批量报价时并行处理的源文件数: 0 表示使用全部 CPU 核心，1 表示逐个串行处理
+            "ie_workers": 0,
+            # IE 批量报价合并为一个输出文件 (每个源文件一个工作表)，否则每个源文件单独输出
+            "ie_merge_output": False,
+            # ME 文件夹解析的进程数: 0 表示使用全部 CPU 核心，1 表示在当前线程中串行解析
+            "me_workers": 0,
+            # 模板快照等缓存文件所在目录 (相对路径按程序所在目录解析)，留空则只在内存中缓存
+            "cache_dir": ".quote_cache",
+            # 按内容哈希缓存 IE 工作表 / ME 文件的提取结果，重新报价时只解析改动过的输入
+            "extract_cache": True,
+            # 每提取这么多个工作表/文件写一次断点 (失败或取消时也会写入)，
+            # 再次运行同一源时从断点继续；0 表示不记录断点 (断点保存在 cache_dir 下)
+            "checkpoint_interval": 50,
+            # 公式结果: formula 只写公式 (默认)；cached 同时写入计算结果作为缓存值；
+            # values 只写数值，但引用待填单元格 (IE 的 F/L/V 列、ME 的 R/U/V 列) 的公式仍保留，填写后照常重算
+            "formula_values": "formula",
+            # 同时把提取结果与计算出的成本导出到输出文件旁，供分析查询: csv / parquet (需 pyarrow) / sqlite
+            "export_formats": [],
+            # 每次报价后把参数与各工作表/板卡的结果记入 cache_dir 下的历史库，可按项目/板卡/日期查询
+            "quote_history": True,
+            # IE 输出中增加 Quantity Curve 工作表: 各板卡在这些月需求量下的单价 (MVA)，留空则不输出
+            "quantity_curve": [],
+            # 记录各阶段/各工作表耗时，在日志中汇总并在输出文件旁写入 .trace.json
+            "trace": False,
+            # 输出表改用只写模式逐行写出，内存不随行数增长 (适合数千行以上的报价)
+            "stream_output": False,
+            # 界面按固定间隔 (毫秒) 整批刷新日志与进度，工作线程不再逐条发信号
+            "ui_refresh_ms": 100,
+            # 日志窗口最多保留的行数，超出后丢弃最早的行
+            "log_max_lines": 5000,
+            # 运行期间测量界面事件循环的响应延迟，结束时写入日志
+            "ui_latency_probe": False
+        },
+        # IE 成本公式中按月需求量 F (Monthly FCST) 分档的系数表，输出表公式由此生成 (见 quantity_tiers.py)
+        # 每档 {"below": 上限, "value": 值} 表示 F < 上限，{"upto": 上限, "value": 值} 表示 F <= 上限，
+        # 按顺序取第一个满足的档，最后一档只写 value (其余情况)
+        "quantity_tiers": {
+            # P/S 列 (DL/OH 成本) 的系数
+            "cost_factor": [{"below": 1000, "value": 1.05}, {"value": 1.02}],
+            # W 列 (Loss) = V 列 (BOM) x 比例
+            "loss_rate": [{"below": 1000, "value": 0.004}, {"value": 0.002}],
+            # X 列 (OHLH) = P 列 x 系数
+            "ohlh_factor": [{"below": 500, "value": 1.2}, {"below": 1000, "value": 1},
+                            {"upto": 5000, "value": 0.8}, {"value": 0.6}],
+            # Y 列 (SG&A) = P 列 x 系数
+            "sga_factor": [{"below": 500, "value": 1.5}, {"below": 1000, "value": 1.2},
+                           {"upto": 5000, "value": 0.9}, {"value": 0.6}]
+        },
+        "watch": {
+            # 投递文件夹: IE 放源 xlsx，ME 放板卡 .xls (可按项目建下一级子文件夹)
+            "ie_folders": [],
+            "me_folders": [],
+            # 一批文件最后一次变动后等待的秒数
+            "debounce": 2.0,
+            # 无 inotify 时扫描目录的间隔秒数
+            "poll_interval": 2.0,
+            # auto / inotify / polling
+            "backend": "auto"
+        },
+        "service": {
+            # 本机报价服务 (cli.py serve)，只能监听回环地址
+            "host": "127.0.0.1",
+            "port": 8765,
+            # 同时执行的报价任务数，以及最多排队的请求数 (超出时返回 503)
+            "workers": 2,
+            "max_queue": 8,
+            # 单个报价任务的时限 (秒)，超时后取消并返回 504
+            "timeout": 600,
+            # 上传文件 (IE 源 xlsx / ME zip) 的大小上限 (MB)
+            "max_upload_mb": 100
+        }
+    }
+    CONFIG_FILE = "settings.json"
+
+    @staticmethod
+    def load_config(config_file=None):
+        # 界面使用: 配置文件不存在时写入默认配置，无法读取时使用默认配置
+        config_file = config_file or ConfigManager.CONFIG_FILE
+        if not os.path.exists(config_file):
+            ConfigManager.save_config(ConfigManager.DEFAULT_CONFIG, config_file)
+            return ConfigManager.DEFAULT_CONFIG
+        try:
+            return ConfigManager.read_config(config_file)
+        except (OSError, ValueError):
+            return ConfigManager.DEFAULT_CONFIG
+
+    @staticmethod
+    def read_config(config_file):
+        """
+        读取配置文件，缺少的项使用默认值
+        文件无法打开时抛出 OSError，不是有效的 JSON 配置时抛出 ValueError
+        """
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("配置文件的内容应为 JSON 对象")
+
+        # 确保所有必需的参数都存在，如果缺少则使用默认值
+        for section, defaults in ConfigManager.DEFAULT_CONFIG.items():
+            if section not in config:
+                config[section] = defaults.copy()
+            elif not isinstance(config[section], dict):
+                raise ValueError(f"配置项 {section} 应为 JSON 对象")
+            else:
+                for key, value in defaults.items():
+                    if key not in config[section]:
+                        config[section][key] = value
+
+        return config
+
+    @staticmethod
+    def save_config(config_data, config_file=None):
+        with open(config_file or ConfigManager.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(config_data, f, indent=4, ensure_ascii=False)
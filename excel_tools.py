@@ -0,0 +1,371 @@
+"""
+报价核心工具函数 (main.py / Quotation.py 共用，不依赖 PyQt5)
+"""
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from functools import lru_cache
+
+
+# 全角转半角的转换表与空白字符正则只构建一次
+_FULLWIDTH_TABLE = str.maketrans(
+    '　，。！？（）［］｛｝【】《》＂＇＾～｜＼',
+    ' ,.!?()[]{}【】《》"\'^~|\\'
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 规范化结果缓存上限 (LRU 淘汰)，标签与单元格文本重复度很高
+NORMALIZE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_str(text):
+    # 全角转半角，再去掉所有空白字符
+    return _WHITESPACE_RE.sub('', text.translate(_FULLWIDTH_TABLE))
+
+
+def normalize_text(text):
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        # 先转成字符串再缓存，避免 1 / 1.0 / True 在缓存中互相命中
+        text = str(text)
+    return _normalize_str(text)
+
+
+def clear_normalize_cache():
+    _normalize_str.cache_clear()
+
+
+def find_b_column_header(ws, target_text):
+    result = None
+    target_text = normalize_text(target_text)
+    for row in ws.iter_rows(min_col=2, max_col=2):
+        try:
+            cell = row[0]
+            if normalize_text(cell.value) == target_text:
+                result = ws.cell(row=cell.row, column=3).value
+                break
+        except:
+            continue
+    return result
+
+
+def find_b_column_header_xlrd(ws, target_text):
+    result = None
+    target_text = normalize_text(target_text)
+
+    for row_idx in range(ws.nrows):
+        try:
+            cell_value = ws.cell_value(row_idx, 1)
+
+            if normalize_text(str(cell_value)) == target_text:
+                result = ws.cell_value(row_idx, 2)
+                break
+        except:
+            continue
+
+    return result
+
+
+PANEL_QTY_LABEL = "Panel Qty"
+
+# IE 报价从每个源工作表读取的 B 列标签
+IE_LABELS = (
+    "B    Labor time(s/pcs)",
+    "T     Labor time(s/pcs)",
+    "金 Labor time(s/pcs)",
+    "D    Labor time(s/pcs)",
+    "R    Labor time(s/pcs)",
+    "5D    Labor time(s/pcs)",
+    "P    Labor time(s/pcs)",
+    "SASM",
+    "AVI",
+    "INSP",
+    "PACK",
+    "ICT",
+    "Machine Time(s/pcs)",
+    "Project name",
+)
+
+
+class SheetLabelIndex:
+    # 单次遍历 B/C 两列建立 {规范化B列标签: C列值} 索引，代替逐个标签全列扫描
+    # 同一标签出现多次时保留第一次出现的值 (与 find_b_column_header 的首个匹配一致)
+    def __init__(self, labels, panel_qty=None):
+        self.labels = labels
+        self.panel_qty = panel_qty
+
+    @classmethod
+    def from_rows(cls, rows, required=None):
+        # rows: 可迭代的 (B列值, C列值) 二元组，按行顺序
+        # required: 需要的标签；给出时在这些标签和 Panel Qty 都找到后提前结束遍历
+        labels = {}
+        panel_target = normalize_text(PANEL_QTY_LABEL)
+        panel_qty = None
+        panel_found = False
+        panel_pending = False
+        remaining = {normalize_text(t) for t in required} if required else None
+        for b_value, c_value in rows:
+            if panel_pending:
+                # "Panel Qty" 在C列，取其下一行C列的值
+                panel_qty = c_value
+                panel_pending = False
+            key = normalize_text(b_value)
+            if key not in labels:
+                labels[key] = c_value
+                if remaining:
+                    remaining.discard(key)
+            if not panel_found and isinstance(c_value, str) and normalize_text(c_value) == panel_target:
+                panel_found = True
+                panel_pending = True
+            if remaining is not None and not remaining and panel_found and not panel_pending:
+                break
+        return cls(labels, panel_qty)
+
+    @classmethod
+    def from_openpyxl(cls, ws, required=None):
+        return cls.from_rows(ws.iter_rows(min_col=2, max_col=3, values_only=True), required)
+
+    @classmethod
+    def from_xlrd(cls, ws):
+        if ws.ncols < 2:
+            return cls({})
+        b_values = ws.col_values(1)
+        c_values = ws.col_values(2) if ws.ncols > 2 else [''] * len(b_values)
+        return cls.from_rows(zip(b_values, c_values))
+
+    def get(self, target_text):
+        return self.labels.get(normalize_text(target_text))
+
+
+# IE 单个工作表的提取结果: 工时按输出表 G/H/I/J 列的口径预先合计 (写入时再 /0.8)
+IeSheetRecord = namedtuple('IeSheetRecord', [
+    'sheet_name', 'project_name', 'panel_qty', 'smt_time', 'asm_time', 'routing_time', 'packing_time',
+    'ict', 'machine_time'
+])
+
+
+def extract_ie_sheet(ws, sheet_name):
+    # 解析单个 IE 源工作表 (openpyxl 工作表对象)
+    return extract_ie_rows(ws.iter_rows(min_col=2, max_col=3, values_only=True), sheet_name)
+
+
+def extract_ie_rows(rows, sheet_name):
+    # rows: 按行顺序的 (B列值, C列值)；单次遍历建立标签索引，所需标签找齐后提前结束
+    index = SheetLabelIndex.from_rows(rows, required=IE_LABELS)
+    B_labor = index.get("B    Labor time(s/pcs)") or 0
+    T_labor = index.get("T     Labor time(s/pcs)") or 0
+    G_labor = index.get("金 Labor time(s/pcs)") or 0
+    D_labor = index.get("D    Labor time(s/pcs)") or 0
+    R_labor = index.get("R    Labor time(s/pcs)") or 0
+    FiveD_labor = index.get("5D    Labor time(s/pcs)") or 0
+    P_labor = index.get("P    Labor time(s/pcs)") or 0
+    SASM = index.get("SASM") or 0
+    AVI = index.get("AVI") or 0
+    INSP = index.get("INSP") or 0
+    PACK = index.get("PACK") or 0
+    return IeSheetRecord(
+        sheet_name=sheet_name,
+        project_name=index.get("Project name") or "",
+        # "Panel Qty" 在C列，取其下一行C列的值
+        panel_qty=index.panel_qty,
+        smt_time=B_labor + T_labor + G_labor,
+        asm_time=D_labor,
+        routing_time=R_labor + FiveD_labor + P_labor,
+        packing_time=SASM + AVI + INSP + PACK,
+        ict=index.get("ICT") or 0,
+        machine_time=index.get("Machine Time(s/pcs)") or 0,
+    )
+
+
+def find_name_by_amount_xlrd(ws, target_row):
+    if target_row < ws.nrows:
+        try:
+            cell_value = ws.cell_value(target_row, 3)
+            if cell_value != 0:
+                result = ws.cell_value(target_row, 1)
+                amount = ws.cell_value(target_row, 2)
+                return result, amount, cell_value
+            else:
+                return None, 0, 0  # 明确返回
+        except Exception as e:
+            print(f"读取第{target_row}行时出错: {e}")
+            return None, 0, 0
+    else:
+        return None, 0, 0
+
+    return None, 0, 0
+
+
+def natural_sort_key(file_name):
+    # 按文件名中的数字自然排序 (2.xxx 排在 10.xxx 之前)
+    return [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', file_name)]
+
+
+def parse_board_name(file_name):
+    # "10.SH7569ACA_Switch_Board_V2_PCBA.xls" -> "SH7569ACA*Switch*Board*V2*PCBA"
+    name_without_ext = file_name.rsplit('.', 1)[0]
+    match = re.search(r'\d+\.(.+)', name_without_ext)
+    if match:
+        return match.group(1).replace('_', '*')
+    return ""
+
+
+# ME 板卡文件的提取结果 (可 pickle，供进程池回传)
+# tail_part: 第11行 (name, amount, qty)；parts: 第4~10行中数量非0的 (name, amount, qty)
+MeBoardRecord = namedtuple('MeBoardRecord', [
+    'file_name', 'board_name', 'stencil_top', 'stencil_bottom', 'smt_carrier', 'tail_part', 'parts'
+])
+
+ME_TAIL_ROW = 11
+ME_PART_ROWS = range(4, 11)
+
+
+def _me_part(values):
+    # values: 某行 B~D 列 (名称, 金额, 数量)；数量为 0 或该行不存在时返回 (None, 0, 0)
+    # 与 find_name_by_amount_xlrd 的结果相同
+    if len(values) < 3 or values[2] == 0:
+        return None, 0, 0
+    return tuple(values)
+
+
+def extract_me_board(file_path):
+    # 解析单个 ME .xls 文件，只返回报价需要的数据
+    import xlrd
+
+    # on_demand: 只解析第一个工作表；不读取格式信息；文件内容经 mmap 读取，不整体复制到内存
+    wb_source = xlrd.open_workbook(file_path, on_demand=True, formatting_info=False, use_mmap=True)
+    try:
+        ws = wb_source.sheet_by_index(0)
+        index = SheetLabelIndex.from_xlrd(ws)
+        # 治具明细只在固定的几行: 每行一次取出 B~D 列
+        rows = {i: ws.row_values(i, 1, 4) if i < ws.nrows else [] for i in (*ME_PART_ROWS, ME_TAIL_ROW)}
+    finally:
+        wb_source.release_resources()
+    parts = [part for part in (_me_part(rows[i]) for i in ME_PART_ROWS) if part[0] is not None]
+    file_name = os.path.basename(file_path)
+    return MeBoardRecord(
+        file_name=file_name,
+        board_name=parse_board_name(file_name),
+        stencil_top=index.get("Stencil (Top  side)") or 0,
+        stencil_bottom=index.get("Stencil (bottom side)") or 0,
+        smt_carrier=index.get("SMT carrier") or 0,
+        tail_part=_me_part(rows[ME_TAIL_ROW]),
+        parts=parts,
+    )
+
+
+def iter_me_records(file_paths, workers=1):
+    # 按输入顺序逐个产出 ME 提取结果；workers > 1 时在进程池中并行解析
+    # workers <= 0 表示使用全部 CPU 核心
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(file_paths))
+    if workers <= 1:
+        for file_path in file_paths:
+            yield extract_me_board(file_path)
+        return
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield from executor.map(extract_me_board, file_paths, chunksize=chunksize)
+    finally:
+        # 取消或提前关闭时撤销排队中的文件，不等待正在解析的文件 (它们在后台结束)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MeLayout:
+    # ME 输出表的行布局，在写入前一次性算出所有行号:
+    #   第 first_row 行起依次为各板卡行，随后是合计行；
+    #   模板中原第 first_row 行及以下的内容 (Notes、Item 表头) 整体下移 shift 行；
+    #   其后依次为各板卡的治具明细行、每块板一行的 AVI Carrier，最后是明细合计行
+    def __init__(self, part_counts, first_row=3, parts_template_row=11):
+        board_count = len(part_counts)
+        self.first_row = first_row
+        self.shift = board_count + 1
+        self.board_rows = range(first_row, first_row + board_count)
+        self.totals_row = first_row + board_count
+        self.parts_start = parts_template_row + self.shift
+        self.part_rows = []
+        row = self.parts_start
+        for count in part_counts:
+            self.part_rows.append(range(row, row + count))
+            row += count
+        self.parts_end = row
+        self.carrier_rows = range(row, row + board_count)
+        self.sum_row = row + board_count
+
+
+def _column_letter(index):
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+# 列字母 -> 列号 (A..ZZ)，写入时查表，不再逐个解析 'G12' 这样的坐标字符串
+COLUMN_INDEX = {_column_letter(i): i for i in range(1, 703)}
+
+
+def write_row(ws, row, values):
+    # 按 {列字母: 值} 批量写入一行
+    for letter, value in values.items():
+        ws.cell(row=row, column=COLUMN_INDEX[letter]).value = value
+
+
+class RowStyle:
+    # 样式模板中一整行的格式 (字体/填充/边框/对齐/数字格式)
+    # 首次套用时在目标工作簿中登记一次样式ID，之后每行只写入这几个ID，不再逐格哈希去重
+    def __init__(self, styles):
+        # styles: 每列一个 (font, fill, border, alignment, number_format)
+        self.styles = styles
+        self._workbook = None
+        self._arrays = None
+
+    @classmethod
+    def from_row(cls, template_row):
+        return cls([
+            (copy(cell.font), copy(cell.fill), copy(cell.border), copy(cell.alignment), cell.number_format)
+            for cell in template_row
+        ])
+
+    def _register(self, ws):
+        from openpyxl.cell import Cell
+
+        arrays = []
+        for font, fill, border, alignment, number_format in self.styles:
+            # 借助不挂在表上的临时单元格，按 openpyxl 的规则登记样式并取回ID
+            cell = Cell(ws)
+            cell.font = font
+            cell.fill = fill
+            cell.border = border
+            cell.alignment = alignment
+            cell.number_format = number_format
+            arrays.append(cell._style)
+        self._workbook = ws.parent
+        self._arrays = arrays
+
+    def arrays(self, ws):
+        # 在 ws 所属工作簿中登记后的每列样式ID (StyleArray)
+        if self._workbook is not ws.parent:
+            self._register(ws)
+        return self._arrays
+
+    def apply(self, ws, row):
+        for column, ids in enumerate(self.arrays(ws), 1):
+            cell = ws.cell(row=row, column=column)
+            if not cell.has_style:
+                # 未设置过样式的单元格 (新建的单元格没有 StyleArray) 直接复制整组ID
+                cell._style = copy(ids)
+                continue
+            # 已有样式时只替换这几个ID，保护、引用前缀等其它设置不变
+            style = cell._style
+            style.fontId = ids.fontId
+            style.fillId = ids.fillId
+            style.borderId = ids.borderId
+            style.alignmentId = ids.alignmentId
+            style.numFmtId = ids.numFmtId
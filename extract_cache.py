@@ -0,0 +1,174 @@
+"""
+源数据提取结果缓存
+
+重新报价时 (只改了 Handling/UPUSDL，或文件夹里只换了一两个板卡文件) 不必重新解析所有输入。
+这里按内容哈希缓存提取结果:
+- ME: 键为 .xls 文件内容的 SHA-1，值为 MeBoardRecord (文件名/板卡名取自当前文件名，不参与缓存)
+- IE: 键为 (工作表名, 该工作表 XML 与共享字符串/样式等工作簿级部件的 SHA-1)，值为 IeSheetRecord，
+  同一个源文件里只改了一个工作表时，其余工作表仍然命中
+结果保存在 cache_dir 下的单个文件中，提取逻辑变更 (EXTRACT_VERSION) 后自动失效。
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from config_manager import resolve_cache_dir
+from excel_tools import iter_me_records, parse_board_name
+from xlsx_reader import sheet_parts
+
+# 提取逻辑或记录结构变更时递增，旧缓存整体作废
+EXTRACT_VERSION = 1
+# 缓存条目上限，超出时淘汰最久未使用的条目
+MAX_ENTRIES = 20000
+STORE_NAME = "extract_records.pkl"
+# 命中时最近使用时间只在超过这么多秒后才更新: 全部命中的重新报价不必重写整个缓存文件
+ACCESS_REFRESH = 24 * 3600
+
+# 会影响单元格取值的工作簿级部件 (共享字符串、数字格式决定日期类型、1904 日期系统)
+_WORKBOOK_PARTS = ('xl/workbook.xml', 'xl/sharedStrings.xml', 'xl/styles.xml')
+
+
+def file_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def ie_sheet_keys(source_path):
+    """
+    返回 {工作表名: 缓存键}，顺序与工作簿中的工作表顺序一致
+    文件无法按 xlsx 结构解析时返回 None (调用方直接完整解析，不使用缓存)
+    """
+    try:
+        with zipfile.ZipFile(source_path) as zf:
+            names = set(zf.namelist())
+            shared = hashlib.sha1()
+            for part in _WORKBOOK_PARTS:
+                if part in names:
+                    shared.update(part.encode('utf-8'))
+                    shared.update(zf.read(part))
+            keys = {}
+            for sheet_name, part in sheet_parts(zf):
+                sha1 = shared.copy()
+                sha1.update(zf.read(part))
+                keys[sheet_name] = ('ie', sheet_name, sha1.hexdigest())
+            return keys
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+        return None
+
+
+class ExtractCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        # 键 -> [记录, 最近使用时间]；首次使用时从磁盘载入
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            if now - entry[1] > ACCESS_REFRESH:
+                entry[1] = now
+                self._dirty = True
+            return entry[0]
+
+    def put(self, key, record):
+        with self._lock:
+            self._load()[key] = [record, time.time()]
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+
+    def iter_me_records(self, file_paths, workers=1):
+        # 与 excel_tools.iter_me_records 相同，但内容未变的文件直接取缓存，只解析新增/改动的文件
+        keys = [('me', file_digest(path)) for path in file_paths]
+        cached = [self.get(key) for key in keys]
+        missing = [path for path, record in zip(file_paths, cached) if record is None]
+        parsed = iter_me_records(missing, workers=workers)
+        try:
+            for path, key, record in zip(file_paths, keys, cached):
+                if record is None:
+                    record = next(parsed)
+                    self.put(key, record)
+                else:
+                    file_name = os.path.basename(path)
+                    record = record._replace(file_name=file_name, board_name=parse_board_name(file_name))
+                yield record
+        finally:
+            # 提前关闭时一并停止解析进程池
+            parsed.close()
+
+    def flush(self):
+        # 写回磁盘: 先合并其它进程写入的条目，再按最近使用时间裁剪
+        with self._lock:
+            if not self._dirty or not self.cache_dir:
+                return
+            entries = self._read_store()
+            entries.update(self._entries)
+            if len(entries) > MAX_ENTRIES:
+                newest = sorted(entries.items(), key=lambda item: item[1][1], reverse=True)
+                entries = dict(newest[:MAX_ENTRIES])
+            self._entries = entries
+            self._write_store(entries)
+            self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read_store()
+        return self._entries
+
+    def _store_path(self):
+        return os.path.join(self.cache_dir, STORE_NAME)
+
+    def _read_store(self):
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(self._store_path(), 'rb') as f:
+                store = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return {}
+        if store.get('version') != EXTRACT_VERSION:
+            return {}
+        return store['entries']
+
+    def _write_store(self, entries):
+        store_path = self._store_path()
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'version': EXTRACT_VERSION, 'entries': entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, store_path)
+        except OSError:
+            # 缓存只是加速手段，写入失败不影响报价
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_extract_cache(cache_dir=None):
+    # 同一进程内按缓存目录共享实例；cache_dir 为空时只在内存中缓存
+    key = resolve_cache_dir(cache_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = ExtractCache(key)
+        return cache
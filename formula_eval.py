@@ -0,0 +1,281 @@
+"""
+报价输出公式的向量化求值 (numpy)，不依赖 PyQt5
+
+按列一次算出所有行的结果，与 quote_pipeline 写入输出表的公式一一对应，
+结果可作为公式的缓存值写回 xlsx，或直接替换公式只输出数值。
+空白单元格 (月需求 F、BOM V、FCT L 等) 按 Excel 规则视为 0；这些单元格留待用户填写，
+引用它们的公式列 (live_columns) 在 values 模式下也保留公式，只补缓存值。
+无法计算的单元格 (源数据为文本等，Excel 中会显示 #VALUE!) 求值为 NaN，不写入缓存值。
+"""
+import codecs
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+
+import quantity_tiers
+
+# options.formula_values 的取值
+#   formula: 只写公式 (需在 Excel 中打开重算才能看到结果)
+#   cached:  写公式，同时写入计算结果作为缓存值
+#   values:  只写计算结果，引用待填单元格的公式列除外
+FORMULA_MODES = ('formula', 'cached', 'values')
+
+
+def _numeric(values, text=np.nan):
+    # 转为浮点数组: 空白为 0；文本按 text 处理 (直接引用时为 NaN，SUM 区域内为 0)
+    result = np.empty(len(values), dtype=float)
+    for i, value in enumerate(values):
+        if value is None or value == "":
+            result[i] = 0.0
+        elif isinstance(value, (int, float)):
+            result[i] = value
+        else:
+            result[i] = text
+    return result
+
+
+def _sig15(x):
+    # Excel 按 15 位有效数字运算，先规整以消除二进制误差 (如 1.005*100 -> 100.5)
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(x)))
+    magnitude = np.where(np.isfinite(magnitude), magnitude, 0)
+    scale = 10.0 ** (14 - magnitude)
+    return np.round(x * scale) / scale
+
+
+def excel_round(x, digits):
+    # ROUND: 四舍五入，.5 远离零
+    scale = 10.0 ** digits
+    x = np.asarray(x, dtype=float)
+    return np.sign(x) * np.floor(_sig15(np.abs(x) * scale) + 0.5) / scale
+
+
+def excel_roundup(x, digits):
+    # ROUNDUP: 远离零进位
+    scale = 10.0 ** digits
+    x = np.asarray(x, dtype=float)
+    return np.sign(x) * np.ceil(_sig15(np.abs(x) * scale)) / scale
+
+
+def _column_sum(*columns):
+    # 按公式中的顺序逐项相加，与 Excel 的 SUM 结果一致
+    total = np.zeros_like(columns[0])
+    for column in columns:
+        total = total + column
+    return total
+
+
+def _running_sum(values):
+    # 纵向 SUM 区域: 顺序累加 (np.sum 为成对累加，末位可能与 Excel 不同)
+    values = np.asarray(values, dtype=float)
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def evaluate_ie(first_row, inputs, handling, upusdl, upusoh, fcst=0, bom=0, tiers=None):
+    """
+    计算 IE 输出各公式列
+    inputs 为每行一个 (SMT, ASM, Routing, Packing, ICT, Machine time) 元组，
+    依次对应 G/H/I/J 公式中 /0.8 之前的数值与 K、Q 列的原始值。
+    tiers 为数量分档表 (quantity_tiers.tier_tables)，默认使用默认分档。
+    返回 {坐标: 数值}
+    """
+    if not inputs:
+        return {}
+    values = {}
+    for column, results in ie_columns(inputs, handling, upusdl, upusoh, fcst, bom, tiers).items():
+        for n, value in enumerate(results, start=first_row):
+            values[f"{column}{n}"] = value
+    return values
+
+
+def ie_record_inputs(records):
+    # IeSheetRecord 列表 -> evaluate_ie 的 inputs
+    return [(record.smt_time, record.asm_time, record.routing_time, record.packing_time,
+             record.ict, record.machine_time) for record in records]
+
+
+def ie_columns(inputs, handling, upusdl, upusoh, fcst=0, bom=0, tiers=None):
+    # 同 evaluate_ie，按列返回 {列字母: 每行结果数组}
+    # handling / upusdl / upusoh 也可以是长度为 S 的数组 (参数扫描，见 quote_sweep)，
+    # fcst 也可以是长度为 S 的数量数组 (数量曲线，见 quantity_tiers)，
+    # 此时依赖它们的列为 (S, 行数) 数组，每个方案/数量一行
+    tiers = tiers or quantity_tiers.DEFAULT_TIERS
+    if any(np.ndim(x) for x in (handling, upusdl, upusoh)):
+        handling, upusdl, upusoh = (np.reshape(np.asarray(x, dtype=float), (-1, 1))
+                                    for x in (handling, upusdl, upusoh))
+    smt, asm, routing, packing, ict, machine = zip(*inputs)
+    if np.ndim(fcst):
+        f = np.reshape(np.asarray(fcst, dtype=float), (-1, 1))
+    else:
+        f = np.full(len(inputs), float(fcst))
+    v = np.full(len(inputs), float(bom))
+
+    columns = {
+        'G': _numeric(smt) / 0.8,
+        'H': _numeric(asm) / 0.8,
+        'I': _numeric(routing) / 0.8,
+        'J': _numeric(packing) / 0.8,
+    }
+    # N = SUM(G:M)，区域内的文本按 0 计
+    k = _numeric(ict, text=0.0)
+    m = np.asarray(handling, dtype=float)
+    columns['N'] = _column_sum(columns['G'], columns['H'], columns['I'], columns['J'], k, m)
+
+    fcst_factor = quantity_tiers.tier_values(tiers['cost_factor'], f)
+    p = excel_round((upusdl * columns['N'] / 3600) * fcst_factor, 2)
+    s = excel_round((upusoh * _numeric(machine) / 3600) * fcst_factor, 2)
+    t = _column_sum(p, s)
+    columns.update({'P': p, 'S': s, 'T': t, 'U': f})
+    columns['W'] = v * quantity_tiers.tier_values(tiers['loss_rate'], f)
+    columns['X'] = excel_roundup(p * quantity_tiers.tier_values(tiers['ohlh_factor'], f), 2)
+    columns['Y'] = excel_roundup(p * quantity_tiers.tier_values(tiers['sga_factor'], f), 2)
+    columns['Z'] = excel_roundup(_column_sum(t, columns['W'], columns['X'], columns['Y']), 2)
+    return columns
+
+
+def evaluate_me(layout, records, stencil_qty, smt_qty, qty):
+    """
+    计算 ME 输出各公式列 (板卡行、合计行、治具明细行与明细合计行)
+    layout 为 excel_tools.MeLayout，records 为对应的 MeBoardRecord 列表。
+    返回 {坐标: 数值}
+    """
+    if not records:
+        return {}
+    board_columns, has_tail, part_f = me_columns(records, stencil_qty, smt_qty, qty)
+
+    values = {}
+    for column in ('I', 'L', 'P', 'S', 'W', 'X', 'Y'):
+        results = board_columns[column]
+        for n, value in zip(layout.board_rows, results):
+            values[f"{column}{n}"] = value
+        values[f"{column}{layout.totals_row}"] = _running_sum(results)
+    for n, value, tail in zip(layout.board_rows, board_columns['O'], has_tail):
+        if tail:
+            values[f"O{n}"] = value
+
+    part_rows = [m for rows in layout.part_rows for m in rows]
+    for m, value in zip(part_rows, part_f):
+        values[f"F{m}"] = value
+    carrier_f = [4 * 892] * len(layout.carrier_rows)
+    for m, value in zip(layout.carrier_rows, carrier_f):
+        values[f"F{m}"] = value
+    values[f"F{layout.sum_row}"] = _running_sum(np.concatenate([part_f, carrier_f]))
+    return values
+
+
+def me_columns(records, stencil_qty, smt_qty, qty):
+    """
+    同 evaluate_me，按列返回 ({列字母: 每块板卡结果数组}, 各板卡是否有尾部物料, 治具明细 F 列数组)
+    板卡列包括输入列 H/K/N 与公式列 I/L/O/P/S/W/X/Y
+    """
+    board_count = len(records)
+    # 板卡行输入列
+    h = np.array([((r.stencil_top + r.stencil_bottom) / 2) * 1.1 for r in records], dtype=float)
+    k = np.array([r.smt_carrier * 1.1 for r in records], dtype=float)
+    has_tail = np.array([r.tail_part[0] is not None for r in records])
+    n_col = np.array([r.tail_part[1] * 1.1 if r.tail_part[0] is not None else 0.0 for r in records],
+                     dtype=float)
+
+    # 治具明细: F = D*E，P 列按板卡序号汇总 (SUMIFS)
+    part_board = np.array([b for b, r in enumerate(records) for _ in r.parts], dtype=int)
+    part_d = _numeric([part[2] for r in records for part in r.parts])
+    part_e = np.array([part[1] * 1.1 for r in records for part in r.parts], dtype=float)
+    part_f = part_d * part_e
+    p = np.zeros(board_count)
+    for board, value in zip(part_board, part_f):
+        p[board] += value
+
+    i_col = stencil_qty * h
+    l_col = smt_qty * k
+    # 无尾部物料时 M:O 合并为 "--"，SUM 中按 0 计
+    o_col = np.where(has_tail, qty * n_col, 0.0)
+    s_col = np.zeros(board_count)  # Q*R，R 为空
+    w_col = np.zeros(board_count)  # U*V，均为空
+    x_col = _column_sum(i_col, l_col, o_col, p, s_col, w_col)
+    y_col = x_col * 1.13
+
+    board_columns = {'H': h, 'I': i_col, 'K': k, 'L': l_col, 'N': n_col, 'O': o_col, 'P': p,
+                     'S': s_col, 'W': w_col, 'X': x_col, 'Y': y_col}
+    return board_columns, has_tail, part_f
+
+
+def _column(coordinate):
+    return coordinate.rstrip('0123456789')
+
+
+def apply_values(ws, values, live_columns=()):
+    # values 模式: 用计算结果替换公式；无法计算的单元格与 live_columns 中各列保留公式
+    for coordinate, value in values.items():
+        if np.isfinite(value) and _column(coordinate) not in live_columns:
+            ws[coordinate].value = float(value)
+
+
+_FORMULA_CELL_RE = re.compile(r'<c r="([A-Z]+[0-9]+)"([^>]*)><f>(.*?)</f>(?:<v\s*/>|<v></v>)', re.S)
+
+
+def _format_value(value):
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _rewrite_rows(src, dst, replace, chunk_size=1 << 20):
+    # 分块改写工作表 XML: 每次只处理到缓冲区中最后一个完整的 </row>，内存占用与行数无关
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ""
+    while True:
+        chunk = src.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            dst.write(replace(pending).encode('utf-8'))
+            return
+        cut = pending.rfind('</row>')
+        if cut >= 0:
+            cut += len('</row>')
+            dst.write(replace(pending[:cut]).encode('utf-8'))
+            pending = pending[cut:]
+
+
+def write_cached_values(output_path, sheet_values, keep_formulas=True, live_columns=()):
+    """
+    在已保存的 xlsx 中为公式单元格补上计算结果
+    sheet_values: [(工作表, {坐标: 计算结果})]
+    cached 模式: openpyxl 写公式时只写空的 <v/>，这里补上缓存值 <v>
+    values 模式 (keep_formulas=False): 去掉 <f>，只保留数值，用于流式输出；live_columns 中各列仍只补缓存值
+    改写对应工作表的 XML 后整体替换原文件
+    """
+    parts = {ws.path.lstrip('/'): values for ws, values in sheet_values}
+
+    def filler(values):
+        def fill(match):
+            value = values.get(match.group(1))
+            if value is None or not np.isfinite(value):
+                return match.group(0)
+            if not keep_formulas and _column(match.group(1)) not in live_columns:
+                return f'<c r="{match.group(1)}"{match.group(2)}><v>{_format_value(value)}</v>'
+            return f'<c r="{match.group(1)}"{match.group(2)}><f>{match.group(3)}</f><v>{_format_value(value)}</v>'
+        return lambda text: _FORMULA_CELL_RE.sub(fill, text)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(output_path) as zin, \
+                zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                with zin.open(info) as src, zout.open(info, 'w') as dst:
+                    if info.filename in parts:
+                        _rewrite_rows(src, dst, filler(parts[info.filename]))
+                    else:
+                        shutil.copyfileobj(src, dst)
+        shutil.copymode(output_path, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
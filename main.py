@@ -1,8 +1,7 @@
-import json
 import os
-import re
 import sys
-import xlrd
+import threading
+import time
 from copy import copy
 from datetime import datetime
 
@@ -18,284 +17,137 @@ if getattr(sys, 'frozen', False):
         application_path, 'PyQt5', 'Qt5', 'plugins'
     )
 
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
-                             QFileDialog, QTextEdit, QProgressBar, QGroupBox,
-                             QFormLayout, QMessageBox, QTabWidget)
-from openpyxl import load_workbook
+                             QFileDialog, QPlainTextEdit, QProgressBar, QGroupBox,
+                             QFormLayout, QMessageBox, QTabWidget, QCheckBox,
+                             QComboBox, QTableWidget, QTableWidgetItem, QHeaderView)
 
 
 # =============================================================================
-# 1. 核心逻辑工具函数 (保留原逻辑)
+# 1. 核心逻辑 (实现见 excel_tools.py / quote_pipeline.py，不依赖界面，可供命令行 cli.py 使用)
 # =============================================================================
+# openpyxl / xlrd 等较重的依赖不在启动时导入: 窗口显示后由 warm_up_pipeline 在后台预先导入，
+# 或在首次运行报价时导入，以缩短打包程序的启动时间
 
-def normalize_text(text):
-    if text is None:
-        return ""
-    text = str(text)
-    # 全角转半角
-    text = text.translate(str.maketrans(
-        '　，。！？（）［］｛｝【】《》＂＇＾～｜＼',
-        ' ,.!?()[]{}【】《》"\'^~|\\'
-    ))
-    # 去掉所有空白字符
-    text = re.sub(r'\s+', '', text)
-    return text
-
-
-def find_b_column_header(ws, target_text):
-    result = None
-    target_text = normalize_text(target_text)
-    for row in ws.iter_rows(min_col=2, max_col=2):
-        try:
-            cell = row[0]
-            if normalize_text(cell.value) == target_text:
-                result = ws.cell(row=cell.row, column=3).value
-                break
-        except:
-            continue
-    return result
-
-
-def find_b_column_header_xlrd(ws, target_text):
-    result = None
-    target_text = normalize_text(target_text)
-
-    for row_idx in range(ws.nrows):
-        try:
-            cell_value = ws.cell_value(row_idx, 1)
-
-            if normalize_text(str(cell_value)) == target_text:
-                result = ws.cell_value(row_idx, 2)
-                break
-        except:
-            continue
-
-    return result
-
-
-def find_name_by_amount_xlrd(ws, target_row):
-    if target_row < ws.nrows:
-        try:
-            cell_value = ws.cell_value(target_row, 3)
-            if cell_value != 0:
-                result = ws.cell_value(target_row, 1)
-                amount = ws.cell_value(target_row, 2)
-                return result, amount, cell_value
-            else:
-                return None, 0, 0  # 明确返回
-        except Exception as e:
-            print(f"读取第{target_row}行时出错: {e}")
-            return None, 0, 0
-    else:
-        return None, 0, 0
+def warm_up_pipeline():
+    # 在后台线程中预先导入报价流程依赖；若用户在导入完成前就开始报价，
+    # 工作线程中的 import 会等待这里完成，不会重复导入
+    def _import():
+        import quote_pipeline  # noqa: F401
+        import xlrd  # noqa: F401
 
-    return None, 0, 0
+    threading.Thread(target=_import, name="pipeline-warm-up", daemon=True).start()
 
 
 # =============================================================================
 # 2. 配置管理类
 # =============================================================================
-class ConfigManager:
-    DEFAULT_CONFIG = {
-        "paths": {
-            "format_path": "LogicData/Format.xlsx",
-            "decorate_path": "LogicData/Decorate.xlsx",
-            "format_path_tab2": "LogicData/Format2.xlsx",
-            "decorate_path_tab2": "LogicData/Decorate2.xlsx"
-        },
-        "params": {
-            "Handling": 60,
-            "UPUSDL": 34.3,
-            "UPUSOH": 162.8,
-            "StencilQty": 2,
-            "SMTCarrierQty": 90,
-            "Qty": 1
-        }
-    }
-    CONFIG_FILE = "settings.json"
-
-    @staticmethod
-    def load_config():
-        if not os.path.exists(ConfigManager.CONFIG_FILE):
-            ConfigManager.save_config(ConfigManager.DEFAULT_CONFIG)
-            return ConfigManager.DEFAULT_CONFIG
-        try:
-            with open(ConfigManager.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                
-            # 确保所有必需的参数都存在，如果缺少则使用默认值
-            if 'paths' not in config:
-                config['paths'] = ConfigManager.DEFAULT_CONFIG['paths'].copy()
-            else:
-                for key, value in ConfigManager.DEFAULT_CONFIG['paths'].items():
-                    if key not in config['paths']:
-                        config['paths'][key] = value
-                        
-            if 'params' not in config:
-                config['params'] = ConfigManager.DEFAULT_CONFIG['params'].copy()
-            else:
-                for key, value in ConfigManager.DEFAULT_CONFIG['params'].items():
-                    if key not in config['params']:
-                        config['params'][key] = value
-                        
-            return config
-        except:
-            return ConfigManager.DEFAULT_CONFIG
+from checkpoint import CancelToken, Cancelled
+from config_manager import ConfigManager
 
-    @staticmethod
-    def save_config(config_data):
-        with open(ConfigManager.CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=4, ensure_ascii=False)
+CANCELLED_MESSAGE = "任务已取消。\n已提取的结果已保存断点，再次运行同一源文件时从断点继续。"
 
 
 # =============================================================================
 # 3. 工作线程 (处理Excel，防止界面卡死)
 # =============================================================================
+class UiFeed:
+    """
+    工作线程 -> 界面 的日志/进度缓冲
+    工作线程只在锁内追加，界面定时器按固定间隔整批取走，
+    条目再多也不会为每一条排队一个信号、触发一次重绘
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lines = []
+        self._progress = None
+
+    def log(self, msg):
+        # 时间戳在产生日志时记录，而不是在界面刷新时
+        line = datetime.now().strftime("[%H:%M:%S] ") + msg
+        with self._lock:
+            self._lines.append(line)
+
+    def progress(self, value):
+        with self._lock:
+            self._progress = value
+
+    def take(self, max_lines=None):
+        # 返回 (日志行列表, 最新进度或 None)；超过 max_lines 时只保留最后的部分
+        with self._lock:
+            lines, self._lines = self._lines, []
+            progress, self._progress = self._progress, None
+        if max_lines and len(lines) > max_lines:
+            skipped = len(lines) - max_lines
+            lines = [f"... 省略 {skipped} 行日志 ..."] + lines[-max_lines:]
+        return lines, progress
+
+
+class LatencyProbe:
+    """界面事件循环延迟: 定时器实际触发时间比预期晚了多少"""
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000
+        self.lags = []
+        self._last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.lags.append(max(0.0, now - self._last - self.interval))
+        self._last = now
+
+    def summary(self):
+        if not self.lags:
+            return "界面响应: 无采样"
+        lags = sorted(self.lags)
+        p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+        return (f"界面响应: {len(lags)} 次采样，平均延迟 {sum(lags) / len(lags) * 1000:.1f} ms，"
+                f"P95 {p95 * 1000:.1f} ms，最大 {lags[-1] * 1000:.1f} ms")
+
+
 class ExcelWorker(QThread):
-    log_signal = pyqtSignal(str)  # 发送日志
-    progress_signal = pyqtSignal(int)  # 发送进度 0-100
     finished_signal = pyqtSignal(bool, str)  # 完成信号(是否成功, 消息)
 
-    def __init__(self, source_path, config):
+    def __init__(self, source_path, config, merge=False):
         super().__init__()
-        self.source_path = source_path
+        # source_path: 单个源文件路径，或多个源文件路径的列表 (批量并行处理)
+        self.source_paths = [source_path] if isinstance(source_path, str) else list(source_path)
         self.config = config
+        self.merge = merge
+        self.feed = UiFeed()
+        self.cancel = CancelToken()
 
     def run(self):
         try:
-            self.log_signal.emit("正在初始化...")
-
-            # 读取配置
-            format_path = self.config['paths']['format_path']
-            decorate_path = self.config['paths']['decorate_path']
-
-            val_handling = float(self.config['params']['Handling'])
-            val_upusdl = float(self.config['params']['UPUSDL'])
-            val_upusoh = float(self.config['params']['UPUSOH'])
-
-            # 检查文件存在
-            if not os.path.exists(format_path):
-                raise FileNotFoundError(f"找不到格式文件: {format_path}")
-            if not os.path.exists(decorate_path):
-                raise FileNotFoundError(f"找不到修饰文件: {decorate_path}")
-
-         
-            self.log_signal.emit("正在加载工作簿 (这可能需要几秒钟)...")
-
-            wb_result = load_workbook(format_path)
-            wb_source = load_workbook(self.source_path, data_only=True)
-            wb_decorate = load_workbook(decorate_path)
-
-            ws_result = wb_result.active
-            ws_decorate = wb_decorate.active
-
-            # 获取样式
-            self.log_signal.emit("正在读取样式模板...")
-            styles = []
-            # 注意：原代码假定取第3行的样式
-            for cell in ws_decorate[3]:
-                styles.append({
-                    'font': copy(cell.font),
-                    'fill': copy(cell.fill),
-                    'border': copy(cell.border),
-                    'alignment': copy(cell.alignment),
-                    'number_format': cell.number_format
-                })
-
-            sheet_names = wb_source.sheetnames
-            total_sheets = len(sheet_names)
-            n = 3
-
-            for idx, sheet_name in enumerate(sheet_names):
-                self.log_signal.emit(f"处理工作表 [{idx + 1}/{total_sheets}]: {sheet_name}")
-
-                ws = wb_source[sheet_name]
-                ws_result.row_dimensions[n].height = 31
-
-                # 应用样式
-                for cell, style in zip(ws_result[n], styles):
-                    cell.font = style['font']
-                    cell.fill = style['fill']
-                    cell.border = style['border']
-                    cell.alignment = style['alignment']
-                    cell.number_format = style['number_format']
-
-                # 计算
-                B_labor = find_b_column_header(ws, "B    Labor time(s/pcs)") or 0
-                T_labor = find_b_column_header(ws, "T     Labor time(s/pcs)") or 0
-                G_labor = find_b_column_header(ws, "金 Labor time(s/pcs)") or 0
-                ws_result[f'G{n}'] = f"={(B_labor + T_labor + G_labor)}/0.8"
-
-                D_labor = find_b_column_header(ws, "D    Labor time(s/pcs)") or 0
-                ws_result[f'H{n}'] = f"={D_labor}/0.8"
-
-                R_labor = find_b_column_header(ws, "R    Labor time(s/pcs)") or 0
-                FiveD_labor = find_b_column_header(ws, "5D    Labor time(s/pcs)") or 0
-                P_labor = find_b_column_header(ws, "P    Labor time(s/pcs)") or 0
-                ws_result[f'I{n}'] = f"={(R_labor + FiveD_labor + P_labor)}/0.8"
-
-                SASM = find_b_column_header(ws, "SASM") or 0
-                AVI = find_b_column_header(ws, "AVI") or 0
-                INSP = find_b_column_header(ws, "INSP") or 0
-                PACK = find_b_column_header(ws, "PACK") or 0
-                ws_result[f'J{n}'] = f"={(SASM + AVI + INSP + PACK)}/0.8"
-
-                ICT = find_b_column_header(ws, "ICT") or 0
-                ws_result[f'K{n}'] = ICT
-
-                machine_time = find_b_column_header(ws, "Machine Time(s/pcs)") or 0
-                ws_result[f'Q{n}'] = machine_time
-
-                project_name = find_b_column_header(ws, "Project name") or ""
-                ws_result[f'C{n}'] = project_name
-
-                # 公式
-                ws_result[f'N{n}'] = f"=SUM(G{n}:M{n})"
-                ws_result[f'P{n}'] = f"=ROUND((O{n}*N{n}/3600)*IF(F{n}<1000,1.05,1.02),2)"
-                ws_result[f'S{n}'] = f"=ROUND((R{n}*Q{n}/3600)*IF(F{n}<1000,1.05,1.02),2)"
-                ws_result[f'T{n}'] = f"=SUM(P{n},S{n})"
-                ws_result[f'U{n}'] = f"=F{n}"
-                ws_result[f'W{n}'] = f"=V{n}*IF(F{n}<1000,0.004,0.002)"
-                ws_result[f'X{n}'] = f"=ROUNDUP(P{n}*IF(F{n}<500,1.2,IF(F{n}<1000,1,IF(F{n}>5000,0.6,0.8))),2)"
-                ws_result[f'Y{n}'] = f"=ROUNDUP(P{n}*IF(F{n}<500,1.5,IF(F{n}<1000,1.2,IF(F{n}>5000,0.6,0.9))),2)"
-                ws_result[f'Z{n}'] = f"=ROUNDUP(SUM(T{n},W{n}:Y{n}),2)"
-
-                # === 使用配置中的变量 ===
-                ws_result[f'M{n}'] = val_handling  # 原代码是 60
-                ws_result[f'O{n}'] = val_upusdl  # 原代码是 34.3
-                ws_result[f'R{n}'] = val_upusoh  # 原代码是 162.8
-
-                # 查找 Panel Qty
-                pcs_panel = 0
-                target_text = normalize_text("Panel Qty")
-                for row in ws.iter_rows(min_col=3, max_col=3):
-                    try:
-                        cell = row[0]
-                        if normalize_text(cell.value) == target_text:
-                            pcs_panel = ws.cell(row=cell.row + 1, column=3).value
-                            break
-                    except:
-                        continue
-                ws_result[f'E{n}'] = pcs_panel or 0
-
-                n += 1
-                # 更新进度条
-                self.progress_signal.emit(int(((idx + 1) / total_sheets) * 100))
-
-            # 保存文件
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = os.path.dirname(self.source_path)
-            output_filename = f"Output_IE_{timestamp}.xlsx"
-            output_path = os.path.join(output_dir, output_filename)
-
-            self.log_signal.emit(f"正在保存文件: {output_path}")
-            wb_result.save(output_path)
-
-            self.finished_signal.emit(True, f"处理完成！\n文件已保存至:\n{output_path}")
-
+            if len(self.source_paths) == 1 and not self.merge:
+                from quote_pipeline import run_ie_quote
+                output_path = run_ie_quote(self.source_paths[0], self.config,
+                                          log=self.feed.log, progress=self.feed.progress, cancel=self.cancel)
+
+                self.finished_signal.emit(True, f"处理完成！\n文件已保存至:\n{output_path}")
+                return
+
+            from quote_pipeline import run_ie_batch
+            results = run_ie_batch(self.source_paths, self.config, log=self.feed.log,
+                                   progress=self.feed.progress, merge=self.merge, cancel=self.cancel)
+            failed = [result for result in results if result.error is not None]
+            outputs = list(dict.fromkeys(result.output_path for result in results if result.error is None))
+            summary = f"成功 {len(results) - len(failed)} 个，失败 {len(failed)} 个"
+            if not outputs:
+                self.finished_signal.emit(False, f"全部处理失败 ({summary})\n{failed[0].error}")
+                return
+            message = f"处理完成！{summary}\n文件已保存至:\n" + "\n".join(outputs)
+            if failed:
+                message += "\n失败的源文件:\n" + "\n".join(result.source_path for result in failed)
+            self.finished_signal.emit(True, message)
+
+        except Cancelled:
+            self.finished_signal.emit(False, CANCELLED_MESSAGE)
         except Exception as e:
             import traceback
             error_msg = traceback.format_exc()
@@ -306,238 +158,25 @@ class ExcelWorker(QThread):
 # 3.2 工作线程 (处理第二个选项卡的Excel)
 # =============================================================================
 class ExcelWorker2(QThread):
-    log_signal = pyqtSignal(str)  # 发送日志
-    progress_signal = pyqtSignal(int)  # 发送进度 0-100
     finished_signal = pyqtSignal(bool, str)  # 完成信号(是否成功, 消息)
 
     def __init__(self, source_path, config):
         super().__init__()
         self.source_path = source_path
         self.config = config
+        self.feed = UiFeed()
+        self.cancel = CancelToken()
 
     def run(self):
         try:
-            self.log_signal.emit("正在初始化...")
-
-            # 读取配置
-            format_path = self.config['paths']['format_path_tab2']
-            decorate_path = self.config['paths']['decorate_path_tab2']
-
-            val_stencilqty = float(self.config['params']['StencilQty'])
-            val_smtqty = float(self.config['params']['SMTCarrierQty'])
-            val_qty = float(self.config['params']['Qty'])
-
-            # 检查文件存在
-            if not os.path.exists(format_path):
-                raise FileNotFoundError(f"找不到格式文件: {format_path}")
-            if not os.path.exists(decorate_path):
-                raise FileNotFoundError(f"找不到修饰文件: {decorate_path}")
-
-            self.log_signal.emit("正在加载工作簿 (这可能需要几秒钟)...")
-
-            wb_result = load_workbook(format_path)
-            wb_decorate = load_workbook(decorate_path)
-
-            ws_result = wb_result.active
-            ws_decorate = wb_decorate.active
-
-            #获取样式
-            self.log_signal.emit("正在读取样式模板...")
-            styles1 = []
-            styles2 = []
-            styles3 = []
-            styles4 = []
-            # 注意：原代码假定取第3行的样式
-            for cell in ws_decorate[3]:
-                styles1.append({
-                    'font': copy(cell.font),
-                    'fill': copy(cell.fill),
-                    'border': copy(cell.border),
-                    'alignment': copy(cell.alignment),
-                    'number_format': cell.number_format
-                })
-
-            for cell in ws_decorate[4]:
-                styles2.append({
-                    'font': copy(cell.font),
-                    'fill': copy(cell.fill),
-                    'border': copy(cell.border),
-                    'alignment': copy(cell.alignment),
-                    'number_format': cell.number_format
-                })
-
-            for cell in ws_decorate[5]:
-                styles3.append({
-                    'font': copy(cell.font),
-                    'fill': copy(cell.fill),
-                    'border': copy(cell.border),
-                    'alignment': copy(cell.alignment),
-                    'number_format': cell.number_format
-                })
-
-            for cell in ws_decorate[6]:
-                styles4.append({
-                    'font': copy(cell.font),
-                    'fill': copy(cell.fill),
-                    'border': copy(cell.border),
-                    'alignment': copy(cell.alignment),
-                    'number_format': cell.number_format
-                })
-
-            n = 3
-            m = 11
-
-            # 检查是文件还是文件夹
-            if os.path.isdir(self.source_path):
-                # 遍历文件夹中的所有xlsx文件
-                self.log_signal.emit(f"正在扫描文件夹: {self.source_path}")
-                xlsx_files = [f for f in os.listdir(self.source_path) if f.lower().endswith('.xls')]
-                if not xlsx_files:
-                    raise FileNotFoundError(f"在文件夹 {self.source_path} 中未找到xls文件")
-
-                self.log_signal.emit(f"找到 {len(xlsx_files)} 个xls文件")
-
-                xlsx_files.sort(key=lambda x: [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', x)])
-
-                total_files = len(xlsx_files)
-                for file_idx, xlsx_file in enumerate(xlsx_files):
-
-                    process_file_path = os.path.join(self.source_path, xlsx_file)
-                    wb_source = xlrd.open_workbook(process_file_path)
-                    ws = wb_source.sheet_by_index(0)
-                    self.log_signal.emit(f"处理文件: {xlsx_file}")
-                    
-                    # 更新进度条
-                    self.progress_signal.emit(int(((file_idx + 1) / total_files) * 100))
-
-                    ws_result.insert_rows(n, 1)
-                    ws_result.row_dimensions[n].height = 25
-                    # 应用样式
-                    for cell, style in zip(ws_result[n], styles1):
-                        cell.font = style['font']
-                        cell.fill = style['fill']
-                        cell.border = style['border']
-                        cell.alignment = style['alignment']
-                        cell.number_format = style['number_format']
-
-                    name_without_ext = xlsx_file.rsplit('.', 1)[0]
-                    match = re.search(r'\d+\.(.+)', name_without_ext)
-                    if match:
-                        name = match.group(1).replace('_', '*')
-                    else:
-                        name = ""
-                    ws_result[f'C{n}'] = name
-
-                    st = find_b_column_header_xlrd(ws, "Stencil (Top  side)") or 0
-                    sb = find_b_column_header_xlrd(ws, "Stencil (bottom side)") or 0
-                    StencilUP = ((st + sb) / 2) * 1.1
-                    ws_result[f'H{n}'] = StencilUP
-
-                    SMTCarrierUP = (find_b_column_header_xlrd(ws, "SMT carrier") or 0) * 1.1
-                    ws_result[f'K{n}'] = SMTCarrierUP
-
-                    name, amount, qty = find_name_by_amount_xlrd(ws, 11)
-                    if name != None:
-                        ws_result[f'M{n}'] = val_qty
-                        ws_result[f'N{n}'] = amount * 1.1
-                        ws_result[f'O{n}'] = f"=M{n}*N{n}"
-                    else:
-                        ws_result.merge_cells(f'M{n}:O{n}')
-                        ws_result[f'M{n}'] = "--"
-                    ws_result[f'G{n}'] = val_stencilqty
-                    ws_result[f'J{n}'] = val_smtqty
-                    ws_result[f'Q{n}'] = 1
-                    ws_result[f'B{n}'] = f"{n - 2}"
-
-
-
-                    ws_result[f'I{n}'] = f"=G{n}*H{n}"
-                    ws_result[f'L{n}'] = f"=J{n}*K{n}"
-                    ws_result[f'S{n}'] = f"=Q{n}*R{n}"
-                    ws_result[f'W{n}'] = f"=U{n}*V{n}"
-                    ws_result[f'X{n}'] = f"=SUM(I{n}, L{n}, O{n}, P{n}, S{n}, W{n})"
-                    ws_result[f'Y{n}'] = f"=X{n}*1.13"
-                    #ws_result[f'H{n}'] = f"={(SASM + AVI + INSP + PACK)}/0.8"
-                    n += 1
-                    m += 1
-                    for i in range(4,11):
-                        name, amount, qty = find_name_by_amount_xlrd(ws, i)
-                        if name != None:
-                            # 应用样式
-                            for cell, style in zip(ws_result[m], styles3):
-                                cell.font = style['font']
-                                cell.fill = style['fill']
-                                cell.border = style['border']
-                                cell.alignment = style['alignment']
-                                cell.number_format = style['number_format']
-                            ws_result[f'C{m}'] = name
-                            ws_result[f'D{m}'] = qty
-                            ws_result[f'E{m}'] = amount * 1.1
-                            ws_result[f'G{m}'] = f"{n - 3}"
-                            m += 1
-
-
-                ws_result.insert_rows(n, 1)
-                ws_result.row_dimensions[n].height = 24
-                m += 1
-
-                # 应用样式
-                for cell, style in zip(ws_result[n], styles2):
-                    cell.font = style['font']
-                    cell.fill = style['fill']
-                    cell.border = style['border']
-                    cell.alignment = style['alignment']
-                    cell.number_format = style['number_format']
-
-                # 应用样式
-                for cell, style in zip(ws_result[m], styles4):
-                    cell.font = style['font']
-                    cell.fill = style['fill']
-                    cell.border = style['border']
-                    cell.alignment = style['alignment']
-                    cell.number_format = style['number_format']
-
-                ws_result[f'I{n}'] = f"=SUM(I3:I{n - 1})"
-                ws_result[f'L{n}'] = f"=SUM(L3:L{n - 1})"
-                ws_result[f'P{n}'] = f"=SUM(P3:P{n - 1})"
-                ws_result[f'S{n}'] = f"=SUM(S3:S{n - 1})"
-                ws_result[f'W{n}'] = f"=SUM(W3:W{n - 1})"
-                ws_result[f'X{n}'] = f"=SUM(X3:X{n - 1})"
-                ws_result[f'Y{n}'] = f"=SUM(Y3:Y{n - 1})"
-
-
-
-                for i in range(3,n):
-                    ws_result[f'P{i}'] = f"=SUMIFS($F${n + 9}:$F${m - 1},$G${n + 9}:$G${m - 1},B{i})"
-
-                for i in range(n + 9, m):
-                    ws_result[f'F{i}'] = f"=D{i}*E{i}"
-
-                for i in range(1, n-2):
-                    for cell, style in zip(ws_result[m], styles3):
-                        cell.font = style['font']
-                        cell.fill = style['fill']
-                        cell.border = style['border']
-                        cell.alignment = style['alignment']
-                        cell.number_format = style['number_format']
-                    ws_result[f'C{m}'] = "AVI Carrier"
-                    ws_result[f'D{m}'] = 4
-                    ws_result[f'E{m}'] = 892
-                    ws_result[f'F{m}'] = f"=D{m}*E{m}"
-                    ws_result[f'G{m}'] = i
-                    m += 1
-                ws_result[f'F{m}'] = f"=SUM(F{n + 9}:F{m - 1})"
-            # 保存文件
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_dir = os.path.dirname(self.source_path)
-            output_filename = f"Output_ME_{timestamp}.xlsx"  # 使用不同的文件名前缀
-            output_path = os.path.join(output_dir, output_filename)
-
-            self.log_signal.emit(f"正在保存文件: {output_path}")
-            wb_result.save(output_path)
+            from quote_pipeline import run_me_quote
+            output_path = run_me_quote(self.source_path, self.config,
+                                      log=self.feed.log, progress=self.feed.progress, cancel=self.cancel)
 
             self.finished_signal.emit(True, f"处理完成！\n文件已保存至:\n{output_path}")
 
+        except Cancelled:
+            self.finished_signal.emit(False, CANCELLED_MESSAGE)
         except Exception as e:
             import traceback
             error_msg = traceback.format_exc()
@@ -551,6 +190,12 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config_data = ConfigManager.load_config()
+        # 运行中的工作线程: {UiFeed: (日志窗口, 进度条)}，由定时器统一刷新
+        self.active_feeds = {}
+        self.latency_probe = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.config_data['options'].get('ui_refresh_ms', 100))
+        self.refresh_timer.timeout.connect(self.refresh_feeds)
         self.init_ui()
         self.apply_stylesheet()
 
@@ -578,7 +223,12 @@ class MainWindow(QMainWindow):
         self.tab2 = QWidget()
         self.tab_widget.addTab(self.tab2, "报价-ME")
         self.init_tab2()
-        
+
+        # 报价历史选项卡
+        self.tab3 = QWidget()
+        self.tab_widget.addTab(self.tab3, "报价历史")
+        self.init_tab3()
+
         # 底部状态栏
         self.status_label = QLabel("就绪")
         self.statusBar().addWidget(self.status_label)
@@ -672,6 +322,10 @@ class MainWindow(QMainWindow):
         source_layout.addWidget(self.source_file_edit)
         source_layout.addWidget(select_source_btn)
 
+        # 选择多个源文件时: 并行处理，可合并为一个输出文件
+        self.merge_output_check = QCheckBox("合并输出 (多个源文件时，每个源文件一个工作表)")
+        self.merge_output_check.setChecked(self.config_data['options'].get('ie_merge_output', False))
+
         # 运行按钮
         self.run_btn = QPushButton("开始处理")
         self.run_btn.setObjectName("ActionButton")
@@ -680,9 +334,16 @@ class MainWindow(QMainWindow):
         self.run_btn.setEnabled(False)  # 选择文件后启用
         self.run_btn.clicked.connect(self.start_processing)
 
+        # 取消按钮: 当前工作表/文件处理完后停止，已提取的结果写入断点
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.setEnabled(False)  # 运行中启用
+        self.cancel_btn.clicked.connect(self.cancel_processing)
+
         action_layout.addLayout(source_layout)
+        action_layout.addWidget(self.merge_output_check)
         action_layout.addSpacing(10)
         action_layout.addWidget(self.run_btn)
+        action_layout.addWidget(self.cancel_btn)
         action_group.setLayout(action_layout)
         tab1_layout.addWidget(action_group)
 
@@ -690,9 +351,10 @@ class MainWindow(QMainWindow):
         log_group = QGroupBox("运行日志 (Logs)")
         log_layout = QVBoxLayout()
 
-        self.log_area = QTextEdit()
+        self.log_area = QPlainTextEdit()
         self.log_area.setReadOnly(True)
         self.log_area.setObjectName("LogArea")
+        self.log_area.setMaximumBlockCount(self.config_data['options'].get('log_max_lines', 5000))
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
@@ -802,9 +464,15 @@ class MainWindow(QMainWindow):
         self.run_btn_tab2.setEnabled(False)  # 选择文件后启用
         self.run_btn_tab2.clicked.connect(self.start_processing_tab2)
 
+        # 取消按钮: 当前工作表/文件处理完后停止，已提取的结果写入断点
+        self.cancel_btn_tab2 = QPushButton("取消")
+        self.cancel_btn_tab2.setEnabled(False)  # 运行中启用
+        self.cancel_btn_tab2.clicked.connect(self.cancel_processing_tab2)
+
         action_layout.addLayout(source_layout)
         action_layout.addSpacing(10)
         action_layout.addWidget(self.run_btn_tab2)
+        action_layout.addWidget(self.cancel_btn_tab2)
         action_group.setLayout(action_layout)
         tab2_layout.addWidget(action_group)
 
@@ -812,9 +480,10 @@ class MainWindow(QMainWindow):
         log_group = QGroupBox("运行日志 (Logs)")
         log_layout = QVBoxLayout()
 
-        self.log_area_tab2 = QTextEdit()
+        self.log_area_tab2 = QPlainTextEdit()
         self.log_area_tab2.setReadOnly(True)
         self.log_area_tab2.setObjectName("LogArea")
+        self.log_area_tab2.setMaximumBlockCount(self.config_data['options'].get('log_max_lines', 5000))
 
         self.progress_bar_tab2 = QProgressBar()
         self.progress_bar_tab2.setValue(0)
@@ -829,6 +498,81 @@ class MainWindow(QMainWindow):
         
         tab2_layout.addStretch()
 
+    def init_tab3(self):
+        # 只查询历史库 (quote_history)，不打开任何 Excel 文件
+        tab3_layout = QVBoxLayout(self.tab3)
+        tab3_layout.setSpacing(15)
+        tab3_layout.setContentsMargins(10, 10, 10, 10)
+
+        query_group = QGroupBox("查询条件")
+        query_layout = QHBoxLayout()
+
+        self.history_kind = QComboBox()
+        self.history_kind.addItem("IE 项目", 'ie')
+        self.history_kind.addItem("ME 板卡", 'me')
+
+        self.history_name = QLineEdit()
+        self.history_name.setPlaceholderText("Project name / 板卡名称，可用 * ? 通配符")
+        self.history_name.returnPressed.connect(self.search_history)
+        self.history_since = QLineEdit()
+        self.history_until = QLineEdit()
+        for inp in [self.history_since, self.history_until]:
+            inp.setFixedWidth(110)
+            inp.setPlaceholderText("YYYY-MM-DD")
+            inp.returnPressed.connect(self.search_history)
+
+        search_btn = QPushButton("查询")
+        search_btn.setObjectName("PrimaryButton")
+        search_btn.setCursor(Qt.PointingHandCursor)
+        search_btn.clicked.connect(self.search_history)
+
+        query_layout.addWidget(self.history_kind)
+        query_layout.addWidget(self.history_name, stretch=1)
+        query_layout.addWidget(QLabel("从"))
+        query_layout.addWidget(self.history_since)
+        query_layout.addWidget(QLabel("至"))
+        query_layout.addWidget(self.history_until)
+        query_layout.addWidget(search_btn)
+        query_group.setLayout(query_layout)
+        tab3_layout.addWidget(query_group)
+
+        self.history_table = QTableWidget()
+        self.history_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.history_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.history_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        tab3_layout.addWidget(self.history_table, stretch=1)
+
+        self.history_status = QLabel("")
+        tab3_layout.addWidget(self.history_status)
+
+    def search_history(self):
+        from quote_history import SUMMARY_COLUMNS, QuoteHistory, format_value, history_path
+
+        path = history_path(self.config_data)
+        if path is None or not os.path.exists(path):
+            self.history_status.setText("没有报价历史 (未设置 cache_dir、已关闭 quote_history 或尚未报价)")
+            return
+        kind = self.history_kind.currentData()
+        start = time.perf_counter()
+        try:
+            with QuoteHistory(path) as history:
+                rows = history.find(kind, self.history_name.text().strip(),
+                                    self.history_since.text().strip(), self.history_until.text().strip())
+        except ValueError:
+            QMessageBox.warning(self, "错误", "日期格式应为 YYYY-MM-DD！")
+            return
+        elapsed = time.perf_counter() - start
+
+        columns = SUMMARY_COLUMNS[kind]
+        self.history_table.clear()
+        self.history_table.setColumnCount(len(columns))
+        self.history_table.setHorizontalHeaderLabels(columns)
+        self.history_table.setRowCount(len(rows))
+        for row_idx, row in enumerate(rows):
+            for col_idx, column in enumerate(columns):
+                self.history_table.setItem(row_idx, col_idx, QTableWidgetItem(format_value(row[column])))
+        self.history_status.setText(f"共 {len(rows)} 行 (查询 {elapsed * 1000:.1f} ms)")
+
     def apply_stylesheet(self):
         # 现代商业风格 CSS
         style = """
@@ -903,7 +647,7 @@ class MainWindow(QMainWindow):
         QPushButton#ActionButton:disabled {
             background-color: #95a5a6;
         }
-        QTextEdit#LogArea {
+        QPlainTextEdit#LogArea {
             background-color: #2c3e50;
             color: #ecf0f1;
             border-radius: 4px;
@@ -928,11 +672,17 @@ class MainWindow(QMainWindow):
             self.config_data['paths'][key] = path
 
     def select_source_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "选择 Source 文件", "", "Excel Files (*.xlsx)")
-        if path:
-            self.source_file_edit.setText(path)
+        paths, _ = QFileDialog.getOpenFileNames(self, "选择 Source 文件 (可多选)", "", "Excel Files (*.xlsx)")
+        if paths:
+            self.source_paths = paths
+            if len(paths) == 1:
+                self.source_file_edit.setText(paths[0])
+                self.log_message(f"已加载源文件: {paths[0]}")
+            else:
+                self.source_file_edit.setText(f"已选择 {len(paths)} 个文件: " +
+                                              "; ".join(os.path.basename(path) for path in paths))
+                self.log_message(f"已加载 {len(paths)} 个源文件:\n" + "\n".join(paths))
             self.run_btn.setEnabled(True)
-            self.log_message(f"已加载源文件: {path}")
 
     def select_source_file_tab2(self):
         path = QFileDialog.getExistingDirectory(self, "选择源文件夹")
@@ -976,21 +726,53 @@ class MainWindow(QMainWindow):
         except ValueError:
             QMessageBox.warning(self, "错误", "参数必须是有效的数字！")
 
-    def log_message(self, msg):
-        timestamp = datetime.now().strftime("[%H:%M:%S] ")
-        self.log_area.append(timestamp + msg)
+    def append_log(self, log_area, lines):
+        # 一次追加多行 (每行一个文本块，超出 maximumBlockCount 的旧行自动丢弃)
+        log_area.appendPlainText("\n".join(lines))
         # 滚动到底部
-        self.log_area.verticalScrollBar().setValue(self.log_area.verticalScrollBar().maximum())
+        log_area.verticalScrollBar().setValue(log_area.verticalScrollBar().maximum())
+
+    def log_message(self, msg):
+        self.append_log(self.log_area, [datetime.now().strftime("[%H:%M:%S] ") + msg])
 
     def log_message_tab2(self, msg):
-        timestamp = datetime.now().strftime("[%H:%M:%S] ")
-        self.log_area_tab2.append(timestamp + msg)
-        # 滚动到底部
-        self.log_area_tab2.verticalScrollBar().setValue(self.log_area_tab2.verticalScrollBar().maximum())
+        self.append_log(self.log_area_tab2, [datetime.now().strftime("[%H:%M:%S] ") + msg])
+
+    def watch_feed(self, feed, log_area, progress_bar):
+        # 开始按固定间隔刷新该工作线程的日志与进度
+        self.active_feeds[feed] = (log_area, progress_bar)
+        if not self.refresh_timer.isActive():
+            if self.config_data['options'].get('ui_latency_probe', False):
+                self.latency_probe = LatencyProbe(self.refresh_timer.interval())
+            self.refresh_timer.start()
+
+    def unwatch_feed(self, feed):
+        # 取走剩余的日志，没有运行中的任务时停止定时器
+        log_area, progress_bar = self.active_feeds.pop(feed)
+        self.flush_feed(feed, log_area, progress_bar)
+        if not self.active_feeds:
+            self.refresh_timer.stop()
+            if self.latency_probe is not None:
+                summary = self.latency_probe.summary()
+                self.latency_probe = None
+                self.append_log(log_area, [datetime.now().strftime("[%H:%M:%S] ") + summary])
+
+    def flush_feed(self, feed, log_area, progress_bar):
+        lines, progress = feed.take(log_area.maximumBlockCount())
+        if lines:
+            self.append_log(log_area, lines)
+        if progress is not None:
+            progress_bar.setValue(progress)
+
+    def refresh_feeds(self):
+        if self.latency_probe is not None:
+            self.latency_probe.tick()
+        for feed, (log_area, progress_bar) in self.active_feeds.items():
+            self.flush_feed(feed, log_area, progress_bar)
 
     def start_processing(self):
-        source_path = self.source_file_edit.text()
-        if not source_path:
+        source_paths = getattr(self, 'source_paths', None)
+        if not source_paths:
             return
 
         # 锁定界面
@@ -1012,10 +794,10 @@ class MainWindow(QMainWindow):
             self.run_btn.setEnabled(True)
             return
 
-        self.worker = ExcelWorker(source_path, current_config)
-        self.worker.log_signal.connect(self.log_message)
-        self.worker.progress_signal.connect(self.progress_bar.setValue)
+        self.worker = ExcelWorker(source_paths, current_config, merge=self.merge_output_check.isChecked())
         self.worker.finished_signal.connect(self.on_processing_finished)
+        self.watch_feed(self.worker.feed, self.log_area, self.progress_bar)
+        self.cancel_btn.setEnabled(True)
         self.worker.start()
 
     def start_processing_tab2(self):
@@ -1040,28 +822,46 @@ class MainWindow(QMainWindow):
             return
 
         self.worker2 = ExcelWorker2(source_path, current_config)
-        self.worker2.log_signal.connect(self.log_message_tab2)
-        self.worker2.progress_signal.connect(self.progress_bar_tab2.setValue)
         self.worker2.finished_signal.connect(self.on_processing_finished_tab2)
+        self.watch_feed(self.worker2.feed, self.log_area_tab2, self.progress_bar_tab2)
+        self.cancel_btn_tab2.setEnabled(True)
         self.worker2.start()
 
+    def cancel_processing(self):
+        self.cancel_btn.setEnabled(False)
+        self.worker.cancel.cancel()
+        self.log_message("正在取消...")
+
+    def cancel_processing_tab2(self):
+        self.cancel_btn_tab2.setEnabled(False)
+        self.worker2.cancel.cancel()
+        self.log_message_tab2("正在取消...")
+
     def on_processing_finished(self, success, message):
+        self.unwatch_feed(self.worker.feed)
         self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.progress_bar.setValue(100 if success else 0)
         self.log_message("任务结束。")
 
         if success:
             QMessageBox.information(self, "处理完成", message)
+        elif self.worker.cancel.cancelled:
+            QMessageBox.information(self, "已取消", message)
         else:
             QMessageBox.critical(self, "处理失败", message)
 
     def on_processing_finished_tab2(self, success, message):
+        self.unwatch_feed(self.worker2.feed)
         self.run_btn_tab2.setEnabled(True)
+        self.cancel_btn_tab2.setEnabled(False)
         self.progress_bar_tab2.setValue(100 if success else 0)
         self.log_message_tab2("任务结束。")
 
         if success:
             QMessageBox.information(self, "处理完成", message)
+        elif self.worker2.cancel.cancelled:
+            QMessageBox.information(self, "已取消", message)
         else:
             QMessageBox.critical(self, "处理失败", message)
     
@@ -1073,6 +873,10 @@ class MainWindow(QMainWindow):
 # 5. 程序入口
 # =============================================================================
 if __name__ == "__main__":
+    # 打包后的程序在进程池子进程中不重复启动界面
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # 创建必要的文件夹结构，防止报错
     if not os.path.exists("LogicData"):
         os.makedirs("LogicData")
@@ -1086,4 +890,6 @@ if __name__ == "__main__":
 
     window = MainWindow()
     window.show()
+    # 窗口显示后再预热报价流程依赖
+    QTimer.singleShot(0, warm_up_pipeline)
     sys.exit(app.exec_())
\ No newline at end of file
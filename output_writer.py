@@ -0,0 +1,245 @@
+"""
+报价输出表的两种写入方式，不依赖 PyQt5
+
+- WorkbookOutput: 在完整加载的格式模板工作簿上就地修改后保存 (默认)
+- StreamingOutput: openpyxl 只写模式，按行号递增逐行写出；
+  复制格式模板的表头行、列宽、行高、合并单元格、冻结窗格、筛选与打印设置，
+  每行写出后即释放，内存不随输出行数增长 (options.stream_output)
+
+两者接口相同: insert_rows / write_row / add_table / save，报价流程不关心具体是哪一种。
+StreamingOutput 依赖 openpyxl 的内部结构，只在验证过的版本上启用，其它版本退回 WorkbookOutput。
+"""
+import re
+from copy import copy
+from functools import lru_cache
+
+from openpyxl.cell import Cell
+from openpyxl.utils.indexed_list import IndexedList
+
+from excel_tools import COLUMN_INDEX, write_row
+
+# 流式输出时原样沿用的工作表级设置
+_SHEET_SETTINGS = ('sheet_properties', 'sheet_format', 'views', 'print_options', 'page_margins',
+                   'HeaderFooter', 'auto_filter', 'protection')
+# 流式输出用到的 openpyxl 内部结构 (样式表、xf 列表、只写工作表的行转换) 已验证过的版本 (主, 次)
+STREAMING_OPENPYXL_VERSIONS = ((3, 1),)
+_WORKBOOK_INTERNALS = ('_fonts', '_fills', '_borders', '_alignments', '_protections', '_cell_styles')
+
+
+@lru_cache(maxsize=None)
+def streaming_supported():
+    """当前 openpyxl 版本经过验证，且 StreamingOutput 用到的内部属性都在"""
+    import openpyxl
+    from openpyxl import Workbook
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+    match = re.match(r'(\d+)\.(\d+)', openpyxl.__version__)
+    if not match or (int(match.group(1)), int(match.group(2))) not in STREAMING_OPENPYXL_VERSIONS:
+        return False
+    wb = Workbook(write_only=True)
+    return (all(hasattr(wb, name) for name in _WORKBOOK_INTERNALS)
+            and hasattr(WriteOnlyWorksheet, '_values_to_row')
+            and hasattr(Cell, '_style')
+            and hasattr(Workbook().active, '_cells'))
+
+
+class WorkbookOutput:
+    streaming = False
+
+    def __init__(self, wb, ws=None):
+        self.wb = wb
+        self.ws = ws or wb.active
+
+    def add_sheet(self, title):
+        # 复制当前 (尚未写入的) 模板工作表作为新工作表，返回写入该表的 WorkbookOutput
+        # copy_worksheet 不复制冻结窗格、筛选与条件格式，这里补上
+        ws = self.wb.copy_worksheet(self.ws)
+        ws.title = title
+        ws.freeze_panes = self.ws.freeze_panes
+        ws.auto_filter.ref = self.ws.auto_filter.ref
+        for cf in self.ws.conditional_formatting:
+            for rule in cf.rules:
+                ws.conditional_formatting.add(str(cf.sqref), rule)
+        return WorkbookOutput(self.wb, ws)
+
+    def add_table(self, title, rows):
+        # 新增一个只含数值的工作表 (不套用模板)，rows 为按行的值列表
+        ws = self.wb.create_sheet(title)
+        for row in rows:
+            ws.append(row)
+
+    def insert_rows(self, row, amount):
+        self.ws.insert_rows(row, amount)
+
+    def write_row(self, row, values, styles=(), height=None, merges=()):
+        # 依次: 行高、样式 (按顺序套用)、合并单元格、写入 {列字母: 值}
+        if height is not None:
+            self.ws.row_dimensions[row].height = height
+        for style in styles:
+            style.apply(self.ws, row)
+        for ref in merges:
+            self.ws.merge_cells(ref)
+        write_row(self.ws, row, values)
+
+    def save(self, output_path):
+        self.wb.save(output_path)
+
+
+class StreamingOutput:
+    """
+    只写模式的输出表: write_row 的行号必须递增，跳过的行按模板原样写出
+    模板中未被覆盖的行 (如 ME 的 Notes、Item 表头) 在写到该行或保存时补上
+    直接使用 openpyxl 的内部结构，通过 open_output 创建 (版本不符时退回 WorkbookOutput)
+    """
+    streaming = True
+
+    def __init__(self, template_wb):
+        from openpyxl import Workbook
+
+        template = template_wb.active
+        self.wb = Workbook(write_only=True)
+        self.wb.loaded_theme = template_wb.loaded_theme
+        # 各样式表的第 0 项与模板一致: 样式ID为 0 的字体/填充/边框/对齐与就地修改的输出相同 (否则字体会变成 Calibri)
+        for name in ('_fonts', '_fills', '_borders', '_alignments', '_protections'):
+            items = list(getattr(self.wb, name))
+            items[0] = getattr(template_wb, name)[0]
+            setattr(self.wb, name, IndexedList(items))
+        for name, defined_name in template_wb.defined_names.items():
+            self.wb.defined_names[name] = defined_name
+        self.ws = self.wb.create_sheet(template.title)
+        # 未设置样式的单元格使用 xf 0，沿用模板的默认单元格样式 (如 ME 模板默认垂直居中)
+        self.wb._cell_styles = IndexedList([
+            self._register_style(Cell(template, style_array=template_wb._cell_styles[0]))])
+        # append 默认逐个值尝试转换 (传入单元格对象时会先抛出再捕获异常)，这里直接交出已建好的单元格
+        self.ws._values_to_row = self._cells_to_row
+        self._copy_settings(template)
+        # 模板中的单元格: {行: {列: [值, StyleArray]}}，写出后即删除
+        self._template_rows = self._template_cells(template)
+        self._next_row = 1
+
+    def _copy_settings(self, template):
+        ws = self.ws
+        for name in _SHEET_SETTINGS:
+            setattr(ws, name, getattr(template, name))
+        ws.page_setup = template.page_setup
+        ws.page_setup._parent = ws
+        if template.print_title_rows:
+            ws.print_title_rows = template.print_title_rows
+        if template.print_title_cols:
+            ws.print_title_cols = template.print_title_cols
+        if template.print_area:
+            ws.print_area = template.print_area
+        for ref in template.merged_cells.ranges:
+            ws.merged_cells.add(ref.coord)
+        for cf in template.conditional_formatting:
+            for rule in cf.rules:
+                ws.conditional_formatting.add(str(cf.sqref), rule)
+        for key, source in template.column_dimensions.items():
+            target = ws.column_dimensions[key]
+            target.width = source.width
+            target.min, target.max = source.min, source.max
+            target.hidden = source.hidden
+            target.bestFit = source.bestFit
+            target.outlineLevel = source.outlineLevel
+            target.collapsed = source.collapsed
+        for row, source in template.row_dimensions.items():
+            if source.height is not None or source.hidden:
+                target = ws.row_dimensions[row]
+                target.height = source.height
+                target.hidden = source.hidden
+
+    def _template_cells(self, template):
+        rows = {}
+        for (row, column), cell in template._cells.items():
+            if cell.value is None and not cell.has_style:
+                continue
+            style = self._register_style(cell) if cell.has_style else None
+            rows.setdefault(row, {})[column] = [cell.value, style]
+        return rows
+
+    def _register_style(self, cell):
+        # 在输出工作簿中重新登记模板单元格的样式，返回 StyleArray
+        target = Cell(self.ws)
+        target.font = copy(cell.font)
+        target.fill = copy(cell.fill)
+        target.border = copy(cell.border)
+        target.alignment = copy(cell.alignment)
+        target.number_format = cell.number_format
+        target.protection = copy(cell.protection)
+        return target._style
+
+    def add_table(self, title, rows):
+        # 与 WorkbookOutput.add_table 相同；只写模式下各工作表分别写出，不影响输出表的逐行写入
+        ws = self.wb.create_sheet(title)
+        for row in rows:
+            ws.append(row)
+
+    def insert_rows(self, row, amount):
+        # 与 openpyxl 的 insert_rows 一致: 第 row 行及以下的模板单元格下移 amount 行 (行高不移动)
+        if self._next_row > 1:
+            raise RuntimeError("流式输出开始写入后不能再插入行")
+        self._template_rows = {
+            (index + amount if index >= row else index): cells for index, cells in self._template_rows.items()
+        }
+
+    def write_row(self, row, values, styles=(), height=None, merges=()):
+        if row < self._next_row:
+            raise ValueError(f"流式输出只能按行号递增写入: 第 {row} 行已写出")
+        self._flush(row)
+        cells = self._template_rows.pop(row, {})
+        for style in styles:
+            for column, ids in enumerate(style.arrays(self.ws), 1):
+                entry = cells.setdefault(column, [None, None])
+                if entry[1] is None:
+                    # 写出后不再修改，多行共用同一组样式ID
+                    entry[1] = ids
+                    continue
+                # 与 RowStyle.apply 相同: 只替换字体/填充/边框/对齐/数字格式
+                entry[1] = copy(entry[1])
+                entry[1].fontId = ids.fontId
+                entry[1].fillId = ids.fillId
+                entry[1].borderId = ids.borderId
+                entry[1].alignmentId = ids.alignmentId
+                entry[1].numFmtId = ids.numFmtId
+        for ref in merges:
+            self.ws.merged_cells.add(ref)
+        for letter, value in values.items():
+            cells.setdefault(COLUMN_INDEX[letter], [None, None])[0] = value
+        if height is not None:
+            self.ws.row_dimensions[row].height = height
+        self._append(row, cells)
+
+    @staticmethod
+    def _cells_to_row(cells, row_idx):
+        return cells
+
+    def _flush(self, end_row):
+        # 写出 end_row 之前尚未写出的行 (模板行或空行)
+        while self._next_row < end_row:
+            self._append(self._next_row, self._template_rows.pop(self._next_row, {}))
+
+    def _append(self, row, cells):
+        row_cells = []
+        for column in sorted(cells):
+            value, style = cells[column]
+            cell = Cell(self.ws, row=row, column=column, value=value)
+            if style is not None:
+                cell._style = style
+            row_cells.append(cell)
+        self.ws.append(row_cells)
+        # 行高已随该行写出，不再保留
+        self.ws.row_dimensions.pop(row, None)
+        self._next_row = row + 1
+
+    def save(self, output_path):
+        if self._template_rows:
+            self._flush(max(self._template_rows) + 1)
+        self.wb.save(output_path)
+
+
+def open_output(template_wb, streaming=False):
+    # template_wb: 格式模板工作簿 (模板缓存取出的独立副本)
+    # 要求流式输出但 openpyxl 版本未经验证时退回 WorkbookOutput，调用方可由 output.streaming 得知
+    if streaming and streaming_supported():
+        return StreamingOutput(template_wb)
+    return WorkbookOutput(template_wb)
@@ -0,0 +1,123 @@
+"""
+报价流程的分阶段计时 (不依赖 PyQt5)
+
+用法:
+    tracer = make_tracer(enabled)
+    with tracer.span('extract', sheet=name):
+        ...
+启用时记录每个阶段/每个工作表或文件的起止时间，可汇总成日志文本，
+也可写成 Chrome Trace 格式的 JSON (chrome://tracing 或 https://ui.perfetto.dev 打开)。
+未启用时 span() 返回共享的空上下文管理器，几乎没有额外开销。
+"""
+import json
+import os
+import threading
+import time
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    enabled = False
+
+    def span(self, name, **args):
+        return _NULL_SPAN
+
+    def summary_lines(self):
+        return []
+
+    def write(self, path):
+        return None
+
+
+NULL_TRACER = NullTracer()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer._record(self.name, self.start, end - self.start, self.args)
+        return False
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        # (名称, 开始ns, 耗时ns, 线程id, 参数)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def _record(self, name, start, duration, args):
+        with self._lock:
+            self.spans.append((name, start - self.origin, duration, threading.get_ident(), args))
+
+    def totals(self):
+        # {名称: [总耗时ns, 次数]}，按首次出现的顺序
+        totals = {}
+        for name, _, duration, _, _ in self.spans:
+            entry = totals.setdefault(name, [0, 0])
+            entry[0] += duration
+            entry[1] += 1
+        return totals
+
+    def summary_lines(self, top=5):
+        # 各阶段合计耗时，以及耗时最长的几个工作表/文件
+        lines = ["耗时统计:"]
+        for name, (duration, count) in self.totals().items():
+            suffix = f" ({count} 次)" if count > 1 else ""
+            lines.append(f"  {name}: {duration / 1e6:.1f} ms{suffix}")
+        items = [span for span in self.spans if span[4]]
+        if len(items) > 1:
+            lines.append(f"  最慢的 {min(top, len(items))} 项:")
+            for name, _, duration, _, args in sorted(items, key=lambda span: span[2], reverse=True)[:top]:
+                label = ", ".join(f"{key}={value}" for key, value in args.items())
+                lines.append(f"    {name} [{label}]: {duration / 1e6:.1f} ms")
+        return lines
+
+    def write(self, path):
+        # Chrome Trace Event 格式 (完整事件 ph=X，时间单位为微秒)
+        pid = os.getpid()
+        events = [{
+            'name': name, 'cat': 'quote', 'ph': 'X', 'pid': pid, 'tid': tid,
+            'ts': start / 1000, 'dur': duration / 1000,
+            'args': {key: str(value) for key, value in args.items()},
+        } for name, start, duration, tid, args in self.spans]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return path
+
+
+def make_tracer(enabled):
+    return Tracer() if enabled else NULL_TRACER
+
+
+def trace_path(output_path):
+    # Output_IE_xxx.xlsx -> Output_IE_xxx.trace.json
+    return os.path.splitext(output_path)[0] + ".trace.json"
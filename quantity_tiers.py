@@ -0,0 +1,123 @@
+"""
+IE 成本的数量分档 (不依赖 PyQt5)
+
+P/S/W/X/Y 列按月需求量 F (Monthly FCST) 分档取系数。分档表在配置的 quantity_tiers 段
+(默认值见 ConfigManager.DEFAULT_CONFIG)，由此同时生成:
+    - 输出表中的 IF 公式 (tier_formula)，默认分档生成的公式与原有公式逐字相同
+    - 公式求值与数量曲线所用的数组计算 (tier_values)
+
+数量曲线 (options.quantity_curve): 对一组月需求量一次性计算各板卡的单价 (Z 列 MVA)，
+在 IE 输出中写成 Quantity Curve 工作表 (每个板卡一行，每个数量一列)。
+"""
+from config_manager import ConfigManager
+
+# 分档表名 -> 所在的公式列
+TIER_TABLES = {
+    'cost_factor': 'P/S',
+    'loss_rate': 'W',
+    'ohlh_factor': 'X',
+    'sga_factor': 'Y',
+}
+
+DEFAULT_TIERS = ConfigManager.DEFAULT_CONFIG['quantity_tiers']
+
+CURVE_SHEET_TITLE = "Quantity Curve"
+
+
+def _number(value):
+    # 公式中的数值: 整数不带小数点 (1 而不是 1.0)
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def check_tiers(name, tiers):
+    # 分档表格式不对时抛出 ValueError
+    if not isinstance(tiers, list) or not tiers:
+        raise ValueError(f"分档表 {name} 不能为空")
+    for index, tier in enumerate(tiers):
+        bounds = [key for key in ('below', 'upto') if key in tier]
+        last = index == len(tiers) - 1
+        if 'value' not in tier or len(bounds) != (0 if last else 1):
+            raise ValueError(f"分档表 {name} 第 {index + 1} 档格式不对: {tier} "
+                             f"(除最后一档外须有 below 或 upto 之一，最后一档只写 value)")
+        for key in bounds + ['value']:
+            if isinstance(tier[key], bool) or not isinstance(tier[key], (int, float)):
+                raise ValueError(f"分档表 {name} 第 {index + 1} 档的 {key} 须为数值: {tier}")
+
+
+def tier_tables(config):
+    # 配置中的分档表 (缺少的用默认值)，逐个检查格式
+    tables = dict(DEFAULT_TIERS)
+    tables.update(config.get('quantity_tiers') or {})
+    for name in TIER_TABLES:
+        check_tiers(name, tables[name])
+    return tables
+
+
+def tier_formula(tiers, ref):
+    """
+    生成嵌套 IF 公式 (不含 =)；ref 为数量所在的单元格
+    below 档写作 IF(ref<上限,值,...)，upto 档写作 IF(ref>上限,...,值)
+    """
+    tier = tiers[0]
+    if len(tiers) == 1:
+        return _number(tier['value'])
+    rest = tier_formula(tiers[1:], ref)
+    if 'below' in tier:
+        return f"IF({ref}<{_number(tier['below'])},{_number(tier['value'])},{rest})"
+    return f"IF({ref}>{_number(tier['upto'])},{rest},{_number(tier['value'])})"
+
+
+def tier_values(tiers, quantities):
+    # 数组计算: 每个数量所在档的值 (与 tier_formula 的公式结果相同)
+    import numpy as np
+
+    quantities = np.asarray(quantities, dtype=float)
+    result = np.full(quantities.shape, float(tiers[-1]['value']))
+    for tier in reversed(tiers[:-1]):
+        if 'below' in tier:
+            condition = quantities < tier['below']
+        else:
+            condition = quantities <= tier['upto']
+        result = np.where(condition, float(tier['value']), result)
+    return result
+
+
+def ie_tier_formulas(tables):
+    # 各分档表的公式模板 ({n} 为行号)，写入输出表时按行填入
+    return {name: tier_formula(tables[name], "F{n}") for name in TIER_TABLES}
+
+
+DEFAULT_FORMULAS = ie_tier_formulas(DEFAULT_TIERS)
+
+
+def quantity_list(config):
+    # options.quantity_curve: 数量列表 (去重后升序)；格式不对时抛出 ValueError
+    quantities = config.get('options', {}).get('quantity_curve') or []
+    try:
+        values = sorted({float(q) for q in quantities})
+    except (TypeError, ValueError):
+        raise ValueError(f"quantity_curve 须为数量列表: {quantities}")
+    if any(q < 0 for q in values):
+        raise ValueError(f"quantity_curve 中的数量不能为负数: {quantities}")
+    return values
+
+
+def curve_rows(source_records, params, quantities, tables):
+    """
+    Quantity Curve 工作表各行 (含表头)
+    source_records: [(源文件名, IeSheetRecord 列表)]；params: (Handling, U/P-DL, U/P-OH)
+    各数量下的 Z 列 (MVA) 在一次数组计算中得出: (数量数, 板卡数)
+    """
+    import formula_eval
+
+    yield ["Source", "Sheet", "Program Name"] + [int(q) if q.is_integer() else q for q in quantities]
+    for source_file, records in source_records:
+        if not records:
+            continue
+        columns = formula_eval.ie_columns(formula_eval.ie_record_inputs(records), *params,
+                                          fcst=quantities, tiers=tables)
+        mva = columns['Z']
+        for j, record in enumerate(records):
+            yield [source_file, record.sheet_name, record.project_name] + [
+                float(value) if value == value else None for value in mva[:, j]]
@@ -0,0 +1,276 @@
+"""
+报价数据的列式导出 (不依赖 PyQt5)
+
+与 Excel 输出同一次运行中，把提取结果与计算出的各项成本按表导出，供成本分析直接查询，
+不必再打开输出工作簿:
+    csv      {输出文件名}.{表名}.csv (UTF-8 带 BOM，Excel 可直接打开)
+    parquet  {输出文件名}.{表名}.parquet (需要安装 pyarrow)
+    sqlite   {输出文件名}.sqlite，每个表一张数据表
+
+各表按批写出 (每批 BATCH_SIZE 行)，不在内存中拼出整张表。
+数值与输出表中的公式结果一致 (formula_eval 计算)；文本等无法计算的单元格导出为空值。
+"""
+import csv
+import math
+import os
+import sqlite3
+
+EXPORT_FORMATS = ('csv', 'parquet', 'sqlite')
+
+BATCH_SIZE = 10000
+
+# 表结构: [(列名, 类型)]，类型为 TEXT / REAL / INTEGER
+# IE: 每个源工作表一行，对应输出表第3行起的各列；工时单位为秒/pcs，金额单位为 US$
+IE_SHEET_COLUMNS = [
+    ('source_file', 'TEXT'),
+    ('sheet_name', 'TEXT'),
+    ('program_name', 'TEXT'),        # C
+    ('pcs_per_panel', 'REAL'),       # E
+    ('smt_time', 'REAL'),            # G
+    ('asm_time', 'REAL'),            # H
+    ('routing_time', 'REAL'),        # I
+    ('packing_time', 'REAL'),        # J
+    ('ict', 'REAL'),                 # K
+    ('handling', 'REAL'),            # M
+    ('total_time_dl', 'REAL'),       # N
+    ('up_dl', 'REAL'),               # O
+    ('dl_cost', 'REAL'),             # P
+    ('total_time_oh', 'REAL'),       # Q
+    ('up_oh', 'REAL'),               # R
+    ('oh_cost', 'REAL'),             # S
+    ('dl_oh_cost', 'REAL'),          # T
+    ('loss', 'REAL'),                # W
+    ('ohlh', 'REAL'),                # X
+    ('sga', 'REAL'),                 # Y
+    ('mva', 'REAL'),                 # Z
+]
+
+# ME: 每块板卡一行，对应输出表板卡行；无尾部物料 (Wave Solder Carrier) 时 wave_carrier_* 为空
+ME_BOARD_COLUMNS = [
+    ('board_no', 'INTEGER'),         # B
+    ('file_name', 'TEXT'),
+    ('board_name', 'TEXT'),          # C
+    ('stencil_qty', 'REAL'),         # G
+    ('stencil_up', 'REAL'),          # H
+    ('stencil_amt', 'REAL'),         # I
+    ('smt_carrier_qty', 'REAL'),     # J
+    ('smt_carrier_up', 'REAL'),      # K
+    ('smt_carrier_amt', 'REAL'),     # L
+    ('wave_carrier_qty', 'REAL'),    # M
+    ('wave_carrier_up', 'REAL'),     # N
+    ('wave_carrier_amt', 'REAL'),    # O
+    ('other_fixture_amt', 'REAL'),   # P
+    ('total', 'REAL'),               # X 未税
+    ('total_tax', 'REAL'),           # Y 含税
+]
+
+# ME 治具明细: 每个板卡文件第4~10行中数量非0的物料一行
+ME_PART_COLUMNS = [
+    ('board_no', 'INTEGER'),         # G
+    ('part_name', 'TEXT'),           # C
+    ('qty', 'REAL'),                 # D
+    ('unit_price', 'REAL'),          # E
+    ('amount', 'REAL'),              # F
+]
+
+
+def parse_formats(value):
+    # 配置/命令行中的导出格式: 列表或逗号分隔的字符串；未知格式抛出 ValueError
+    if isinstance(value, str):
+        value = value.split(',')
+    formats = []
+    for name in value or ():
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in EXPORT_FORMATS:
+            raise ValueError(f"无效的导出格式: {name} (可选 {', '.join(EXPORT_FORMATS)})")
+        if name not in formats:
+            formats.append(name)
+    return formats
+
+
+def _real(value):
+    # 数值列: 文本与 NaN 导出为空值 (numpy 数值转为 float)
+    if value is None or isinstance(value, str):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def ie_sheet_rows(source_file, records, params, tiers=None):
+    # records: IeSheetRecord 列表；params: (Handling, U/P-DL, U/P-OH)；tiers: 数量分档表
+    import formula_eval
+
+    if not records:
+        return
+    handling, upusdl, upusoh = params
+    columns = formula_eval.ie_columns(formula_eval.ie_record_inputs(records), *params, tiers=tiers)
+    for i, record in enumerate(records):
+        yield (
+            source_file, record.sheet_name, record.project_name, _real(record.panel_qty or 0),
+            _real(columns['G'][i]), _real(columns['H'][i]), _real(columns['I'][i]), _real(columns['J'][i]),
+            _real(record.ict), handling, _real(columns['N'][i]), upusdl, _real(columns['P'][i]),
+            _real(record.machine_time), upusoh, _real(columns['S'][i]), _real(columns['T'][i]),
+            _real(columns['W'][i]), _real(columns['X'][i]), _real(columns['Y'][i]), _real(columns['Z'][i]),
+        )
+
+
+def me_board_rows(records, stencil_qty, smt_qty, qty):
+    import formula_eval
+
+    if not records:
+        return
+    columns, has_tail, _ = formula_eval.me_columns(records, stencil_qty, smt_qty, qty)
+    for i, record in enumerate(records):
+        tail = bool(has_tail[i])
+        yield (
+            i + 1, record.file_name, record.board_name,
+            stencil_qty, _real(columns['H'][i]), _real(columns['I'][i]),
+            smt_qty, _real(columns['K'][i]), _real(columns['L'][i]),
+            qty if tail else None, _real(columns['N'][i]) if tail else None,
+            _real(columns['O'][i]) if tail else None,
+            _real(columns['P'][i]), _real(columns['X'][i]), _real(columns['Y'][i]),
+        )
+
+
+def me_part_rows(records):
+    for board_no, record in enumerate(records, start=1):
+        for name, amount, part_qty in record.parts:
+            unit_price = amount * 1.1
+            qty = _real(part_qty)
+            yield board_no, name, qty, unit_price, None if qty is None else qty * unit_price
+
+
+# ==========================================
+# 各格式的流式写出
+# ==========================================
+class CsvTableWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write_batch(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class SqliteTableWriter:
+    # 同一输出的各表写入同一个数据库文件，由 export_tables 统一提交
+    def __init__(self, connection, table, columns, indexes=()):
+        self.connection = connection
+        definition = ", ".join(f'"{name}" {kind}' for name, kind in columns)
+        connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        connection.execute(f'CREATE TABLE "{table}" ({definition})')
+        for column in indexes:
+            connection.execute(f'CREATE INDEX "{table}_{column}" ON "{table}" ("{column}")')
+        placeholders = ", ".join("?" * len(columns))
+        self._insert = f'INSERT INTO "{table}" VALUES ({placeholders})'
+
+    def write_batch(self, rows):
+        self.connection.executemany(self._insert, rows)
+
+    def close(self):
+        pass
+
+
+PARQUET_TYPES = {'TEXT': 'string', 'REAL': 'float64', 'INTEGER': 'int64'}
+
+
+class ParquetTableWriter:
+    # 每批写成一个 row group
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("导出 parquet 需要安装 pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self.path = path
+        self.schema = pa.schema([(name, getattr(pa, PARQUET_TYPES[kind])()) for name, kind in columns])
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows):
+        arrays = [self._pa.array(values, type=field.type)
+                  for values, field in zip(zip(*rows), self.schema)]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_paths(output_path, table_names, formats):
+    # {(格式, 表名): 导出文件路径}；sqlite 各表共用一个文件
+    base = os.path.splitext(output_path)[0]
+    paths = {}
+    for fmt in formats:
+        for table in table_names:
+            paths[fmt, table] = f"{base}.sqlite" if fmt == 'sqlite' else f"{base}.{table}.{fmt}"
+    return paths
+
+
+def export_tables(output_path, tables, formats, batch_size=BATCH_SIZE):
+    """
+    tables: [(表名, 表结构, 行迭代器, 建索引的列)]，每个表的行只遍历一次，逐批写入各格式
+    返回写出的文件路径列表；失败时删除本次写了一半的文件
+    """
+    formats = parse_formats(formats)
+    paths = export_paths(output_path, [table for table, *_ in tables], formats)
+    written = []
+    connection = None
+    try:
+        if 'sqlite' in formats:
+            sqlite_path = paths['sqlite', tables[0][0]]
+            if os.path.exists(sqlite_path):
+                os.remove(sqlite_path)
+            written.append(sqlite_path)
+            connection = sqlite3.connect(sqlite_path)
+        for table, columns, rows, indexes in tables:
+            writers = []
+            try:
+                for fmt in formats:
+                    if fmt == 'sqlite':
+                        writers.append(SqliteTableWriter(connection, table, columns, indexes))
+                        continue
+                    path = paths[fmt, table]
+                    written.append(path)
+                    writers.append(CsvTableWriter(path, columns) if fmt == 'csv'
+                                   else ParquetTableWriter(path, columns))
+                for batch in _batches(rows, batch_size):
+                    for writer in writers:
+                        writer.write_batch(batch)
+            finally:
+                for writer in writers:
+                    writer.close()
+        if connection is not None:
+            connection.commit()
+    except BaseException:
+        if connection is not None:
+            connection.close()
+            connection = None
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if connection is not None:
+            connection.close()
+    return written
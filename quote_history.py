@@ -0,0 +1,183 @@
+"""
+报价历史库 (不依赖 PyQt5)
+
+每次报价成功后，把运行信息 (时间、源路径、输出文件、报价参数) 与每个工作表/板卡的结果
+记入 cache_dir 下的 SQLite 数据库 (quote_history.sqlite)。查询只读这个库，不打开任何 Excel 文件:
+    IE  按 Project name (program_name) 与日期查询各工作表的工时与成本
+    ME  按板卡名称 (board_name) 与日期查询各板卡的治具成本
+
+名称条件不区分大小写；含 * / ? 通配符时按模式匹配，否则按完整名称匹配。
+日期条件为 YYYY-MM-DD，包含起止两天。
+"""
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from config_manager import resolve_cache_dir
+from quote_export import IE_SHEET_COLUMNS, ME_BOARD_COLUMNS
+
+HISTORY_FILE = 'quote_history.sqlite'
+
+# 表结构变更时递增 (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+# 报价参数: 配置 params 中的键 -> runs 表列名
+PARAM_COLUMNS = [
+    ('Handling', 'handling'),
+    ('UPUSDL', 'upusdl'),
+    ('UPUSOH', 'upusoh'),
+    ('StencilQty', 'stencil_qty'),
+    ('SMTCarrierQty', 'smt_carrier_qty'),
+    ('Qty', 'qty'),
+]
+
+RUN_COLUMNS = [
+    ('id', 'INTEGER PRIMARY KEY'),
+    ('kind', 'TEXT'),
+    ('created_at', 'TEXT'),
+    ('source_path', 'TEXT'),
+    ('output_path', 'TEXT'),
+] + [(column, 'REAL') for _, column in PARAM_COLUMNS]
+
+# 各报价类型: (结果表, 结果表结构, 查询名称所用的列)
+KINDS = {
+    'ie': ('ie_sheets', IE_SHEET_COLUMNS, 'program_name'),
+    'me': ('me_boards', ME_BOARD_COLUMNS, 'board_name'),
+}
+
+# 查询结果默认显示的列 (界面与命令行共用)
+SUMMARY_COLUMNS = {
+    'ie': ['created_at', 'program_name', 'sheet_name', 'source_file', 'handling', 'upusdl', 'upusoh',
+           'total_time_dl', 'dl_cost', 'total_time_oh', 'oh_cost', 'mva', 'output_path'],
+    'me': ['created_at', 'board_name', 'file_name', 'stencil_qty', 'smt_carrier_qty', 'qty',
+           'stencil_amt', 'smt_carrier_amt', 'wave_carrier_amt', 'other_fixture_amt', 'total', 'total_tax',
+           'output_path'],
+}
+
+
+def history_path(config):
+    # options.quote_history 关闭或未设置 cache_dir 时返回 None (不记录历史)
+    options = config.get('options', {})
+    if not options.get('quote_history', True) or not options.get('cache_dir'):
+        return None
+    return os.path.join(resolve_cache_dir(options['cache_dir']), HISTORY_FILE)
+
+
+def parse_date(value):
+    # YYYY-MM-DD -> date；格式不对时抛出 ValueError
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def format_value(value):
+    # 显示用: 数值最多保留 4 位小数，空值显示为空
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:.4f}".rstrip('0').rstrip('.')
+    return str(value)
+
+
+def _param(params, key):
+    try:
+        return float(params[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _name_condition(column, pattern):
+    # 通配符 * / ? 转为 LIKE；列使用 NOCASE 排序规则，前缀模式与完整名称都可以走索引
+    if '*' in pattern or '?' in pattern:
+        escaped = pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f'{column} LIKE ? ESCAPE \'\\\'', escaped.replace('*', '%').replace('?', '_')
+    return f'{column} = ?', pattern
+
+
+class QuoteHistory:
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 批量报价的多个进程可能同时写入: WAL 模式下读写互不阻塞，写入之间等待锁
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self._ensure_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _ensure_schema(self):
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        with self.connection:
+            runs = ", ".join(f'{name} {kind}' for name, kind in RUN_COLUMNS)
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS runs ({runs})')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS runs_created_at ON runs (created_at)')
+            for table, columns, name_column in KINDS.values():
+                definition = ", ".join(
+                    f'{name} {kind}' + (' COLLATE NOCASE' if name == name_column else '')
+                    for name, kind in columns)
+                self.connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} (run_id INTEGER REFERENCES runs (id), {definition})')
+                self.connection.execute(f'CREATE INDEX IF NOT EXISTS {table}_run ON {table} (run_id)')
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{name_column} ON {table} ({name_column})')
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def record_run(self, kind, source_path, output_path, params, rows, created_at=None):
+        """
+        记录一次报价: rows 为 quote_export 生成的结果行 (ie_sheet_rows / me_board_rows)
+        params: 配置中的 params 段；返回运行编号
+        """
+        table, columns, _ = KINDS[kind]
+        created_at = (created_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        with self.connection:
+            cursor = self.connection.execute(
+                f'INSERT INTO runs ({", ".join(name for name, _ in RUN_COLUMNS[1:])}) '
+                f'VALUES ({", ".join("?" * (len(RUN_COLUMNS) - 1))})',
+                [kind, created_at, os.path.abspath(source_path), os.path.abspath(output_path)] +
+                [_param(params, key) for key, _ in PARAM_COLUMNS])
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                f'INSERT INTO {table} VALUES ({", ".join("?" * (len(columns) + 1))})',
+                ((run_id,) + tuple(row) for row in rows))
+        return run_id
+
+    def find(self, kind, name=None, since=None, until=None, limit=500):
+        """
+        按名称 (IE 为 Project name，ME 为板卡名称) 与日期查询，最新的运行在前
+        since / until: date 或 YYYY-MM-DD；返回 sqlite3.Row 列表 (运行信息与结果列)
+        """
+        table, _, name_column = KINDS[kind]
+        conditions, args = ['r.kind = ?'], [kind]
+        if name:
+            condition, arg = _name_condition(f't.{name_column}', name)
+            conditions.append(condition)
+            args.append(arg)
+        if since:
+            since = parse_date(since) if isinstance(since, str) else since
+            conditions.append('r.created_at >= ?')
+            args.append(since.strftime('%Y-%m-%d'))
+        if until:
+            until = parse_date(until) if isinstance(until, str) else until
+            conditions.append('r.created_at < ?')
+            args.append((until + timedelta(days=1)).strftime('%Y-%m-%d'))
+        sql = (f'SELECT r.*, t.* FROM {table} t JOIN runs r ON r.id = t.run_id '
+               f'WHERE {" AND ".join(conditions)} ORDER BY r.created_at DESC, r.id DESC, t.rowid')
+        if limit:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+        return self.connection.execute(sql, args).fetchall()
+
+    def runs(self, kind=None, limit=50):
+        # 最近的运行记录
+        sql = 'SELECT * FROM runs' + (' WHERE kind = ?' if kind else '') + ' ORDER BY id DESC LIMIT ?'
+        return self.connection.execute(sql, ([kind] if kind else []) + [int(limit)]).fetchall()
@@ -0,0 +1,823 @@
+"""
+IE / ME 报价流程，不依赖 PyQt5
+
+界面工作线程 (main.py)、命令行 (cli.py) 与其它脚本共用。
+log / progress 回调分别接收日志文本与 0-100 的进度值。
+"""
+import multiprocessing
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import chain
+from queue import Empty
+
+from checkpoint import CancelToken, Cancelled, NULL_CHECKPOINT, open_checkpoint, source_fingerprint
+from excel_tools import extract_ie_rows, natural_sort_key, iter_me_records, MeLayout
+from extract_cache import get_extract_cache, ie_sheet_keys
+from output_writer import open_output
+import quote_export
+import quote_history
+from perf_trace import NULL_TRACER, make_tracer, trace_path
+from quantity_tiers import CURVE_SHEET_TITLE, DEFAULT_FORMULAS, curve_rows, ie_tier_formulas, quantity_list, \
+    tier_tables
+from template_cache import get_template_cache
+from xlsx_reader import open_column_reader
+
+
+def _ignore(*args):
+    pass
+
+
+def _formula_mode(config):
+    mode = config.get('options', {}).get('formula_values', 'formula')
+    if mode not in ('formula', 'cached', 'values'):
+        raise ValueError(f"无效的 formula_values 选项: {mode}")
+    return mode
+
+
+def _save_with_values(output, output_path, mode, sheets, log, tracer, live_columns=()):
+    """
+    按 formula_values 选项保存: 只写公式 / 公式加缓存值 / 只写数值
+    sheets: [(工作表, evaluate)]，evaluate(formula_eval) 返回该表 {坐标: 计算结果}
+    live_columns: 引用待填单元格的公式列，values 模式下仍写公式 (附缓存值)
+    """
+    try:
+        _save_output(output, output_path, mode, sheets, log, tracer, live_columns)
+    except BaseException:
+        # 不留下占位的空文件或写了一半的输出
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+
+def _save_output(output, output_path, mode, sheets, log, tracer, live_columns):
+    if mode == 'formula':
+        with tracer.span('save'):
+            output.save(output_path)
+        return
+    import formula_eval
+
+    log("正在计算公式结果...")
+    with tracer.span('evaluate'):
+        sheet_values = [(ws, evaluate(formula_eval)) for ws, evaluate in sheets]
+    if mode == 'values' and not output.streaming:
+        with tracer.span('evaluate'):
+            for ws, values in sheet_values:
+                formula_eval.apply_values(ws, values, live_columns)
+        with tracer.span('save'):
+            output.save(output_path)
+        if live_columns:
+            # 保留下来的公式补上缓存值
+            with tracer.span('cached_values'):
+                formula_eval.write_cached_values(output_path, sheet_values)
+    else:
+        # 流式输出的行已经写出，values 模式同样在保存后改写 XML
+        with tracer.span('save'):
+            output.save(output_path)
+        with tracer.span('cached_values'):
+            formula_eval.write_cached_values(output_path, sheet_values, keep_formulas=mode == 'cached',
+                                             live_columns=live_columns)
+
+
+def _report_trace(tracer, output_path, log):
+    # 启用计时时: 日志中输出各阶段耗时汇总，并在输出文件旁写入 Chrome Trace 文件
+    if not tracer.enabled:
+        return
+    path = tracer.write(trace_path(output_path))
+    log("\n".join(tracer.summary_lines() + [f"计时文件: {path}"]))
+
+
+def _extract_cache(config):
+    options = config.get('options', {})
+    if not options.get('extract_cache', True):
+        return None
+    return get_extract_cache(options.get('cache_dir'))
+
+
+def _checkpointed(records, checkpoint, cancel, item_key):
+    # 逐个转交记录: 取下一个 (即开始提取) 之前检查取消，转交后记入断点
+    try:
+        cancel.check()
+        for record in records:
+            checkpoint.add(item_key(record), record)
+            yield record
+            cancel.check()
+    finally:
+        # 取消或出错时立即结束底层的提取 (关闭源文件、停止进程池)
+        close = getattr(records, 'close', None)
+        if close is not None:
+            close()
+
+
+def _save_checkpoint(checkpoint, log):
+    # 运行失败或取消时写入断点；写入失败只记入日志，不掩盖原来的异常
+    try:
+        checkpoint.save()
+    except OSError as e:
+        log(f"写入断点失败: {e}")
+
+
+def _export_formats(config):
+    return quote_export.parse_formats(config.get('options', {}).get('export_formats', []))
+
+
+def _export(config, output_path, tables, log, tracer):
+    """
+    按 export_formats 选项把提取结果与计算结果导出到输出文件旁 (见 quote_export)
+    tables() 返回 [(表名, 表结构, 行迭代器, 建索引的列)]，未启用导出时不调用
+    导出失败只记入日志，不影响已保存的输出文件
+    """
+    formats = _export_formats(config)
+    if not formats:
+        return
+    log(f"正在导出: {', '.join(formats)}")
+    try:
+        with tracer.span('export'):
+            paths = quote_export.export_tables(output_path, tables(), formats)
+    except Exception as e:
+        log(f"导出失败: {e}")
+        return
+    log("导出文件:\n" + "\n".join(paths))
+
+
+def _record_history(config, kind, output_path, runs, log, tracer):
+    """
+    报价成功后记入历史库 (见 quote_history)；options.quote_history 关闭或无 cache_dir 时不记录
+    runs: [(源路径, 结果行迭代器)]，合并输出时每个源文件一条运行记录
+    写入失败只记入日志
+    """
+    path = quote_history.history_path(config)
+    if path is None:
+        return
+    try:
+        with tracer.span('history'):
+            with quote_history.QuoteHistory(path) as history:
+                for source_path, rows in runs:
+                    history.record_run(kind, source_path, output_path, config['params'], rows)
+    except Exception as e:
+        log(f"写入报价历史失败: {e}")
+
+
+def _ie_export_table(source_records, params, tiers):
+    # source_records: [(源文件路径, 该源已写入的 IeSheetRecord 列表)]
+    rows = chain.from_iterable(quote_export.ie_sheet_rows(os.path.basename(source_path), records, params, tiers)
+                               for source_path, records in source_records)
+    return 'ie_sheets', quote_export.IE_SHEET_COLUMNS, rows, ('sheet_name',)
+
+
+def make_output_path(output_dir, prefix):
+    # 按时间戳命名输出文件；同一秒内多次输出时追加序号，避免互相覆盖
+    # 以独占方式先创建空文件占位，批量报价的多个进程同时取名也不会冲突
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(output_dir, f"{prefix}_{timestamp}.xlsx")
+    suffix = 1
+    while True:
+        try:
+            with open(output_path, 'x'):
+                return output_path
+        except FileExistsError:
+            output_path = os.path.join(output_dir, f"{prefix}_{timestamp}_{suffix}.xlsx")
+            suffix += 1
+
+
+# 引用待填单元格的 IE 公式列 (含间接引用): F (Monthly FCST)、L (FCT) 与 V (BOM) 留给用户填写，
+# 求值时按 0 计算，换成数值后填写也不会更新，所以 values 模式下这些列仍写公式 (附缓存值)
+IE_LIVE_COLUMNS = frozenset('NPSTUWXYZ')
+
+
+def ie_row_values(n, record, val_handling, val_upusdl, val_upusoh, formulas=DEFAULT_FORMULAS):
+    # IE 输出表第 n 行 (一个源工作表) 的 {列字母: 值}
+    # formulas: 数量分档的 IF 公式模板 (quantity_tiers.ie_tier_formulas)
+    cost_factor = formulas['cost_factor'].format(n=n)
+    return {
+        'C': record.project_name,
+        'E': record.panel_qty or 0,
+        'G': f"={record.smt_time}/0.8",
+        'H': f"={record.asm_time}/0.8",
+        'I': f"={record.routing_time}/0.8",
+        'J': f"={record.packing_time}/0.8",
+        'K': record.ict,
+        # === 使用配置中的变量 ===
+        'M': val_handling,  # 原代码是 60
+        # 公式
+        'N': f"=SUM(G{n}:M{n})",
+        'O': val_upusdl,  # 原代码是 34.3
+        'P': f"=ROUND((O{n}*N{n}/3600)*{cost_factor},2)",
+        'Q': record.machine_time,
+        'R': val_upusoh,  # 原代码是 162.8
+        'S': f"=ROUND((R{n}*Q{n}/3600)*{cost_factor},2)",
+        'T': f"=SUM(P{n},S{n})",
+        'U': f"=F{n}",
+        'W': f"=V{n}*{formulas['loss_rate'].format(n=n)}",
+        'X': f"=ROUNDUP(P{n}*{formulas['ohlh_factor'].format(n=n)},2)",
+        'Y': f"=ROUNDUP(P{n}*{formulas['sga_factor'].format(n=n)},2)",
+        'Z': f"=ROUNDUP(SUM(T{n},W{n}:Y{n}),2)",
+    }
+
+
+def iter_ie_records(source_path, config, log=_ignore, progress=_ignore, tracer=NULL_TRACER, skip=0):
+    # 按工作表顺序逐个产出 IeSheetRecord；调用方处理完一个结果后才更新进度
+    # skip: 跳过前 skip 个工作表 (已从断点取得结果)
+    streaming = config.get('options', {}).get('ie_streaming', True)
+    # openpyxl: 经 load_workbook 读取；xml: 直接解析工作表 XML，只取 B/C 两列
+    reader_name = config.get('options', {}).get('ie_reader', 'openpyxl')
+
+    # 提取结果按工作表内容哈希缓存，只解析新增或改动过的工作表
+    extract_cache = _extract_cache(config)
+    reader = None
+    cached_sheets = 0
+    # 取消、出错或调用方提前关闭生成器时同样关闭源文件，并写回已提取的结果
+    try:
+        with tracer.span('open_source'):
+            sheet_keys = ie_sheet_keys(source_path) if extract_cache is not None else None
+            if sheet_keys is None:
+                # 流式模式: 只读打开源文件，逐表解析XML，内存不随工作表数量增长
+                reader = open_column_reader(source_path, reader_name, streaming)
+                sheet_names = reader.sheetnames
+            else:
+                sheet_names = list(sheet_keys)
+
+        total_sheets = len(sheet_names)
+
+        for idx, sheet_name in enumerate(sheet_names[skip:], start=skip):
+            log(f"处理工作表 [{idx + 1}/{total_sheets}]: {sheet_name}")
+
+            with tracer.span('extract', sheet=sheet_name):
+                key = sheet_keys[sheet_name] if sheet_keys is not None else None
+                record = extract_cache.get(key) if key is not None else None
+                if record is None:
+                    if reader is None:
+                        reader = open_column_reader(source_path, reader_name, streaming)
+                    rows = reader.iter_rows(sheet_name, ('B', 'C'))
+                    record = extract_ie_rows(rows, sheet_name)
+                    # 所需标签找齐后提前结束时，立即关闭该表的 XML 流
+                    rows.close()
+                    if key is not None:
+                        extract_cache.put(key, record)
+                else:
+                    cached_sheets += 1
+
+            yield record
+
+            # 更新进度条
+            progress(int(((idx + 1) / total_sheets) * 100))
+    finally:
+        if reader is not None:
+            reader.close()
+        if extract_cache is not None:
+            if cached_sheets:
+                log(f"{cached_sheets} 个工作表未改动，使用缓存的提取结果")
+            extract_cache.flush()
+
+
+def _write_ie_rows(output, records, row_style, params, formulas, tracer):
+    # 从第3行起每个源工作表写一行；返回已写入的记录 (公式求值与导出使用)
+    written = []
+    for n, record in enumerate(records, start=3):
+        with tracer.span('write', sheet=record.sheet_name):
+            # 行高 31，套用样式后写入
+            output.write_row(n, ie_row_values(n, record, *params, formulas=formulas), (row_style,), 31)
+        written.append(record)
+    return written
+
+
+def _ie_params(config):
+    # (Handling, U/P-DL, U/P-OH)
+    return (float(config['params']['Handling']), float(config['params']['UPUSDL']),
+            float(config['params']['UPUSOH']))
+
+
+def _write_quantity_curve(output, config, source_records, params, tiers, log, tracer):
+    # options.quantity_curve 非空时增加 Quantity Curve 工作表 (见 quantity_tiers)
+    quantities = quantity_list(config)
+    if not quantities:
+        return
+    log(f"正在计算数量曲线: {len(quantities)} 个数量")
+    rows = curve_rows([(os.path.basename(path), records) for path, records in source_records],
+                      params, quantities, tiers)
+    with tracer.span('quantity_curve'):
+        output.add_table(CURVE_SHEET_TITLE, rows)
+
+
+def _check_templates(format_path, decorate_path):
+    if not os.path.exists(format_path):
+        raise FileNotFoundError(f"找不到格式文件: {format_path}")
+    if not os.path.exists(decorate_path):
+        raise FileNotFoundError(f"找不到修饰文件: {decorate_path}")
+
+
+def run_ie_quote(source_path, config, log=_ignore, progress=_ignore, output_dir=None, cancel=None):
+    # IE 报价: source_path 为源 xlsx 文件，每个工作表输出一行；返回输出文件路径
+    # cancel: CancelToken，取消时抛出 Cancelled；失败或取消后再次运行从断点继续
+    log("正在初始化...")
+    cancel = cancel or CancelToken()
+
+    # 读取配置
+    format_path = config['paths']['format_path']
+    decorate_path = config['paths']['decorate_path']
+
+    params = _ie_params(config)
+    tiers = tier_tables(config)
+    quantity_list(config)  # 数量列表有误时在处理前报错
+    stream_output = config.get('options', {}).get('stream_output', False)
+    formula_mode = _formula_mode(config)
+    _export_formats(config)  # 导出格式有误时在处理前报错
+    tracer = make_tracer(config.get('options', {}).get('trace', False))
+
+    # 检查文件存在
+    _check_templates(format_path, decorate_path)
+
+    log("正在加载工作簿 (这可能需要几秒钟)...")
+
+    # 格式/样式模板走缓存，文件未改动时不重新解析
+    template_cache = get_template_cache(config.get('options', {}).get('cache_dir'))
+    with tracer.span('template'):
+        output = open_output(template_cache.load_format(format_path), stream_output)
+    if stream_output and not output.streaming:
+        log("当前 openpyxl 版本未经流式输出验证，改为普通方式写出")
+
+    # 获取样式 (整行登记一次，之后按行套用)
+    log("正在读取样式模板...")
+    # 注意：原代码假定取第3行的样式
+    with tracer.span('template'):
+        row_style, = template_cache.load_decorate(decorate_path, rows=(3,))
+
+    # 源文件未改动时，断点中已提取的工作表直接取用
+    checkpoint = open_checkpoint(config, 'ie', source_path, source_fingerprint(source_path))
+    resumed = checkpoint.resume()
+    if resumed:
+        log(f"从断点继续: 前 {len(resumed)} 个工作表使用上次已提取的结果")
+
+    try:
+        # 边提取边写入，流式输出时已写出的行不再占用内存
+        records = _checkpointed(iter_ie_records(source_path, config, log, progress, tracer, skip=len(resumed)),
+                                checkpoint, cancel, lambda record: record.sheet_name)
+        written = _write_ie_rows(output, chain(resumed, records), row_style, params, ie_tier_formulas(tiers), tracer)
+        _write_quantity_curve(output, config, [(source_path, written)], params, tiers, log, tracer)
+
+        # 保存文件
+        output_path = make_output_path(output_dir or os.path.dirname(source_path), "Output_IE")
+
+        log(f"正在保存文件: {output_path}")
+        _save_with_values(output, output_path, formula_mode, [
+            (output.ws, lambda fe: fe.evaluate_ie(3, fe.ie_record_inputs(written), *params, tiers=tiers)),
+        ], log, tracer, IE_LIVE_COLUMNS)
+    except BaseException:
+        _save_checkpoint(checkpoint, log)
+        raise
+    checkpoint.discard()
+    _export(config, output_path, lambda: [_ie_export_table([(source_path, written)], params, tiers)], log, tracer)
+    _record_history(config, 'ie', output_path, [
+        (source_path, quote_export.ie_sheet_rows(os.path.basename(source_path), written, params, tiers)),
+    ], log, tracer)
+    _report_trace(tracer, output_path, log)
+
+    return output_path
+
+
+def run_ie_sweep(source_path, config, scenarios, log=_ignore, progress=_ignore, cancel=None):
+    """
+    IE 参数扫描: 源文件只提取一次，对 scenarios [(Handling, U/P-DL, U/P-OH)] 逐一计算成本 (见 quote_sweep)
+    对照参数取配置中的当前值；不生成输出工作簿
+    返回 (IeSheetRecord 列表, 对比表行列表, 各成本列的 (方案数, 工作表数) 数组)
+    """
+    import quote_sweep
+
+    cancel = cancel or CancelToken()
+    records = list(_checkpointed(iter_ie_records(source_path, config, log, progress),
+                                 NULL_CHECKPOINT, cancel, lambda record: None))
+    if not records:
+        raise ValueError(f"源文件中没有工作表: {source_path}")
+    log(f"正在计算 {len(scenarios)} 个方案...")
+    rows, sheet_columns = quote_sweep.sweep_ie(records, scenarios, _ie_params(config), tier_tables(config))
+    return records, rows, sheet_columns
+
+
+# ==========================================
+# IE 批量报价 (多个源文件并行)
+# ==========================================
+# 批量结果: output_path 为 None 时 error 为失败原因；合并输出时成功的源共用同一个 output_path
+IeBatchResult = namedtuple('IeBatchResult', ['source_path', 'output_path', 'error'])
+
+# 进程池子进程中的消息队列: (源序号, 'log' / 'progress', 内容)
+_batch_queue = None
+
+
+def _init_batch_worker(queue):
+    global _batch_queue
+    _batch_queue = queue
+
+
+def _batch_job(index, source_path, config, output_dir, merge):
+    # 子进程中运行: 日志与进度经队列送回主进程；合并输出时只提取，不写文件
+    def log(msg):
+        _batch_queue.put((index, 'log', msg))
+
+    def progress(value):
+        _batch_queue.put((index, 'progress', value))
+
+    if merge:
+        return list(iter_ie_records(source_path, config, log, progress))
+    return run_ie_quote(source_path, config, log=log, progress=progress, output_dir=output_dir)
+
+
+def _sheet_title(source_path, used):
+    # 以源文件名作为工作表名: 去掉 Excel 不允许的字符，截断到 31 个字符，重名时追加序号
+    base = os.path.splitext(os.path.basename(source_path))[0]
+    base = re.sub(r'[\\/*?:\[\]]', '_', base).strip("'") or "Sheet"
+    title = base[:31]
+    suffix = 2
+    while title.lower() in used:
+        tail = f" ({suffix})"
+        title = base[:31 - len(tail)] + tail
+        suffix += 1
+    used.add(title.lower())
+    return title
+
+
+def _write_ie_merged(source_records, config, output_dir, log):
+    # 合并输出: 每个源文件一个工作表 (格式模板的副本)，返回输出文件路径
+    format_path = config['paths']['format_path']
+    decorate_path = config['paths']['decorate_path']
+    params = _ie_params(config)
+    tiers = tier_tables(config)
+    formulas = ie_tier_formulas(tiers)
+    formula_mode = _formula_mode(config)
+    _export_formats(config)  # 导出格式有误时在处理前报错
+    tracer = make_tracer(config.get('options', {}).get('trace', False))
+
+    template_cache = get_template_cache(config.get('options', {}).get('cache_dir'))
+    with tracer.span('template'):
+        # 多个工作表共用一个工作簿，不使用流式输出
+        output = open_output(template_cache.load_format(format_path))
+        row_style, = template_cache.load_decorate(decorate_path, rows=(3,))
+
+    used = set()
+    titles = [_sheet_title(source_path, used) for source_path, _ in source_records]
+    # 先复制出全部工作表，再写入 (复制的是未写入的模板)
+    outputs = [output] + [output.add_sheet(title) for title in titles[1:]]
+    output.ws.title = titles[0]
+
+    sheets = []
+    for sheet_output, (source_path, records) in zip(outputs, source_records):
+        log(f"写入工作表 {sheet_output.ws.title}: {os.path.basename(source_path)}")
+        written = _write_ie_rows(sheet_output, records, row_style, params, formulas, tracer)
+        sheets.append((sheet_output.ws, lambda fe, written=written: fe.evaluate_ie(
+            3, fe.ie_record_inputs(written), *params, tiers=tiers)))
+    _write_quantity_curve(output, config, source_records, params, tiers, log, tracer)
+
+    output_path = make_output_path(output_dir or os.path.dirname(source_records[0][0]), "Output_IE")
+    log(f"正在保存文件: {output_path}")
+    _save_with_values(output, output_path, formula_mode, sheets, log, tracer, IE_LIVE_COLUMNS)
+    _export(config, output_path, lambda: [_ie_export_table(source_records, params, tiers)], log, tracer)
+    _record_history(config, 'ie', output_path, [
+        (source_path, quote_export.ie_sheet_rows(os.path.basename(source_path), records, params, tiers))
+        for source_path, records in source_records
+    ], log, tracer)
+    _report_trace(tracer, output_path, log)
+    return output_path
+
+
+def run_ie_batch(source_paths, config, log=_ignore, progress=_ignore, output_dir=None, merge=False,
+                 cancel=None):
+    """
+    IE 批量报价: 多个源文件在进程池中并行处理 (options.ie_workers，0 表示全部 CPU 核心)
+    merge=False: 每个源文件一个输出文件；merge=True: 合并为一个输出文件，每个源文件一个工作表
+    progress 报告整批的总进度；单个源文件失败不影响其它文件。返回 [IeBatchResult]
+    取消时尚未开始的源文件不再处理，正在处理的源文件完成后抛出 Cancelled
+    """
+    cancel = cancel or CancelToken()
+    _check_templates(config['paths']['format_path'], config['paths']['decorate_path'])
+    total = len(source_paths)
+    workers = int(config.get('options', {}).get('ie_workers', 0))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, total)
+    names = [os.path.basename(path) for path in source_paths]
+    percents = [0] * total
+    results = [None] * total
+
+    def handle(index, kind, value):
+        if kind == 'log':
+            log(f"[{names[index]}] {value}")
+        else:
+            percents[index] = max(percents[index], value)
+            progress(sum(percents) // total)
+
+    def finish(index, result=None, error=None):
+        percents[index] = 100
+        progress(sum(percents) // total)
+        results[index] = (result, error)
+        finished = sum(1 for item in results if item is not None)
+        if error is not None:
+            log(f"[{finished}/{total}] 处理失败: {source_paths[index]}: {error}")
+        else:
+            log(f"[{finished}/{total}] 完成: {names[index]}")
+
+    log(f"批量处理 {total} 个源文件 (并行 {workers} 个)")
+    if workers <= 1:
+        for index, source_path in enumerate(source_paths):
+            cancel.check()
+            try:
+                if merge:
+                    records = iter_ie_records(source_path, config, lambda msg, i=index: handle(i, 'log', msg),
+                                              lambda value, i=index: handle(i, 'progress', value))
+                    result = list(_checkpointed(records, NULL_CHECKPOINT, cancel, lambda record: None))
+                else:
+                    result = run_ie_quote(source_path, config, log=lambda msg, i=index: handle(i, 'log', msg),
+                                          progress=lambda value, i=index: handle(i, 'progress', value),
+                                          output_dir=output_dir, cancel=cancel)
+            except Cancelled:
+                raise
+            except Exception as e:
+                finish(index, error=e)
+            else:
+                finish(index, result)
+    else:
+        queue = multiprocessing.Queue()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(queue,)) as executor:
+            futures = {executor.submit(_batch_job, index, source_path, config, output_dir, merge): index
+                       for index, source_path in enumerate(source_paths)}
+            pending = set(futures)
+            cancelling = False
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                _drain(queue, handle)
+                if cancel.cancelled and not cancelling:
+                    # 子进程中的任务无法中断: 撤销尚未开始的，等待正在处理的完成
+                    cancelling = True
+                    log("正在取消: 等待正在处理的源文件完成...")
+                    for future in pending:
+                        future.cancel()
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    error = future.exception()
+                    finish(futures[future], None if error else future.result(), error)
+        _drain(queue, handle)
+        cancel.check()
+
+    if merge:
+        source_records = [(path, result) for path, (result, error) in zip(source_paths, results) if error is None]
+        if not source_records:
+            return [IeBatchResult(path, None, error) for path, (_, error) in zip(source_paths, results)]
+        try:
+            output_path = _write_ie_merged(source_records, config, output_dir, log)
+        except Exception as e:
+            log(f"合并输出失败: {e}")
+            return [IeBatchResult(path, None, error or e) for path, (_, error) in zip(source_paths, results)]
+        return [IeBatchResult(path, None if error else output_path, error)
+                for path, (_, error) in zip(source_paths, results)]
+    return [IeBatchResult(path, result, error) for path, (result, error) in zip(source_paths, results)]
+
+
+def _drain(queue, handle):
+    while True:
+        try:
+            message = queue.get_nowait()
+        except Empty:
+            return
+        handle(*message)
+
+
+# ME 板卡行的 R、U、V 列留给用户填写: S/W 及汇总它们的 X/Y (含合计行) 在 values 模式下仍写公式
+ME_LIVE_COLUMNS = frozenset('SWXY')
+
+
+def iter_me_rows(layout, records, styles, val_stencilqty, val_smtqty, val_qty):
+    """
+    按行号递增生成 ME 输出表各行: (行号, {列字母: 值}, 依次套用的样式, 行高, 合并区域)
+    styles: 样式模板第3-6行 (板卡行, 合计行, 治具明细行, 明细合计行)
+    """
+    styles1, styles2, styles3, styles4 = styles
+    parts_start = layout.parts_start
+    m = layout.parts_end
+
+    for record, n in zip(records, layout.board_rows):
+        StencilUP = ((record.stencil_top + record.stencil_bottom) / 2) * 1.1
+        SMTCarrierUP = record.smt_carrier * 1.1
+        values = {
+            'B': f"{n - 2}",
+            'C': record.board_name,
+            'G': val_stencilqty,
+            'H': StencilUP,
+            'I': f"=G{n}*H{n}",
+            'J': val_smtqty,
+            'K': SMTCarrierUP,
+            'L': f"=J{n}*K{n}",
+            'P': f"=SUMIFS($F${parts_start}:$F${m - 1},$G${parts_start}:$G${m - 1},B{n})",
+            'Q': 1,
+            'S': f"=Q{n}*R{n}",
+            'W': f"=U{n}*V{n}",
+            'X': f"=SUM(I{n}, L{n}, O{n}, P{n}, S{n}, W{n})",
+            'Y': f"=X{n}*1.13",
+        }
+
+        merges = ()
+        name, amount, qty = record.tail_part
+        if name != None:
+            values['M'] = val_qty
+            values['N'] = amount * 1.1
+            values['O'] = f"=M{n}*N{n}"
+        else:
+            merges = (f'M{n}:O{n}',)
+            values['M'] = "--"
+        yield n, values, (styles1,), 25, merges
+
+    n = layout.totals_row
+    yield n, {
+        column: f"=SUM({column}3:{column}{n - 1})" for column in ('I', 'L', 'P', 'S', 'W', 'X', 'Y')
+    }, (styles2,), 24, ()
+
+    for record, n, part_rows in zip(records, layout.board_rows, layout.part_rows):
+        for (name, amount, qty), i in zip(record.parts, part_rows):
+            yield i, {'C': name, 'D': qty, 'E': amount * 1.1, 'F': f"=D{i}*E{i}", 'G': f"{n - 2}"}, (styles3,), None, ()
+
+    for i, row in enumerate(layout.carrier_rows, start=1):
+        # 第一行 AVI Carrier 先套明细合计行样式，再套治具明细行样式 (与原有输出一致)
+        row_styles = (styles4, styles3) if row == m else (styles3,)
+        yield row, {'C': "AVI Carrier", 'D': 4, 'E': 892, 'F': f"=D{row}*E{row}", 'G': i}, row_styles, None, ()
+
+    m = layout.sum_row
+    yield m, {'F': f"=SUM(F{parts_start}:F{m - 1})"}, (), None, ()
+
+
+def _me_source_files(source_path, log):
+    # 文件夹中的各板卡 .xls 文件名，按自然排序
+    log(f"正在扫描文件夹: {source_path}")
+    xlsx_files = [f for f in os.listdir(source_path) if f.lower().endswith('.xls')]
+    if not xlsx_files:
+        raise FileNotFoundError(f"在文件夹 {source_path} 中未找到xls文件")
+
+    log(f"找到 {len(xlsx_files)} 个xls文件")
+
+    xlsx_files.sort(key=natural_sort_key)
+    return xlsx_files
+
+
+def run_me_quote(source_path, config, log=_ignore, progress=_ignore, output_dir=None, cancel=None):
+    # ME 报价: source_path 为包含各板卡 .xls 的文件夹；返回输出文件路径
+    # cancel: CancelToken，取消时抛出 Cancelled；失败或取消后再次运行从断点继续
+    log("正在初始化...")
+    cancel = cancel or CancelToken()
+
+    # 读取配置
+    format_path = config['paths']['format_path_tab2']
+    decorate_path = config['paths']['decorate_path_tab2']
+
+    val_stencilqty = float(config['params']['StencilQty'])
+    val_smtqty = float(config['params']['SMTCarrierQty'])
+    val_qty = float(config['params']['Qty'])
+    me_workers = int(config.get('options', {}).get('me_workers', 0))
+    stream_output = config.get('options', {}).get('stream_output', False)
+    formula_mode = _formula_mode(config)
+    _export_formats(config)  # 导出格式有误时在处理前报错
+    tracer = make_tracer(config.get('options', {}).get('trace', False))
+    records = None
+    checkpoint = NULL_CHECKPOINT
+
+    # 检查文件存在
+    if not os.path.exists(format_path):
+        raise FileNotFoundError(f"找不到格式文件: {format_path}")
+    if not os.path.exists(decorate_path):
+        raise FileNotFoundError(f"找不到修饰文件: {decorate_path}")
+
+    log("正在加载工作簿 (这可能需要几秒钟)...")
+
+    # 格式/样式模板走缓存，文件未改动时不重新解析
+    template_cache = get_template_cache(config.get('options', {}).get('cache_dir'))
+    with tracer.span('template'):
+        output = open_output(template_cache.load_format(format_path), stream_output)
+    if stream_output and not output.streaming:
+        log("当前 openpyxl 版本未经流式输出验证，改为普通方式写出")
+
+    #获取样式 (每个模板行登记一次，之后按行套用)
+    log("正在读取样式模板...")
+    # 第3行: 板卡行；第4行: 合计行；第5行: 治具明细行；第6行: 明细合计行
+    with tracer.span('template'):
+        styles = template_cache.load_decorate(decorate_path, rows=(3, 4, 5, 6))
+
+    # 检查是文件还是文件夹
+    if os.path.isdir(source_path):
+        xlsx_files = _me_source_files(source_path, log)
+
+        # 在进程池中并行解析各文件，结果按自然排序顺序收集
+        file_paths = [os.path.join(source_path, f) for f in xlsx_files]
+        total_files = len(file_paths)
+        # 断点中文件名与指纹都未变的前缀直接取用，从第一个不同的文件开始提取
+        file_keys = [(f, source_fingerprint(path)) for f, path in zip(xlsx_files, file_paths)]
+        checkpoint = open_checkpoint(config, 'me', source_path)
+        records = checkpoint.resume(file_keys)
+        if records:
+            log(f"从断点继续: 前 {len(records)} 个文件使用上次已提取的结果")
+        # 内容未变的文件直接使用缓存的提取结果
+        extract_cache = _extract_cache(config)
+        remaining = file_paths[len(records):]
+        if extract_cache is not None:
+            record_iter = extract_cache.iter_me_records(remaining, workers=me_workers)
+        else:
+            record_iter = iter_me_records(remaining, workers=me_workers)
+        keys = iter(file_keys[len(records):])
+        record_iter = _checkpointed(record_iter, checkpoint, cancel, lambda record: next(keys))
+        try:
+            for file_idx in range(len(records), total_files):
+                # 多进程解析时记录的是等待该文件结果的时间
+                with tracer.span('extract', file=xlsx_files[file_idx]):
+                    record = next(record_iter)
+                log(f"处理文件: {record.file_name}")
+                records.append(record)
+
+                # 更新进度条
+                progress(int(((file_idx + 1) / total_files) * 100))
+            # 最后一个文件之后的取消在写入前生效
+            next(record_iter, None)
+        except BaseException:
+            _save_checkpoint(checkpoint, log)
+            raise
+        finally:
+            record_iter.close()
+        if extract_cache is not None:
+            extract_cache.flush()
+
+        # 预先计算所有行位置，模板尾部只整体下移一次，之后直接写入最终位置
+        layout = MeLayout([len(record.parts) for record in records])
+        with tracer.span('insert_rows'):
+            output.insert_rows(layout.first_row, layout.shift)
+
+        # 板卡行、合计行、(下移后的模板行)、治具明细行、AVI 载具行、明细合计行，按行号顺序写入
+        with tracer.span('write'):
+            for row, values, row_styles, height, merges in iter_me_rows(
+                    layout, records, styles, val_stencilqty, val_smtqty, val_qty):
+                output.write_row(row, values, row_styles, height, merges)
+    # 保存文件
+    output_path = make_output_path(output_dir or os.path.dirname(source_path), "Output_ME")  # 使用不同的文件名前缀
+
+    log(f"正在保存文件: {output_path}")
+    try:
+        if records is None:
+            _save_with_values(output, output_path, 'formula', [], log, tracer)
+        else:
+            _save_with_values(output, output_path, formula_mode, [
+                (output.ws, lambda fe: fe.evaluate_me(layout, records, val_stencilqty, val_smtqty, val_qty)),
+            ], log, tracer, ME_LIVE_COLUMNS)
+    except BaseException:
+        _save_checkpoint(checkpoint, log)
+        raise
+    checkpoint.discard()
+    if records is not None:
+        _export(config, output_path, lambda: [
+            ('me_boards', quote_export.ME_BOARD_COLUMNS,
+             quote_export.me_board_rows(records, val_stencilqty, val_smtqty, val_qty), ()),
+            ('me_parts', quote_export.ME_PART_COLUMNS, quote_export.me_part_rows(records), ('board_no',)),
+        ], log, tracer)
+        _record_history(config, 'me', output_path, [
+            (source_path, quote_export.me_board_rows(records, val_stencilqty, val_smtqty, val_qty)),
+        ], log, tracer)
+    _report_trace(tracer, output_path, log)
+
+    return output_path
+
+
+# ==========================================
+# 只计算结果 (不生成工作簿)
+# ==========================================
+def quote_tables(kind, source_path, config, log=_ignore, progress=_ignore, cancel=None):
+    """
+    提取并计算报价结果，不生成输出工作簿 (报价服务返回 JSON 时使用)
+    kind: 'ie' (source_path 为源 xlsx) / 'me' (source_path 为板卡文件夹)
+    返回 {表名: (表结构, 行列表)}，表与 quote_export 的导出表相同
+    """
+    cancel = cancel or CancelToken()
+    if kind == 'ie':
+        params = _ie_params(config)
+        tiers = tier_tables(config)
+        records = list(_checkpointed(iter_ie_records(source_path, config, log, progress),
+                                     NULL_CHECKPOINT, cancel, lambda record: None))
+        rows = quote_export.ie_sheet_rows(os.path.basename(source_path), records, params, tiers)
+        return {'ie_sheets': (quote_export.IE_SHEET_COLUMNS, list(rows))}
+
+    val_stencilqty = float(config['params']['StencilQty'])
+    val_smtqty = float(config['params']['SMTCarrierQty'])
+    val_qty = float(config['params']['Qty'])
+    me_workers = int(config.get('options', {}).get('me_workers', 0))
+    file_paths = [os.path.join(source_path, f) for f in _me_source_files(source_path, log)]
+    extract_cache = _extract_cache(config)
+    if extract_cache is not None:
+        record_iter = extract_cache.iter_me_records(file_paths, workers=me_workers)
+    else:
+        record_iter = iter_me_records(file_paths, workers=me_workers)
+    records = []
+    for record in _checkpointed(record_iter, NULL_CHECKPOINT, cancel, lambda record: None):
+        log(f"处理文件: {record.file_name}")
+        records.append(record)
+        progress(int(len(records) / len(file_paths) * 100))
+    if extract_cache is not None:
+        extract_cache.flush()
+    return {
+        'me_boards': (quote_export.ME_BOARD_COLUMNS,
+                      list(quote_export.me_board_rows(records, val_stencilqty, val_smtqty, val_qty))),
+        'me_parts': (quote_export.ME_PART_COLUMNS, list(quote_export.me_part_rows(records))),
+    }
@@ -0,0 +1,377 @@
+"""
+本机报价服务: HTTP/JSON 接口 (asyncio，仅标准库，不依赖 PyQt5)
+
+供其它内部工具以程序方式报价。只监听本机回环地址，不访问任何网络资源。
+
+接口:
+    GET  /health              运行状态 (执行中/排队中的任务数)
+    POST /quote/ie            请求体为 IE 源 xlsx 文件
+    POST /quote/me            请求体为 zip 压缩的 ME 板卡文件夹 (其中的 .xls 文件，忽略目录层级)
+
+查询参数:
+    format=xlsx (默认)        返回输出工作簿
+    format=json               不生成工作簿，返回各工作表/板卡的结果 (列与 quote_export 的导出表相同)
+    name=文件名               源文件名 (IE 结果的 source_file 列，默认 source.xlsx)
+    Handling / UPUSDL / UPUSOH / StencilQty / SMTCarrierQty / Qty
+                              覆盖配置中的报价参数 (只对本次请求有效)
+
+报价在有界线程池中执行 (service.workers 个同时执行，最多 service.max_queue 个排队，超出时返回 503)。
+配置在启动时读取一次，格式/样式模板在启动时预先加载并常驻内存 (template_cache)，
+每个请求不再重新解析模板。超过 service.timeout 秒的任务在处理完当前工作表/文件后取消，返回 504。
+
+示例:
+    curl --data-binary @IE.xlsx "http://127.0.0.1:8765/quote/ie?UPUSDL=32" -o Output_IE.xlsx
+    curl --data-binary @ME.zip "http://127.0.0.1:8765/quote/me?format=json"
+"""
+import asyncio
+import copy
+import importlib
+import io
+import ipaddress
+import json
+import math
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from checkpoint import CancelToken, Cancelled
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# 请求行与请求头的读取时限 (秒) 与请求头数量上限
+HEADER_TIMEOUT = 30
+MAX_HEADERS = 100
+
+# 可以通过查询参数覆盖的报价参数 (不区分大小写)
+PARAM_NAMES = {name.lower(): name for name in ('Handling', 'UPUSDL', 'UPUSOH', 'StencilQty', 'SMTCarrierQty', 'Qty')}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+           413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+           503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def check_loopback(host):
+    # 只允许本机回环地址 (127.0.0.0/8、::1、localhost)
+    if host == 'localhost':
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise ValueError(f"报价服务只能监听本机回环地址: {host}")
+
+
+def _json_value(value):
+    # NaN / inf 在 JSON 中没有对应写法，与 quote_export._real 相同按空值输出
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value
+
+
+def _json_body(data):
+    return json.dumps(_json_value(data), ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+class QuoteService:
+    def __init__(self, config, host='127.0.0.1', port=8765, workers=2, max_queue=8, timeout=600,
+                 max_upload_mb=100, log=None):
+        check_loopback(host)
+        self.config = config
+        self.host = host
+        self.port = port
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = float(timeout)
+        self.max_upload = int(max_upload_mb * 1024 * 1024)
+        self.log = log or (lambda msg: None)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='quote')
+        self.running = 0
+        self.waiting = 0
+        self._slots = None
+        self._server = None
+
+    # ------------------------------------------
+    # 启动与预热
+    # ------------------------------------------
+    def warm_up(self):
+        # 预先导入报价流程与公式求值 (NumPy) 并加载模板，首个请求不再承担这部分耗时
+        from template_cache import get_template_cache
+
+        for module in ('quote_pipeline', 'formula_eval'):
+            importlib.import_module(module)
+
+        cache = get_template_cache(self.config.get('options', {}).get('cache_dir'))
+        paths = self.config['paths']
+        for format_key, decorate_key, rows in (('format_path', 'decorate_path', (3,)),
+                                               ('format_path_tab2', 'decorate_path_tab2', (3, 4, 5, 6))):
+            if os.path.exists(paths[format_key]) and os.path.exists(paths[decorate_key]):
+                cache.load_format(paths[format_key])
+                cache.load_decorate(paths[decorate_key], rows=rows)
+                self.log(f"已加载模板: {paths[format_key]}, {paths[decorate_key]}")
+            else:
+                self.log(f"模板不存在，跳过预加载: {paths[format_key]}")
+
+    async def start(self):
+        # 在事件循环中启动监听；返回实际监听的端口 (port 为 0 时由系统分配)
+        self._slots = asyncio.Semaphore(self.workers)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.warm_up)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.log(f"报价服务已启动: http://{self.host}:{self.port} "
+                 f"(同时执行 {self.workers} 个，最多排队 {self.max_queue} 个)")
+        return self.port
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self):
+        # 阻塞运行，直到 Ctrl+C
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.log("报价服务已停止")
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------
+    # HTTP
+    # ------------------------------------------
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, "无效的请求行")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "请求头过多")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    async def _read_body(self, reader, headers):
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HttpError(411, "请求体须指定 Content-Length (不支持分块传输)")
+        try:
+            length = int(headers['content-length'])
+        except (KeyError, ValueError):
+            raise HttpError(411, "请求体须指定 Content-Length")
+        if length > self.max_upload:
+            raise HttpError(413, f"上传文件超过 {self.max_upload // (1024 * 1024)} MB")
+        if length <= 0:
+            raise HttpError(400, "请求体为空")
+        return await reader.readexactly(length)
+
+    async def _handle(self, reader, writer):
+        started = time.perf_counter()
+        method, path = '-', '-'
+        try:
+            try:
+                request = await asyncio.wait_for(self._read_request(reader), HEADER_TIMEOUT)
+                if request is None:
+                    return
+                method, target, headers = request
+                url = urlsplit(target)
+                path = url.path
+                query = {key.lower(): values[-1] for key, values in parse_qs(url.query).items()}
+                status, response_headers, body = await self._dispatch(method, path, query, headers, reader)
+            except HttpError as e:
+                status, response_headers, body = e.status, dict(e.headers), _json_body({'error': str(e)})
+                response_headers['Content-Type'] = 'application/json; charset=utf-8'
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception as e:
+                status, body = 500, _json_body({'error': f"{type(e).__name__}: {e}"})
+                response_headers = {'Content-Type': 'application/json; charset=utf-8'}
+            head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(body)}",
+                    "Connection: close"] + [f"{name}: {value}" for name, value in response_headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('utf-8') + body)
+            await writer.drain()
+            self.log(f"{method} {path} {status} {len(body)} 字节 {time.perf_counter() - started:.2f}s")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, query, headers, reader):
+        if path == '/health':
+            if method != 'GET':
+                raise HttpError(405, "只支持 GET", {'Allow': 'GET'})
+            return 200, {'Content-Type': 'application/json; charset=utf-8'}, _json_body(
+                {'status': 'ok', 'running': self.running, 'waiting': self.waiting,
+                 'workers': self.workers, 'max_queue': self.max_queue})
+        if path not in ('/quote/ie', '/quote/me'):
+            raise HttpError(404, f"未知的接口: {path}")
+        if method != 'POST':
+            raise HttpError(405, "只支持 POST", {'Allow': 'POST'})
+        kind = path.rsplit('/', 1)[1]
+        output_format = query.get('format', 'xlsx')
+        if output_format not in ('xlsx', 'json'):
+            raise HttpError(400, f"无效的 format: {output_format} (可选 xlsx / json)")
+        config = self._request_config(query)
+        # 排队已满时不读取请求体，直接拒绝；读取请求体期间即占用一个排队位置
+        if self.waiting >= self.max_queue and self._slots.locked():
+            raise HttpError(503, "报价任务已满，请稍后重试", {'Retry-After': '5'})
+        self.waiting += 1
+        try:
+            body = await self._read_body(reader, headers)
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await self._run_job(kind, output_format, body, query.get('name'), config)
+        finally:
+            self._slots.release()
+
+    def _request_config(self, query):
+        # 启动时读取的配置的副本，按查询参数覆盖报价参数
+        config = copy.deepcopy(self.config)
+        for key, value in query.items():
+            if key in PARAM_NAMES:
+                try:
+                    config['params'][PARAM_NAMES[key]] = float(value)
+                except ValueError:
+                    raise HttpError(400, f"参数 {PARAM_NAMES[key]} 须为数字: {value}")
+        options = config.setdefault('options', {})
+        # 每个请求的源文件都在临时目录中: 不记录断点与报价历史，不另外导出
+        # 报价在线程池中执行: 不再从工作线程 fork 解析 ME 板卡的进程池
+        options.update({'checkpoint_interval': 0, 'quote_history': False, 'export_formats': [], 'me_workers': 1})
+        return config
+
+    async def _run_job(self, kind, output_format, body, name, config):
+        # 调用方已取得执行名额
+        self.running += 1
+        cancel = CancelToken()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, quote_job, kind, output_format, body, name, config,
+                                          cancel, self.max_upload * 10)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                # 在处理完当前工作表/文件后停止，等线程结束再释放执行名额
+                cancel.cancel()
+                try:
+                    await future
+                except Exception:
+                    pass
+                raise HttpError(504, f"报价超过 {self.timeout:g} 秒，已取消")
+        finally:
+            self.running -= 1
+        content_type, filename, data = result
+        headers = {'Content-Type': content_type}
+        if filename:
+            headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return 200, headers, data
+
+
+# ==========================================
+# 报价任务 (在线程池中执行)
+# ==========================================
+def _safe_name(name, default):
+    # 只取文件名部分，去掉路径与不可见字符
+    name = os.path.basename((name or '').replace('\\', '/')).strip()
+    name = ''.join(ch for ch in name if ch.isprintable())
+    return name if name and name not in ('.', '..') else default
+
+
+def _extract_me_zip(data, folder, max_unzipped):
+    # 解压 zip 中的 .xls 文件到 folder (忽略目录层级)；返回文件数
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise HttpError(400, "请求体不是有效的 zip 文件")
+    with archive:
+        members = [info for info in archive.infolist() if not info.is_dir()
+                   and info.filename.lower().endswith('.xls')
+                   and not info.filename.startswith('__MACOSX/')
+                   and not os.path.basename(info.filename).startswith(('.', '~$', 'Output_'))]
+        if sum(info.file_size for info in members) > max_unzipped:
+            raise HttpError(413, "zip 解压后过大")
+        names = set()
+        for info in members:
+            name = _safe_name(info.filename, None)
+            if name is None:
+                continue
+            if name.lower() in names:
+                raise HttpError(400, f"zip 中有重名的板卡文件: {name}")
+            names.add(name.lower())
+            with archive.open(info) as src, open(os.path.join(folder, name), 'wb') as dst:
+                dst.write(src.read())
+    if not names:
+        raise HttpError(422, "zip 中没有 .xls 板卡文件")
+    return len(names)
+
+
+def quote_job(kind, output_format, body, name, config, cancel, max_unzipped):
+    """
+    在临时目录中执行一次报价，返回 (Content-Type, 下载文件名, 响应体)
+    输入或数据有误时抛出 HttpError
+    """
+    from quote_pipeline import quote_tables, run_ie_quote, run_me_quote
+
+    log_lines = []
+    log = log_lines.append
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='quote_service_') as work_dir:
+        if kind == 'ie':
+            source_path = os.path.join(work_dir, _safe_name(name, 'source.xlsx'))
+            if not source_path.lower().endswith(('.xlsx', '.xlsm')):
+                source_path += '.xlsx'
+            with open(source_path, 'wb') as f:
+                f.write(body)
+        else:
+            source_path = os.path.join(work_dir, os.path.splitext(_safe_name(name, 'ME'))[0] or 'ME')
+            os.makedirs(source_path)
+            _extract_me_zip(body, source_path, max_unzipped)
+        try:
+            if output_format == 'json':
+                tables = quote_tables(kind, source_path, config, log=log, cancel=cancel)
+            else:
+                run = run_ie_quote if kind == 'ie' else run_me_quote
+                output_path = run(source_path, config, log=log, output_dir=work_dir, cancel=cancel)
+        except Cancelled:
+            raise
+        except (FileNotFoundError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            raise HttpError(422, f"无法处理输入: {e}")
+        if output_format == 'xlsx':
+            with open(output_path, 'rb') as f:
+                return XLSX_CONTENT_TYPE, os.path.basename(output_path), f.read()
+    result = {
+        'kind': kind,
+        'params': config['params'],
+        'elapsed': round(time.perf_counter() - started, 3),
+        'tables': {table: [dict(zip([column for column, _ in columns], row)) for row in rows]
+                   for table, (columns, rows) in tables.items()},
+        'log': log_lines,
+    }
+    return 'application/json; charset=utf-8', None, _json_body(result)
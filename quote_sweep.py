@@ -0,0 +1,124 @@
+"""
+IE 参数扫描 (不依赖 PyQt5)
+
+源文件只提取一次，之后对 Handling / U/P-DL / U/P-OH 的每种组合计算 P/S/T/X/Y/Z 成本链。
+全部方案一次性按 NumPy 数组计算 (formula_eval.ie_columns 的参数为数组时按方案广播)，
+数百个方案通常在 1 秒内完成。结果为每个方案一行的对比表 (各工作表成本合计)，
+可选输出每个方案 x 每个工作表的明细。
+
+取值写法 (parse_values):
+    34.3            单个值
+    32,34.3,36      逗号分隔的多个值
+    30:40:2         起:止:步长，包含终值 (30, 32, ..., 40)
+"""
+import csv
+import math
+from itertools import product
+
+# 对比表的列: 各方案的参数与全部工作表的成本合计 (US$)
+SWEEP_COLUMNS = ['scenario', 'handling', 'upusdl', 'upusoh', 'dl_cost', 'oh_cost', 'dl_oh_cost',
+                 'ohlh', 'sga', 'mva', 'mva_change']
+
+# 明细: 每个方案 x 每个工作表一行
+DETAIL_COLUMNS = ['scenario', 'sheet_name', 'program_name', 'dl_cost', 'oh_cost', 'dl_oh_cost', 'mva']
+
+# 扫描点数上限，防止写错步长时生成过大的网格
+MAX_SCENARIOS = 1000000
+
+
+def parse_values(spec):
+    """
+    把取值写法解析为数值列表；格式不对时抛出 ValueError
+    """
+    spec = str(spec).strip()
+    if ':' in spec:
+        parts = spec.split(':')
+        if len(parts) != 3:
+            raise ValueError(f"范围应写作 起:止:步长: {spec}")
+        start, stop, step = (float(part) for part in parts)
+        if step <= 0 or stop < start:
+            raise ValueError(f"范围的步长须为正数且终值不小于起值: {spec}")
+        # 容许二进制误差 (如 0.1 步长累加)，结果按 12 位小数修整
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 12) for i in range(count)]
+    values = [float(part) for part in spec.split(',') if part.strip()]
+    if not values:
+        raise ValueError("未指定取值")
+    return values
+
+
+def scenario_grid(handlings, upusdls, upusohs):
+    # 三组取值的全部组合: [(Handling, U/P-DL, U/P-OH)]，Handling 变化最慢
+    count = len(handlings) * len(upusdls) * len(upusohs)
+    if count > MAX_SCENARIOS:
+        raise ValueError(f"方案数过多: {count} (上限 {MAX_SCENARIOS})")
+    return list(product(handlings, upusdls, upusohs))
+
+
+def sweep_ie(records, scenarios, baseline, tiers=None):
+    """
+    records: IeSheetRecord 列表；scenarios: [(Handling, U/P-DL, U/P-OH)]
+    baseline: 对照参数 (通常为配置中的当前值)，mva_change 为相对对照 MVA 合计的变化比例
+    tiers: 数量分档表 (quantity_tiers.tier_tables)
+    返回 (对比表行列表, 各成本列的 (方案数, 工作表数) 数组 {列字母: 数组})
+    """
+    import numpy as np
+
+    import formula_eval
+
+    inputs = formula_eval.ie_record_inputs(records)
+    grid = np.array(list(scenarios) + [tuple(baseline)], dtype=float)
+    columns = formula_eval.ie_columns(inputs, grid[:, 0], grid[:, 1], grid[:, 2], tiers=tiers)
+    # 纵向合计按工作表顺序累加，与输出表中 SUM 的结果一致
+    totals = {column: np.cumsum(np.broadcast_to(columns[column], (len(grid), len(inputs))), axis=1)[:, -1]
+              for column in ('P', 'S', 'T', 'X', 'Y', 'Z')}
+    base_mva = totals['Z'][-1]
+
+    rows = []
+    for i, (handling, upusdl, upusoh) in enumerate(grid[:-1]):
+        mva = float(totals['Z'][i])
+        rows.append({
+            'scenario': i + 1, 'handling': float(handling), 'upusdl': float(upusdl), 'upusoh': float(upusoh),
+            'dl_cost': float(totals['P'][i]), 'oh_cost': float(totals['S'][i]),
+            'dl_oh_cost': float(totals['T'][i]), 'ohlh': float(totals['X'][i]), 'sga': float(totals['Y'][i]),
+            'mva': mva, 'mva_change': (mva - base_mva) / base_mva if base_mva else None,
+        })
+    sheet_columns = {column: np.broadcast_to(columns[column], (len(grid), len(inputs)))[:-1]
+                     for column in ('P', 'S', 'T', 'Z')}
+    return rows, sheet_columns
+
+
+def iter_detail_rows(records, sheet_columns):
+    # 明细表各行 (与 DETAIL_COLUMNS 对应)
+    for i in range(len(sheet_columns['Z'])):
+        for j, record in enumerate(records):
+            yield (i + 1, record.sheet_name, record.project_name, float(sheet_columns['P'][i, j]),
+                   float(sheet_columns['S'][i, j]), float(sheet_columns['T'][i, j]),
+                   float(sheet_columns['Z'][i, j]))
+
+
+def write_csv(path, columns, rows):
+    # rows: 字典或与 columns 对应的元组
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row[column] for column in columns] if isinstance(row, dict) else row)
+
+
+def format_table(rows, columns=SWEEP_COLUMNS):
+    # 对齐的文本表格 (命令行/日志显示)
+    def cell(column, value):
+        if value is None:
+            return '-'
+        if column == 'mva_change':
+            return f"{value:+.2%}"
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
+
+    cells = [[cell(column, row[column]) for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(line[k]) for line in cells]) for k, column in enumerate(columns)]
+    lines = ["  ".join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.rjust(width) for value, width in zip(line, widths)) for line in cells]
+    return "\n".join(lines)
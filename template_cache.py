@@ -0,0 +1,159 @@
+"""
+格式/样式模板缓存
+
+格式模板 (Format*.xlsx) 与样式模板 (Decorate*.xlsx) 几乎不变，每次点击 "开始处理"
+都重新解析很浪费。这里按 (路径, 修改时间, 文件大小) 缓存解析结果:
+- 格式模板缓存为序列化后的工作簿，每次取用反序列化出一份独立副本 (比重新解析 XML 快一个数量级)
+- 样式模板只保留需要的几行样式，每次取用生成新的 RowStyle
+- 同时把编译结果写入磁盘快照，新进程启动时直接读取；源文件改动后自动失效
+"""
+import copyreg
+import hashlib
+import os
+import pickle
+import threading
+
+from config_manager import resolve_cache_dir
+from excel_tools import RowStyle
+
+# 快照格式变更或 openpyxl 升级时自动失效
+SNAPSHOT_VERSION = 1
+
+
+def _rebuild_dimension_holder(cls, worksheet, reference, default_factory, max_outline, items):
+    holder = cls(worksheet, reference=reference, default_factory=default_factory)
+    holder.max_outline = max_outline
+    holder.update(items)
+    return holder
+
+
+def _reduce_dimension_holder(holder):
+    # openpyxl 的 DimensionHolder 继承 defaultdict，默认的 pickle 方式会丢失 default_factory
+    # (反序列化后访问不存在的行高/列宽会 KeyError)，这里按构造参数重建
+    return _rebuild_dimension_holder, (
+        type(holder), holder.worksheet, holder.reference, holder.default_factory,
+        holder.max_outline, dict(holder),
+    )
+
+
+def _register_pickle_support():
+    from openpyxl.worksheet.dimensions import DimensionHolder
+    copyreg.pickle(DimensionHolder, _reduce_dimension_holder)
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _openpyxl_version():
+    import openpyxl
+    return openpyxl.__version__
+
+
+class TemplateCache:
+    def __init__(self, snapshot_dir=None):
+        self.snapshot_dir = snapshot_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load_format(self, path):
+        # 返回格式模板工作簿的独立副本，调用方可以随意修改
+        payload = self._get('format', path, (), self._compile_format)
+        return pickle.loads(payload)
+
+    def load_decorate(self, path, rows):
+        # 返回样式模板中指定各行的 RowStyle 列表 (每次新建，登记状态不跨工作簿共享)
+        rows = tuple(rows)
+        payload = self._get('decorate', path, rows, self._compile_decorate)
+        return [RowStyle(list(styles)) for styles in payload]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _compile_format(path, rows):
+        from openpyxl import load_workbook
+        _register_pickle_support()
+        return pickle.dumps(load_workbook(path), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _compile_decorate(path, rows):
+        from openpyxl import load_workbook
+        ws = load_workbook(path).active
+        return [RowStyle.from_row(ws[row]).styles for row in rows]
+
+    def _get(self, kind, path, rows, compile_func):
+        path = os.path.abspath(path)
+        stamp = _file_stamp(path)
+        key = (kind, path, rows)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+
+            payload = self._read_snapshot(key, stamp)
+            if payload is None:
+                payload = compile_func(path, rows)
+                self._write_snapshot(key, stamp, payload)
+            self._entries[key] = (stamp, payload)
+            return payload
+
+    def _snapshot_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.snapshot_dir, f"template_{key[0]}_{digest}.pkl")
+
+    def _read_snapshot(self, key, stamp):
+        if not self.snapshot_dir:
+            return None
+        snapshot_path = self._snapshot_path(key)
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            # 快照损坏、截断或由不兼容的版本写入: 与版本不符一样按未命中处理，重新编译后覆盖
+            return None
+        if (not isinstance(snapshot, dict)
+                or snapshot.get('version') != SNAPSHOT_VERSION
+                or snapshot.get('openpyxl') != _openpyxl_version()
+                or snapshot.get('key') != key
+                or snapshot.get('stamp') != stamp):
+            return None
+        return snapshot['payload']
+
+    def _write_snapshot(self, key, stamp, payload):
+        if not self.snapshot_dir:
+            return
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'openpyxl': _openpyxl_version(),
+            'key': key,
+            'stamp': stamp,
+            'payload': payload,
+        }
+        snapshot_path = self._snapshot_path(key)
+        tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        except OSError:
+            # 快照只是加速手段，写入失败不影响报价
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_template_cache(snapshot_dir=None):
+    # 同一进程内按快照目录共享缓存实例，保证多次运行之间模板保持"热"状态
+    key = resolve_cache_dir(snapshot_dir)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TemplateCache(key)
+        return cache
@@ -0,0 +1,52 @@
+import copy
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_manager import ConfigManager  # noqa: E402
+
+LOGIC_DATA = os.path.join(ROOT, 'LogicData')
+
+
+@pytest.fixture
+def logic_data():
+    # 仓库自带的样例数据与模板 (LogicData)
+    return LOGIC_DATA
+
+
+@pytest.fixture
+def quote_config(tmp_path):
+    # 默认配置 + 样例模板，缓存目录放在临时目录中
+    config = copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
+    config['paths'] = {
+        'format_path': os.path.join(LOGIC_DATA, 'FormatIE.xlsx'),
+        'decorate_path': os.path.join(LOGIC_DATA, 'DecorateIE.xlsx'),
+        'format_path_tab2': os.path.join(LOGIC_DATA, 'FormatME.xlsx'),
+        'decorate_path_tab2': os.path.join(LOGIC_DATA, 'DecorateME.xlsx'),
+    }
+    config['params']['Qty'] = 27
+    config['options']['cache_dir'] = str(tmp_path / 'cache')
+    config['options']['me_workers'] = 1
+    config['options']['ie_workers'] = 1
+    return config
+
+
+@pytest.fixture
+def ie_source(tmp_path):
+    # 样例 IE 源文件的副本 (输出文件写在同一目录)
+    path = tmp_path / 'src' / 'IE.xlsx'
+    path.parent.mkdir()
+    shutil.copy(os.path.join(LOGIC_DATA, 'IE.xlsx'), path)
+    return str(path)
+
+
+@pytest.fixture
+def me_source(tmp_path):
+    path = tmp_path / 'ME'
+    shutil.copytree(os.path.join(LOGIC_DATA, 'ME'), path)
+    return str(path)
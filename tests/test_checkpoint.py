@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+import quote_pipeline
+from checkpoint import CancelToken, Cancelled, Checkpoint, NULL_CHECKPOINT, open_checkpoint
+from extract_cache import STORE_NAME
+from quote_pipeline import run_ie_quote, run_me_quote
+
+
+def test_resume_matches_saved_prefix(tmp_path):
+    path = str(tmp_path / 'checkpoints' / 'ie.pkl')
+    checkpoint = Checkpoint(path, 'key', interval=2)
+    checkpoint.add('a', 1)
+    assert not os.path.exists(path)
+    checkpoint.add('b', 2)
+    checkpoint.add('c', 3)
+    # 每 2 条写入一次，第 3 条尚未写入
+    assert Checkpoint(path, 'key', 2).resume() == [1, 2]
+    checkpoint.save()
+    assert Checkpoint(path, 'key', 2).resume() == [1, 2, 3]
+    assert Checkpoint(path, 'key', 2).resume(['a', 'x', 'c']) == [1]
+    assert Checkpoint(path, 'other', 2).resume() == []
+    checkpoint.discard()
+    assert not os.path.exists(path)
+    assert Checkpoint(path, 'key', 2).resume() == []
+
+
+def test_open_checkpoint(quote_config, tmp_path):
+    checkpoint = open_checkpoint(quote_config, 'ie', str(tmp_path / 'IE.xlsx'))
+    assert checkpoint.enabled
+    assert checkpoint.path.startswith(quote_config['options']['cache_dir'])
+    assert open_checkpoint(quote_config, 'me', str(tmp_path / 'IE.xlsx')).path != checkpoint.path
+    quote_config['options']['checkpoint_interval'] = 0
+    assert open_checkpoint(quote_config, 'ie', str(tmp_path / 'IE.xlsx')) is NULL_CHECKPOINT
+
+
+def cancel_at(prefix, count):
+    # 日志第 count 次以 prefix 开头时取消
+    cancel = CancelToken()
+    seen = []
+
+    def log(message):
+        seen.append(message)
+        if message.startswith(prefix) and sum(m.startswith(prefix) for m in seen) == count:
+            cancel.cancel()
+    return cancel, log, seen
+
+
+def output_values(path):
+    return [[cell.value for cell in row] for row in load_workbook(path).active.iter_rows()]
+
+
+def test_ie_cancel_then_resume(ie_source, quote_config, tmp_path):
+    quote_config['options']['checkpoint_interval'] = 50
+    expected = output_values(run_ie_quote(ie_source, quote_config, output_dir=str(tmp_path)))
+
+    cancel, log, _ = cancel_at("处理工作表", 5)
+    with pytest.raises(Cancelled):
+        run_ie_quote(ie_source, quote_config, log=log, cancel=cancel)
+    # 未到写入间隔，取消时同样写入断点
+    assert os.listdir(os.path.join(quote_config['options']['cache_dir'], 'checkpoints'))
+
+    messages = []
+    output_path = run_ie_quote(ie_source, quote_config, log=messages.append)
+    assert "从断点继续: 前 5 个工作表使用上次已提取的结果" in messages
+    assert output_values(output_path) == expected
+    # 运行成功后删除断点
+    assert not os.listdir(os.path.join(quote_config['options']['cache_dir'], 'checkpoints'))
+
+
+def test_me_cancel_then_resume(me_source, quote_config, tmp_path):
+    expected = output_values(run_me_quote(me_source, quote_config, output_dir=str(tmp_path)))
+
+    cancel, log, _ = cancel_at("处理文件", 3)
+    with pytest.raises(Cancelled):
+        run_me_quote(me_source, quote_config, log=log, cancel=cancel)
+    messages = []
+    output_path = run_me_quote(me_source, quote_config, log=messages.append)
+    assert "从断点继续: 前 3 个文件使用上次已提取的结果" in messages
+    assert output_values(output_path) == expected
+
+
+@pytest.mark.parametrize('extract_cache', [False, True])
+def test_cancel_closes_reader_and_flushes_cache(ie_source, quote_config, monkeypatch, extract_cache):
+    quote_config['options']['extract_cache'] = extract_cache
+    readers = []
+    open_column_reader = quote_pipeline.open_column_reader
+
+    def tracked(*args):
+        reader = open_column_reader(*args)
+        close = reader.close
+
+        def tracked_close():
+            readers.remove(reader)
+            close()
+        reader.close = tracked_close
+        readers.append(reader)
+        return reader
+    monkeypatch.setattr(quote_pipeline, 'open_column_reader', tracked)
+
+    cancel, log, _ = cancel_at("处理工作表", 3)
+    with pytest.raises(Cancelled):
+        run_ie_quote(ie_source, quote_config, log=log, cancel=cancel)
+    assert readers == []
+    store = os.path.join(quote_config['options']['cache_dir'], STORE_NAME)
+    assert os.path.exists(store) == extract_cache
+
+
+def test_failed_save_keeps_original_error(ie_source, quote_config, monkeypatch):
+    def fail(self):
+        raise OSError("disk full")
+    monkeypatch.setattr(Checkpoint, 'save', fail)
+
+    cancel, log, seen = cancel_at("处理工作表", 2)
+    with pytest.raises(Cancelled):
+        run_ie_quote(ie_source, quote_config, log=log, cancel=cancel)
+    assert "写入断点失败: disk full" in seen
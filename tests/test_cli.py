@@ -0,0 +1,78 @@
+import json
+import os
+
+import cli
+
+
+def write_config(tmp_path, config):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return str(path)
+
+
+def test_ie_prints_output_path(tmp_path, ie_source, quote_config, capsys):
+    config_path = write_config(tmp_path, quote_config)
+    output_dir = str(tmp_path / 'out')
+    code = cli.main(['ie', ie_source, '-q', '--config', config_path, '--output-dir', output_dir, '--upusdl', '32'])
+    assert code == cli.EXIT_OK
+    output_path = capsys.readouterr().out.strip()
+    assert os.path.dirname(output_path) == output_dir
+    assert os.path.exists(output_path)
+
+
+def test_build_config_overrides(tmp_path, quote_config):
+    config_path = write_config(tmp_path, quote_config)
+    args = cli.build_parser().parse_args(['me', 'x', '--config', config_path, '--qty', '5', '--workers', '3',
+                                          '--no-cache', '--formula-values', 'values'])
+    config = cli.build_config(args)
+    assert config['params']['Qty'] == 5
+    assert config['options']['me_workers'] == 3
+    assert config['options']['extract_cache'] is False
+    assert config['options']['formula_values'] == 'values'
+
+
+def test_missing_input_fails(tmp_path, quote_config):
+    config_path = write_config(tmp_path, quote_config)
+    code = cli.main(['ie', str(tmp_path / 'missing.xlsx'), '-q', '--config', config_path])
+    assert code == cli.EXIT_FAILED
+
+
+def test_missing_template_is_usage_error(tmp_path, ie_source, quote_config):
+    quote_config['paths']['format_path'] = str(tmp_path / 'missing.xlsx')
+    config_path = write_config(tmp_path, quote_config)
+    assert cli.main(['ie', ie_source, '-q', '--config', config_path]) == cli.EXIT_USAGE
+
+
+def test_missing_config_is_usage_error(tmp_path, ie_source, capsys):
+    # 指定的配置文件不存在时不创建默认配置文件，也不使用默认参数报价
+    config_path = tmp_path / 'missing.json'
+    assert cli.main(['ie', ie_source, '-q', '--config', str(config_path)]) == cli.EXIT_USAGE
+    assert not config_path.exists()
+    assert "missing.json" in capsys.readouterr().err
+    assert cli.main(['history', '--config', str(config_path)]) == cli.EXIT_USAGE
+
+
+def test_malformed_config_is_usage_error(tmp_path, ie_source, capsys):
+    config_path = tmp_path / 'settings.json'
+    for content in ('{"params": {"Handling": 55,}}', '[]', '{"params": 5}'):
+        config_path.write_text(content, encoding='utf-8')
+        assert cli.main(['ie', ie_source, '-q', '--config', str(config_path)]) == cli.EXIT_USAGE
+        assert "配置文件格式错误" in capsys.readouterr().err
+    assert not [name for name in os.listdir(os.path.dirname(ie_source)) if name.startswith('Output_')]
+
+
+def test_default_config_is_not_written(tmp_path, monkeypatch):
+    # 未指定 --config 且 settings.json 不存在时使用默认配置，不写入文件
+    monkeypatch.chdir(tmp_path)
+    args = cli.build_parser().parse_args(['me', 'x'])
+    assert cli.build_config(args)['params'] == cli.ConfigManager.DEFAULT_CONFIG['params']
+    assert os.listdir(tmp_path) == []
+
+
+def test_relative_cache_dir_follows_config_file(tmp_path, quote_config, monkeypatch):
+    # 指定配置文件时，相对的 cache_dir 按配置文件所在目录解析，而不是当前工作目录
+    quote_config['options']['cache_dir'] = '.quote_cache'
+    config_path = write_config(tmp_path, quote_config)
+    monkeypatch.chdir(tmp_path.parent)
+    args = cli.build_parser().parse_args(['me', 'x', '--config', config_path])
+    assert cli.build_config(args)['options']['cache_dir'] == str(tmp_path / '.quote_cache')
@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from config_manager import APP_DIR, ConfigManager, resolve_cache_dir
+
+
+def test_missing_keys_use_defaults(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({'params': {'Handling': 55}, 'options': {'trace': True}}), encoding='utf-8')
+    config = ConfigManager.load_config(str(path))
+    assert config['params']['Handling'] == 55
+    assert config['params']['UPUSDL'] == ConfigManager.DEFAULT_CONFIG['params']['UPUSDL']
+    assert config['options']['trace'] is True
+    assert config['options']['formula_values'] == ConfigManager.DEFAULT_CONFIG['options']['formula_values']
+    assert config['paths'] == ConfigManager.DEFAULT_CONFIG['paths']
+
+
+def test_missing_file_writes_defaults(tmp_path):
+    path = tmp_path / 'settings.json'
+    assert ConfigManager.load_config(str(path)) == ConfigManager.DEFAULT_CONFIG
+    assert json.loads(path.read_text(encoding='utf-8')) == ConfigManager.DEFAULT_CONFIG
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    config = json.loads(json.dumps(ConfigManager.DEFAULT_CONFIG))
+    config['params']['Qty'] = 27
+    ConfigManager.save_config(config, path)
+    assert ConfigManager.load_config(path) == config
+
+
+def test_read_config_raises(tmp_path):
+    path = tmp_path / 'settings.json'
+    with pytest.raises(OSError):
+        ConfigManager.read_config(str(path))
+    path.write_text("{", encoding='utf-8')
+    with pytest.raises(ValueError):
+        ConfigManager.read_config(str(path))
+    # 界面仍按原来的方式回退到默认配置
+    assert ConfigManager.load_config(str(path)) == ConfigManager.DEFAULT_CONFIG
+
+
+def test_resolve_cache_dir(tmp_path):
+    assert resolve_cache_dir('') is None
+    assert resolve_cache_dir(None) is None
+    assert resolve_cache_dir('.quote_cache') == os.path.join(APP_DIR, '.quote_cache')
+    assert resolve_cache_dir('cache', str(tmp_path)) == str(tmp_path / 'cache')
+    assert resolve_cache_dir(str(tmp_path / 'cache'), '/elsewhere') == str(tmp_path / 'cache')
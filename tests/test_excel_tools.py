@@ -0,0 +1,239 @@
+import os
+from copy import copy
+
+import pytest
+import xlrd
+from openpyxl import load_workbook
+
+from excel_tools import IE_LABELS, ME_PART_ROWS, ME_TAIL_ROW, PANEL_QTY_LABEL, SheetLabelIndex, \
+    clear_normalize_cache, extract_ie_sheet, extract_me_board, find_b_column_header, find_b_column_header_xlrd, \
+    find_name_by_amount_xlrd, iter_me_records, MeLayout, natural_sort_key, RowStyle, normalize_text, _normalize_str
+
+
+@pytest.mark.parametrize('text, expected', [
+    (None, ""),
+    ("", ""),
+    ("B    Labor time(s/pcs)", "BLabortime(s/pcs)"),
+    ("Labor time\n(s/panel)", "Labortime(s/panel)"),
+    ("（Top　side），！？", "(Topside),!?"),
+    ("【备注】《A》", "【备注】《A》"),
+    (30, "30"),
+    (25.5, "25.5"),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_normalize_cache_keeps_types_apart():
+    clear_normalize_cache()
+    assert normalize_text(1) == "1"
+    assert normalize_text(1.0) == "1.0"
+    assert normalize_text(True) == "True"
+    assert _normalize_str.cache_info().currsize == 3
+    normalize_text("1")
+    assert _normalize_str.cache_info().hits == 1
+    clear_normalize_cache()
+    assert _normalize_str.cache_info().currsize == 0
+
+
+def counted(rows):
+    # 记录被遍历的行数，用于检查提前结束
+    counter = {'rows': 0}
+
+    def generate():
+        for row in rows:
+            counter['rows'] += 1
+            yield row
+    return generate(), counter
+
+
+def test_first_match_wins():
+    index = SheetLabelIndex.from_rows([("ICT", 1), ("ict", 2), (" I C T ", 3)])
+    assert index.get("ICT") == 1
+
+
+def test_labels_are_normalized():
+    index = SheetLabelIndex.from_rows([("Machine Time（s/pcs）", 12.5), ("Project　name", "P1")])
+    assert index.get("Machine Time(s/pcs)") == 12.5
+    assert index.get("Project name") == "P1"
+    assert index.get("SASM") is None
+
+
+def test_panel_qty_reads_next_row():
+    rows = [("x", "Panel Qty"), ("y", 4), ("z", "Panel  Qty"), ("w", 8)]
+    assert SheetLabelIndex.from_rows(rows).panel_qty == 4
+
+
+def test_panel_qty_on_last_row():
+    assert SheetLabelIndex.from_rows([("x", PANEL_QTY_LABEL)]).panel_qty is None
+
+
+def test_early_exit_once_required_labels_found():
+    rows = [("A", 1), ("B", 2), ("x", "Panel Qty"), ("y", 6)] + [("C", i) for i in range(100)]
+    iterator, counter = counted(rows)
+    index = SheetLabelIndex.from_rows(iterator, required=("A", "B"))
+    assert counter['rows'] == 4
+    assert (index.get("A"), index.get("B"), index.panel_qty) == (1, 2, 6)
+
+
+def test_early_exit_waits_for_panel_qty():
+    rows = [("A", 1), ("B", 2)] + [("C", i) for i in range(10)] + [("x", "Panel Qty"), ("y", 3), ("D", 0)]
+    iterator, counter = counted(rows)
+    index = SheetLabelIndex.from_rows(iterator, required=("A",))
+    assert counter['rows'] == 14
+    assert index.panel_qty == 3
+
+
+def test_without_required_reads_all_rows():
+    rows = [("A", 1), ("x", "Panel Qty"), ("y", 2), ("B", 3)]
+    iterator, counter = counted(rows)
+    SheetLabelIndex.from_rows(iterator)
+    assert counter['rows'] == 4
+
+
+class FakeXlrdSheet:
+    def __init__(self, columns):
+        self.columns = columns
+        self.ncols = len(columns)
+
+    def col_values(self, index):
+        return self.columns[index]
+
+
+def test_from_xlrd():
+    ws = FakeXlrdSheet([["", "", ""], ["SMT carrier", "Panel Qty", ""], [5, "Panel Qty", 2]])
+    index = SheetLabelIndex.from_xlrd(ws)
+    assert index.get("SMT carrier") == 5
+    assert index.panel_qty == 2
+    assert SheetLabelIndex.from_xlrd(FakeXlrdSheet([["a"]])).labels == {}
+
+
+def test_matches_column_scan_on_sample(logic_data):
+    # 样例 IE 源文件: 单次遍历的索引与逐个标签全列扫描 (find_b_column_header) 结果相同
+    wb = load_workbook(os.path.join(logic_data, 'IE.xlsx'), data_only=True)
+    for ws in wb.worksheets:
+        index = SheetLabelIndex.from_openpyxl(ws)
+        for label in IE_LABELS:
+            assert index.get(label) == find_b_column_header(ws, label), (ws.title, label)
+        record = extract_ie_sheet(ws, ws.title)
+        assert record.project_name == (find_b_column_header(ws, "Project name") or "")
+
+
+@pytest.mark.parametrize('required', [None, IE_LABELS])
+def test_panel_qty_matches_column_c_scan(logic_data, required):
+    wb = load_workbook(os.path.join(logic_data, 'IE.xlsx'), data_only=True)
+    for ws in wb.worksheets:
+        expected = None
+        for (cell,) in ws.iter_rows(min_col=3, max_col=3):
+            if normalize_text(cell.value) == normalize_text(PANEL_QTY_LABEL):
+                expected = ws.cell(row=cell.row + 1, column=3).value
+                break
+        assert SheetLabelIndex.from_openpyxl(ws, required).panel_qty == expected, ws.title
+
+
+def me_files(logic_data):
+    folder = os.path.join(logic_data, 'ME')
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder), key=natural_sort_key)]
+
+
+def test_extract_me_board_matches_xlrd_scan(logic_data):
+    for path in me_files(logic_data):
+        record = extract_me_board(path)
+        ws = xlrd.open_workbook(path).sheet_by_index(0)
+        assert record.stencil_top == (find_b_column_header_xlrd(ws, "Stencil (Top  side)") or 0)
+        assert record.stencil_bottom == (find_b_column_header_xlrd(ws, "Stencil (bottom side)") or 0)
+        assert record.smt_carrier == (find_b_column_header_xlrd(ws, "SMT carrier") or 0)
+        assert record.tail_part == find_name_by_amount_xlrd(ws, ME_TAIL_ROW)
+        parts = [find_name_by_amount_xlrd(ws, i) for i in ME_PART_ROWS]
+        assert record.parts == [part for part in parts if part[0] is not None]
+
+
+def test_iter_me_records_process_pool_keeps_order(logic_data):
+    paths = me_files(logic_data)
+    serial = list(iter_me_records(paths, workers=1))
+    assert [record.file_name for record in serial] == [os.path.basename(path) for path in paths]
+    assert list(iter_me_records(paths, workers=2)) == serial
+
+
+def test_closing_iter_me_records_does_not_wait_for_pool(logic_data, monkeypatch):
+    # 提前关闭时撤销排队中的文件，不等待整个文件夹解析完
+    import excel_tools
+
+    shutdowns = []
+
+    class RecordingExecutor(excel_tools.ProcessPoolExecutor):
+        def shutdown(self, wait=True, cancel_futures=False):
+            shutdowns.append((wait, cancel_futures))
+            super().shutdown(wait, cancel_futures=cancel_futures)
+    monkeypatch.setattr(excel_tools, 'ProcessPoolExecutor', RecordingExecutor)
+    paths = me_files(logic_data)
+    records = iter_me_records(paths, workers=2)
+    assert next(records).file_name == os.path.basename(paths[0])
+    records.close()
+    assert shutdowns[0] == (False, True)
+
+
+def test_me_layout_rows():
+    # 3 块板卡，治具明细分别 2/0/3 行: 模板第 11 行起的内容下移 4 行
+    layout = MeLayout([2, 0, 3])
+    assert layout.shift == 4
+    assert list(layout.board_rows) == [3, 4, 5]
+    assert layout.totals_row == 6
+    assert layout.parts_start == 15
+    assert [list(rows) for rows in layout.part_rows] == [[15, 16], [], [17, 18, 19]]
+    assert layout.parts_end == 20
+    assert list(layout.carrier_rows) == [20, 21, 22]
+    assert layout.sum_row == 23
+
+
+def test_me_layout_without_parts():
+    layout = MeLayout([0])
+    assert (layout.totals_row, layout.parts_start, layout.parts_end, layout.sum_row) == (4, 13, 13, 14)
+
+
+def template_row():
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    ws = Workbook().active
+    ws['A1'].font = Font(name="Arial", size=12, bold=True)
+    ws['A1'].fill = PatternFill('solid', fgColor='FFFF00')
+    ws['B1'].border = Border(left=Side(style='thin'))
+    ws['B1'].alignment = Alignment(horizontal='center', vertical='center')
+    ws['C1'].number_format = '0.00'
+    return ws[1]
+
+
+def cell_styles(cell):
+    return (copy(cell.font), copy(cell.fill), copy(cell.border), copy(cell.alignment), cell.number_format)
+
+
+def test_row_style_matches_per_cell_copy():
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Protection
+
+    row = template_row()
+    style = RowStyle.from_row(row)
+    ws = Workbook().active
+    ws['B2'].protection = Protection(locked=False)
+    style.apply(ws, 2)
+    style.apply(ws, 3)
+    for column, source in enumerate(row, 1):
+        assert cell_styles(ws.cell(row=3, column=column)) == cell_styles(source)
+        assert cell_styles(ws.cell(row=2, column=column)) == cell_styles(source)
+    # 已有样式的单元格只替换字体/填充/边框/对齐/数字格式
+    assert ws['B2'].protection.locked is False
+    assert ws['B3'].protection.locked is True
+    # 每个单元格各自一份 StyleArray，之后修改一个不影响同列其它行
+    ws['A2'].font = Font(name="Arial", size=20)
+    assert ws['A3'].font.size == 12
+
+
+def test_row_style_registers_once_per_workbook():
+    from openpyxl import Workbook
+
+    style = RowStyle.from_row(template_row())
+    wb = Workbook()
+    arrays = style.arrays(wb.active)
+    assert style.arrays(wb.create_sheet()) is arrays
+    assert style.arrays(Workbook().active) is not arrays
@@ -0,0 +1,143 @@
+import os
+import shutil
+
+import pytest
+from openpyxl import Workbook
+
+import extract_cache
+from extract_cache import ExtractCache, get_extract_cache, ie_sheet_keys
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 可控的最近使用时间
+    now = [1000.0]
+    monkeypatch.setattr(extract_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_flush_keeps_most_recently_used(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(extract_cache, 'MAX_ENTRIES', 3)
+    cache = ExtractCache(str(tmp_path))
+    for i in range(5):
+        clock[0] += 1
+        cache.put(('k', i), i)
+    clock[0] += extract_cache.ACCESS_REFRESH + 1
+    assert cache.get(('k', 0)) == 0
+    cache.flush()
+    reloaded = ExtractCache(str(tmp_path))
+    assert [reloaded.get(('k', i)) for i in range(5)] == [0, None, None, 3, 4]
+
+
+def test_recent_hits_do_not_rewrite_store(tmp_path, monkeypatch, clock):
+    cache = ExtractCache(str(tmp_path))
+    cache.put('a', 1)
+    cache.flush()
+    writes = []
+    monkeypatch.setattr(ExtractCache, '_write_store', lambda self, entries: writes.append(len(entries)))
+    reloaded = ExtractCache(str(tmp_path))
+    clock[0] += 60
+    assert reloaded.get('a') == 1
+    reloaded.flush()
+    assert writes == []
+    # 最近使用时间过期后命中才写回
+    clock[0] += extract_cache.ACCESS_REFRESH
+    assert reloaded.get('a') == 1
+    reloaded.flush()
+    assert writes == [1]
+
+
+def test_flush_merges_other_writers(tmp_path):
+    first, second = ExtractCache(str(tmp_path)), ExtractCache(str(tmp_path))
+    first.get('warm-up')
+    second.put('b', 2)
+    second.flush()
+    first.put('a', 1)
+    first.flush()
+    reloaded = ExtractCache(str(tmp_path))
+    assert (reloaded.get('a'), reloaded.get('b')) == (1, 2)
+
+
+def test_version_change_discards_store(tmp_path, monkeypatch):
+    cache = ExtractCache(str(tmp_path))
+    cache.put('a', 1)
+    cache.flush()
+    monkeypatch.setattr(extract_cache, 'EXTRACT_VERSION', extract_cache.EXTRACT_VERSION + 1)
+    assert ExtractCache(str(tmp_path)).get('a') is None
+
+
+def test_memory_only_cache_does_not_write(tmp_path):
+    cache = ExtractCache()
+    cache.put('a', 1)
+    cache.flush()
+    assert cache.get('a') == 1
+    assert get_extract_cache(None) is get_extract_cache(None)
+
+
+def test_ie_sheet_keys_change_per_sheet(tmp_path):
+    path = str(tmp_path / 'IE.xlsx')
+    wb = Workbook()
+    wb.active.title = 'A'
+    wb.active['B1'] = 1
+    wb.create_sheet('B')['B1'] = 2
+    wb.save(path)
+    before = ie_sheet_keys(path)
+    wb['B']['B1'] = 3
+    wb.save(path)
+    after = ie_sheet_keys(path)
+    assert list(after) == ['A', 'B']
+    assert after['A'] == before['A']
+    assert after['B'] != before['B']
+
+
+def test_ie_sheet_keys_of_invalid_file(tmp_path):
+    path = tmp_path / 'bad.xlsx'
+    path.write_bytes(b'not a zip')
+    assert ie_sheet_keys(str(path)) is None
+
+
+def test_me_records_reuse_cache_after_rename(tmp_path, logic_data, monkeypatch):
+    folder = tmp_path / 'ME'
+    folder.mkdir()
+    source = sorted(os.listdir(os.path.join(logic_data, 'ME')))[0]
+    shutil.copy(os.path.join(logic_data, 'ME', source), folder / source)
+    cache = ExtractCache()
+    first, = cache.iter_me_records([str(folder / source)])
+
+    def fail(paths, workers=1):
+        assert list(paths) == []
+        return (record for record in ())
+    monkeypatch.setattr(extract_cache, 'iter_me_records', fail)
+    os.rename(folder / source, folder / '99.NEW_Board_V1_PCBA.xls')
+    second, = cache.iter_me_records([str(folder / '99.NEW_Board_V1_PCBA.xls')])
+    assert second.file_name == '99.NEW_Board_V1_PCBA.xls'
+    assert second.board_name == 'NEW*Board*V1*PCBA'
+    assert second._replace(file_name=first.file_name, board_name=first.board_name) == first
+
+
+def test_ie_quote_reuses_extracted_sheets(ie_source, quote_config):
+    from quote_pipeline import run_ie_quote
+
+    logs = []
+    run_ie_quote(ie_source, quote_config)
+    run_ie_quote(ie_source, quote_config, log=logs.append)
+    assert any(line.endswith("个工作表未改动，使用缓存的提取结果") for line in logs)
+
+
+def test_closing_me_iteration_closes_parser(tmp_path, monkeypatch, logic_data):
+    # 提前关闭缓存的迭代时，底层的解析 (进程池) 同样关闭
+    closed = []
+
+    def parse(paths, workers=1):
+        try:
+            for path in paths:
+                yield path
+        finally:
+            closed.append(True)
+    monkeypatch.setattr(extract_cache, 'iter_me_records', parse)
+    folder = os.path.join(logic_data, 'ME')
+    paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder))[:3]]
+    records = ExtractCache(str(tmp_path)).iter_me_records(paths)
+    next(records)
+    records.close()
+    assert closed == [True]
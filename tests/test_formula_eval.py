@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+
+import formula_eval
+from formula_eval import evaluate_ie, excel_round, excel_roundup
+from quote_pipeline import IE_LIVE_COLUMNS, ME_LIVE_COLUMNS, run_ie_quote, run_me_quote
+
+
+# Excel 中的计算结果
+@pytest.mark.parametrize('value, digits, expected', [
+    (2.5, 0, 3), (-2.5, 0, -3), (0.5, 0, 1), (1.005, 2, 1.01), (2.675, 2, 2.68), (0.285, 2, 0.29),
+    (1.6006666, 2, 1.6), (1234.5678, -2, 1200), (-1.005, 2, -1.01), (0, 2, 0),
+])
+def test_excel_round(value, digits, expected):
+    assert excel_round(value, digits) == expected
+
+
+@pytest.mark.parametrize('value, digits, expected', [
+    (3.2, 0, 4), (-3.2, 0, -4), (0.1 + 0.2, 1, 0.3), (1.1 * 3, 1, 3.3), (1.92, 2, 1.92), (31.5, -1, 40),
+    (1.921, 2, 1.93), (0, 2, 0),
+])
+def test_excel_roundup(value, digits, expected):
+    assert excel_roundup(value, digits) == expected
+
+
+def test_evaluate_ie_hand_computed():
+    # G = 80/0.8 = 100，N = 100 + 60 = 160，P = ROUND(34.3*160/3600*1.05, 2) = 1.6
+    values = evaluate_ie(3, [(80, 0, 0, 0, 0, 0), (0, 0, 0, 0, 0, 36)], 60, 34.3, 162.8)
+    assert values['G3'] == 100
+    assert values['N3'] == 160
+    assert values['P3'] == 1.6
+    assert values['X3'] == 1.92
+    assert values['Y3'] == 2.4
+    assert values['Z3'] == 5.92
+    # S = ROUND(162.8*36/3600*1.05, 2) = ROUND(1.7094, 2)
+    assert values['S4'] == 1.71
+    assert values['U3'] == 0
+
+
+def test_evaluate_ie_text_is_not_a_number():
+    values = evaluate_ie(3, [("n/a", 0, 0, 0, "x", 0)], 60, 34.3, 162.8)
+    assert np.isnan(values['G3'])
+    assert np.isnan(values['Z3'])
+
+
+def test_ie_columns_quantity_tiers():
+    inputs = [(80, 0, 0, 0, 0, 0)]
+    low = formula_eval.ie_columns(inputs, 60, 34.3, 162.8, fcst=999)
+    high = formula_eval.ie_columns(inputs, 60, 34.3, 162.8, fcst=1000, bom=100)
+    assert low['P'][0] == 1.6
+    assert high['P'][0] == excel_round(34.3 * 160 / 3600 * 1.02, 2)
+    assert high['W'][0] == pytest.approx(0.2)
+
+
+def sheet_cells(path, data_only):
+    ws = load_workbook(path, data_only=data_only).active
+    return {cell.coordinate: cell.value for row in ws.iter_rows() for cell in row if cell.value is not None}
+
+
+def formula_columns(path):
+    return {coordinate.rstrip('0123456789') for coordinate, value in sheet_cells(path, False).items()
+            if isinstance(value, str) and value.startswith('=')}
+
+
+def test_default_mode_writes_formulas_only(ie_source, quote_config):
+    assert quote_config['options']['formula_values'] == 'formula'
+    output_path = run_ie_quote(ie_source, quote_config)
+    assert load_workbook(output_path, data_only=True).active['Z3'].value is None
+
+
+def test_cached_mode(ie_source, quote_config):
+    quote_config['options']['formula_values'] = 'cached'
+    output_path = run_ie_quote(ie_source, quote_config)
+    ws = load_workbook(output_path).active
+    assert ws['Z3'].value == "=ROUNDUP(SUM(T3,W3:Y3),2)"
+    cached = load_workbook(output_path, data_only=True).active
+    assert isinstance(cached['Z3'].value, (int, float))
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_values_mode_keeps_input_dependent_formulas_ie(ie_source, quote_config, stream):
+    quote_config['options'].update({'formula_values': 'values', 'stream_output': stream})
+    output_path = run_ie_quote(ie_source, quote_config)
+    # 只有不依赖 F/L/V 的列换成数值
+    assert formula_columns(output_path) == set(IE_LIVE_COLUMNS)
+    ws = load_workbook(output_path).active
+    assert isinstance(ws['G3'].value, (int, float))
+    assert ws['U3'].value == "=F3"
+    assert ws['P3'].value.startswith("=ROUND((O3*N3/3600)*IF(F3<1000")
+    cached = load_workbook(output_path, data_only=True).active
+    assert isinstance(cached['Z3'].value, (int, float))
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_values_mode_keeps_input_dependent_formulas_me(me_source, quote_config, stream):
+    quote_config['options'].update({'formula_values': 'values', 'stream_output': stream})
+    output_path = run_me_quote(me_source, quote_config)
+    assert formula_columns(output_path) == set(ME_LIVE_COLUMNS)
+    ws = load_workbook(output_path).active
+    assert isinstance(ws['I3'].value, (int, float))
+    assert ws['S3'].value == "=Q3*R3"
+    cached = load_workbook(output_path, data_only=True).active
+    assert isinstance(cached['X3'].value, (int, float))
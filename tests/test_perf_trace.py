@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from perf_trace import NULL_TRACER, Tracer, make_tracer, trace_path
+
+
+def test_null_tracer():
+    assert make_tracer(False) is NULL_TRACER
+    with NULL_TRACER.span('extract', sheet='1') as span:
+        assert span is NULL_TRACER.span('save')
+    assert NULL_TRACER.summary_lines() == []
+    assert NULL_TRACER.write('unused.json') is None
+
+
+def test_spans_are_recorded_on_error():
+    tracer = make_tracer(True)
+    with pytest.raises(ValueError):
+        with tracer.span('extract', sheet='1'):
+            raise ValueError
+    with tracer.span('extract', sheet='2'):
+        pass
+    with tracer.span('save'):
+        pass
+    assert [span[0] for span in tracer.spans] == ['extract', 'extract', 'save']
+    assert {name: count for name, (_, count) in tracer.totals().items()} == {'extract': 2, 'save': 1}
+
+
+def test_summary_lists_slowest_items():
+    tracer = Tracer()
+    for index, duration in enumerate([5, 30, 10]):
+        tracer._record('extract', tracer.origin, duration * 10 ** 6, {'sheet': str(index)})
+    lines = tracer.summary_lines(top=2)
+    assert lines[1] == "  extract: 45.0 ms (3 次)"
+    assert lines[3:] == ["    extract [sheet=1]: 30.0 ms", "    extract [sheet=2]: 10.0 ms"]
+
+
+def test_chrome_trace_file(tmp_path):
+    tracer = Tracer()
+    with tracer.span('write', sheet='A'):
+        pass
+    path = tracer.write(trace_path(str(tmp_path / 'Output_IE_1.xlsx')))
+    assert os.path.basename(path) == 'Output_IE_1.trace.json'
+    with open(path, encoding='utf-8') as f:
+        event, = json.load(f)['traceEvents']
+    assert (event['name'], event['ph'], event['args']) == ('write', 'X', {'sheet': 'A'})
+    assert event['dur'] >= 0
+
+
+def test_quote_writes_trace(ie_source, quote_config):
+    from quote_pipeline import run_ie_quote
+
+    quote_config['options']['trace'] = True
+    logs = []
+    output_path = run_ie_quote(ie_source, quote_config, log=logs.append)
+    assert os.path.exists(trace_path(output_path))
+    assert any(line.startswith("耗时统计:") for line in logs)
@@ -0,0 +1,88 @@
+import pytest
+from openpyxl import load_workbook
+
+from quantity_tiers import (CURVE_SHEET_TITLE, DEFAULT_FORMULAS, DEFAULT_TIERS, check_tiers, ie_tier_formulas,
+                            quantity_list, tier_formula, tier_tables, tier_values)
+from quote_pipeline import run_ie_quote
+
+# 原来写死在 ie_row_values 中的公式
+OLD_FORMULAS = {
+    'cost_factor': "IF(F{n}<1000,1.05,1.02)",
+    'loss_rate': "IF(F{n}<1000,0.004,0.002)",
+    'ohlh_factor': "IF(F{n}<500,1.2,IF(F{n}<1000,1,IF(F{n}>5000,0.6,0.8)))",
+    'sga_factor': "IF(F{n}<500,1.5,IF(F{n}<1000,1.2,IF(F{n}>5000,0.6,0.9)))",
+}
+
+QUANTITIES = [0, 27, 499, 500, 999, 1000, 4999, 5000, 5001, 1e6]
+
+
+def evaluate(formula, quantity):
+    # 按 Excel 的 IF 求值由 tier_formula 生成的公式
+    return eval(formula.replace("F{n}", repr(float(quantity))), {'IF': lambda test, a, b: a if test else b})
+
+
+def test_default_formulas_match_old_formulas():
+    assert DEFAULT_FORMULAS == OLD_FORMULAS
+    assert ie_tier_formulas(tier_tables({})) == OLD_FORMULAS
+
+
+@pytest.mark.parametrize('name', sorted(OLD_FORMULAS))
+def test_tier_values_match_formula(name):
+    tiers = DEFAULT_TIERS[name]
+    expected = [evaluate(OLD_FORMULAS[name], q) for q in QUANTITIES]
+    assert list(tier_values(tiers, QUANTITIES)) == expected
+
+
+def test_custom_tiers():
+    tiers = [{'below': 100, 'value': 2}, {'upto': 200.5, 'value': 1.5}, {'value': 1}]
+    formula = tier_formula(tiers, "F{n}")
+    assert formula == "IF(F{n}<100,2,IF(F{n}>200.5,1,1.5))"
+    quantities = [50, 100, 200.5, 201]
+    assert list(tier_values(tiers, quantities)) == [evaluate(formula, q) for q in quantities] == [2, 1.5, 1.5, 1]
+    assert tier_formula([{'value': 3}], "F3") == "3"
+
+
+@pytest.mark.parametrize('tiers', [
+    [],
+    None,
+    [{'below': 1, 'value': 2}],
+    [{'value': 1}, {'value': 2}],
+    [{'below': 1, 'upto': 2, 'value': 1}, {'value': 2}],
+    [{'below': "1", 'value': 1}, {'value': 2}],
+    [{'below': 1, 'value': True}, {'value': 2}],
+    [{'below': 1}, {'value': 2}],
+])
+def test_check_tiers_errors(tiers):
+    with pytest.raises(ValueError):
+        check_tiers('cost_factor', tiers)
+
+
+def test_tier_tables_merges_defaults():
+    tables = tier_tables({'quantity_tiers': {'loss_rate': [{'value': 0.01}]}})
+    assert tables['loss_rate'] == [{'value': 0.01}]
+    assert tables['cost_factor'] == DEFAULT_TIERS['cost_factor']
+    with pytest.raises(ValueError):
+        tier_tables({'quantity_tiers': {'sga_factor': []}})
+
+
+def test_quantity_list():
+    assert quantity_list({'options': {'quantity_curve': [1000, 100, "500", 100]}}) == [100, 500, 1000]
+    assert quantity_list({'options': {}}) == []
+    for bad in ([-1], ["x"], 5):
+        with pytest.raises(ValueError):
+            quantity_list({'options': {'quantity_curve': bad}})
+
+
+def test_quantity_curve_sheet(ie_source, quote_config):
+    quote_config['options'].update({'quantity_curve': [27, 3000], 'formula_values': 'cached'})
+    quote_config['quantity_tiers'] = {'cost_factor': [{'below': 1000, 'value': 1.1}, {'value': 1.02}]}
+    output_path = run_ie_quote(ie_source, quote_config)
+    wb = load_workbook(output_path, data_only=True)
+    ws = wb.worksheets[0]
+    assert load_workbook(output_path).worksheets[0]['P3'].value.endswith("*IF(F3<1000,1.1,1.02),2)")
+    rows = list(wb[CURVE_SHEET_TITLE].values)
+    assert list(rows[0]) == ["Source", "Sheet", "Program Name", 27, 3000]
+    assert [row[1] for row in rows[1:]] == load_workbook(ie_source, read_only=True).sheetnames
+    # Qty 为 27，曲线中 27 一列与输出表 Z 列的结果相同
+    for n, row in enumerate(rows[1:], start=3):
+        assert row[3] == pytest.approx(ws[f'Z{n}'].value)
@@ -0,0 +1,103 @@
+import csv
+import importlib.util
+import math
+import os
+import sqlite3
+
+import pytest
+from openpyxl import load_workbook
+
+import quote_export
+from quote_export import export_tables, parse_formats
+from quote_pipeline import run_ie_quote, run_me_quote
+
+COLUMNS = [('name', 'TEXT'), ('value', 'REAL'), ('count', 'INTEGER')]
+ROWS = [("a", 1.5, 1), ("b", None, 2), ("c", 3.25, 3)]
+
+
+def test_parse_formats():
+    assert parse_formats(" CSV,sqlite, csv,") == ['csv', 'sqlite']
+    assert parse_formats(['parquet']) == ['parquet']
+    assert parse_formats(None) == [] and parse_formats("") == []
+    with pytest.raises(ValueError):
+        parse_formats("csv,xlsx")
+
+
+@pytest.mark.parametrize('value, expected', [
+    (2, 2.0), ("text", None), (None, None), (math.nan, None), (math.inf, None), ([1], None),
+])
+def test_real(value, expected):
+    assert quote_export._real(value) == expected
+
+
+def test_export_csv_and_sqlite(tmp_path):
+    output_path = str(tmp_path / 'Output.xlsx')
+    paths = export_tables(output_path, [('items', COLUMNS, iter(ROWS), ('name',))], "csv,sqlite", batch_size=2)
+    base = str(tmp_path / 'Output')
+    assert sorted(paths) == [f"{base}.items.csv", f"{base}.sqlite"]
+    with open(f"{base}.items.csv", newline='', encoding='utf-8-sig') as f:
+        assert list(csv.reader(f)) == [['name', 'value', 'count'], ['a', '1.5', '1'], ['b', '', '2'],
+                                       ['c', '3.25', '3']]
+    connection = sqlite3.connect(f"{base}.sqlite")
+    try:
+        assert connection.execute('SELECT * FROM items').fetchall() == ROWS
+        assert connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'").fetchall() == [('items_name',)]
+    finally:
+        connection.close()
+
+
+def test_failed_export_removes_files(tmp_path):
+    def rows():
+        yield ROWS[0]
+        raise RuntimeError("broken")
+    with pytest.raises(RuntimeError):
+        export_tables(str(tmp_path / 'Output.xlsx'), [('items', COLUMNS, rows(), ())], ['csv', 'sqlite'],
+                      batch_size=1)
+    assert os.listdir(tmp_path) == []
+
+
+def test_parquet_requires_pyarrow(tmp_path):
+    if importlib.util.find_spec('pyarrow') is not None:
+        pytest.skip("已安装 pyarrow")
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        export_tables(str(tmp_path / 'Output.xlsx'), [('items', COLUMNS, iter(ROWS), ())], ['csv', 'parquet'])
+    assert os.listdir(tmp_path) == []
+
+
+def query(path, sql):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+def cached_values(output_path, columns, rows):
+    ws = load_workbook(output_path, data_only=True).active
+    return [tuple(ws[f'{column}{n}'].value for column in columns) for n in rows]
+
+
+def test_ie_export_matches_cached_values(ie_source, quote_config):
+    quote_config['options'].update({'export_formats': ['sqlite'], 'formula_values': 'cached'})
+    output_path = run_ie_quote(ie_source, quote_config)
+    rows = query(os.path.splitext(output_path)[0] + '.sqlite',
+                 'SELECT dl_cost, oh_cost, loss, ohlh, sga, mva FROM ie_sheets ORDER BY rowid')
+    expected = cached_values(output_path, 'PSWXYZ', range(3, 3 + len(rows)))
+    assert len(rows) == len(load_workbook(ie_source, read_only=True).sheetnames)
+    for row, values in zip(rows, expected):
+        assert row == pytest.approx(values)
+
+
+def test_me_export_matches_cached_values(me_source, quote_config):
+    quote_config['options'].update({'export_formats': ['csv', 'sqlite'], 'formula_values': 'cached'})
+    output_path = run_me_quote(me_source, quote_config)
+    base = os.path.splitext(output_path)[0]
+    rows = query(f"{base}.sqlite", 'SELECT board_no, total, total_tax FROM me_boards ORDER BY board_no')
+    assert [board_no for board_no, *_ in rows] == list(range(1, len(os.listdir(me_source)) + 1))
+    expected = cached_values(output_path, 'XY', range(3, 3 + len(rows)))
+    for (_, *totals), values in zip(rows, expected):
+        assert totals == pytest.approx(values)
+    with open(f"{base}.me_boards.csv", newline='', encoding='utf-8-sig') as f:
+        assert len(list(csv.DictReader(f))) == len(rows)
+    assert query(f"{base}.sqlite", 'SELECT COUNT(*) FROM me_parts')[0][0] > 0
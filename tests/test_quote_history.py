@@ -0,0 +1,92 @@
+import os
+from datetime import date, datetime
+
+import pytest
+
+from quote_history import QuoteHistory, format_value, history_path, parse_date
+from quote_pipeline import run_me_quote
+
+PARAMS = {'Handling': 60, 'UPUSDL': 34.3, 'UPUSOH': 162.8, 'StencilQty': 1, 'SMTCarrierQty': 2, 'Qty': 27}
+
+
+def board_row(board_no, name, total):
+    # me_boards 的一行 (见 quote_export.ME_BOARD_COLUMNS)
+    return (board_no, f"{name}.xls", name, 1, 100.0, 100.0, 2, 50.0, 100.0, None, None, None, 0.0, total,
+            total * 1.13)
+
+
+@pytest.fixture
+def history(tmp_path):
+    with QuoteHistory(str(tmp_path / 'history.sqlite')) as history:
+        history.record_run('me', 'ME', 'Output_ME_1.xlsx', PARAMS, [
+            board_row(1, "ABC_100", 200.0), board_row(2, "A%C_200", 300.0)], created_at=datetime(2026, 3, 1, 9))
+        history.record_run('me', 'ME', 'Output_ME_2.xlsx', dict(PARAMS, Qty="x"), [
+            board_row(1, "abc_100", 210.0), board_row(2, "XYZ", 400.0)], created_at=datetime(2026, 3, 5, 18))
+        yield history
+
+
+def test_history_path(quote_config):
+    assert history_path(quote_config) == os.path.join(quote_config['options']['cache_dir'], 'quote_history.sqlite')
+    quote_config['options']['quote_history'] = False
+    assert history_path(quote_config) is None
+    quote_config['options'].update({'quote_history': True, 'cache_dir': ''})
+    assert history_path(quote_config) is None
+
+
+def test_find_by_name_ignores_case(history):
+    rows = history.find('me', "ABC_100")
+    # 最新的运行在前
+    assert [(row['board_name'], row['total']) for row in rows] == [("abc_100", 210.0), ("ABC_100", 200.0)]
+    assert rows[0]['output_path'] == os.path.abspath('Output_ME_2.xlsx')
+    assert rows[0]['qty'] is None and rows[1]['qty'] == 27
+    assert history.find('me', "ABC") == []
+    assert history.find('ie', "ABC_100") == []
+
+
+@pytest.mark.parametrize('pattern, names', [
+    ("a*", ["abc_100", "ABC_100", "A%C_200"]),
+    ("a?c_*", ["abc_100", "ABC_100", "A%C_200"]),
+    # % 与 _ 按字面匹配
+    ("a%*", ["A%C_200"]),
+    ("*c_1*", ["abc_100", "ABC_100"]),
+    ("x?", []),
+])
+def test_find_with_wildcards(history, pattern, names):
+    assert [row['board_name'] for row in history.find('me', pattern)] == names
+
+
+def test_exact_name_uses_index(history):
+    plan = history.connection.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM me_boards t WHERE t.board_name = ?', ("abc_100",)).fetchall()
+    assert any('me_boards_board_name' in row[-1] for row in plan)
+
+
+def test_find_by_date(history):
+    assert len(history.find('me', since="2026-03-02")) == 2
+    assert len(history.find('me', until=date(2026, 3, 1))) == 2
+    # 起止日期都包含在内
+    assert len(history.find('me', since="2026-03-01", until="2026-03-05")) == 4
+    assert history.find('me', since="2026-03-06") == []
+    assert len(history.find('me', limit=3)) == 3
+    with pytest.raises(ValueError):
+        history.find('me', since="2026/03/01")
+
+
+def test_runs(history):
+    assert [run['output_path'] for run in history.runs('me')] == [
+        os.path.abspath('Output_ME_2.xlsx'), os.path.abspath('Output_ME_1.xlsx')]
+    assert history.runs('ie') == []
+
+
+def test_helpers():
+    assert parse_date("2026-10-18") == date(2026, 10, 18)
+    assert [format_value(value) for value in (None, 1.5, 2.0, 1 / 3, 7, "x")] == ['', '1.5', '2', '0.3333', '7', 'x']
+
+
+def test_pipeline_records_history(me_source, quote_config):
+    output_path = run_me_quote(me_source, quote_config)
+    with QuoteHistory(history_path(quote_config)) as history:
+        rows = history.find('me')
+        assert len(rows) == len(os.listdir(me_source))
+        assert {row['output_path'] for row in rows} == {os.path.abspath(output_path)}
+        assert rows[0]['qty'] == 27
@@ -0,0 +1,121 @@
+import os
+import shutil
+
+import pytest
+from openpyxl import load_workbook
+
+from checkpoint import CancelToken, Cancelled
+from excel_tools import natural_sort_key, parse_board_name
+from quote_pipeline import make_output_path, run_ie_batch, run_ie_quote, run_me_quote
+
+
+def test_ie_quote_writes_one_row_per_sheet(ie_source, quote_config):
+    output_path = run_ie_quote(ie_source, quote_config)
+    assert os.path.dirname(output_path) == os.path.dirname(ie_source)
+    assert os.path.basename(output_path).startswith('Output_IE_')
+    source = load_workbook(ie_source, read_only=True)
+    ws = load_workbook(output_path).active
+    assert ws.max_row == 2 + len(source.sheetnames)
+    n = 3
+    assert ws[f'M{n}'].value == 60
+    assert ws[f'O{n}'].value == 34.3
+    assert ws[f'R{n}'].value == 162.8
+    assert ws[f'N{n}'].value == f"=SUM(G{n}:M{n})"
+    assert ws[f'P{n}'].value == f"=ROUND((O{n}*N{n}/3600)*IF(F{n}<1000,1.05,1.02),2)"
+    assert ws[f'Z{n}'].value == f"=ROUNDUP(SUM(T{n},W{n}:Y{n}),2)"
+    assert ws[f'G{n}'].value.endswith("/0.8")
+    assert ws.row_dimensions[n].height == 31
+
+
+def test_me_quote_writes_board_rows(me_source, quote_config):
+    output_path = run_me_quote(me_source, quote_config)
+    ws = load_workbook(output_path).active
+    files = sorted(os.listdir(me_source), key=natural_sort_key)
+    for n, file_name in enumerate(files, start=3):
+        assert ws[f'B{n}'].value == str(n - 2)
+        assert ws[f'C{n}'].value == parse_board_name(file_name)
+        assert ws[f'I{n}'].value == f"=G{n}*H{n}"
+    totals = 3 + len(files)
+    assert ws[f'X{totals}'].value == f"=SUM(X3:X{totals - 1})"
+
+
+def test_missing_template(ie_source, quote_config):
+    quote_config['paths']['format_path'] = os.path.join(os.path.dirname(ie_source), 'missing.xlsx')
+    with pytest.raises(FileNotFoundError, match='missing.xlsx'):
+        run_ie_quote(ie_source, quote_config)
+    assert not [f for f in os.listdir(os.path.dirname(ie_source)) if f.startswith('Output_')]
+
+
+def test_make_output_path_is_unique(tmp_path):
+    paths = [make_output_path(str(tmp_path), "Output_IE") for _ in range(3)]
+    assert len(set(paths)) == 3
+    assert all(os.path.exists(path) for path in paths)
+
+
+def output_values(path):
+    return [[cell.value for cell in row] for row in load_workbook(path).active.iter_rows()]
+
+
+@pytest.mark.parametrize('reader', ['xml', 'openpyxl'])
+def test_ie_streaming_source_matches_full_load(ie_source, quote_config, tmp_path, reader):
+    # 只读流式打开源文件与完整加载得到相同的输出
+    quote_config['options'].update({'ie_reader': reader, 'extract_cache': False})
+    outputs = []
+    for streaming in (False, True):
+        quote_config['options']['ie_streaming'] = streaming
+        output_dir = tmp_path / f'out_{streaming}'
+        output_dir.mkdir()
+        outputs.append(output_values(run_ie_quote(ie_source, quote_config, output_dir=str(output_dir))))
+    assert outputs[0] == outputs[1]
+
+
+@pytest.fixture
+def batch_sources(ie_source):
+    # 两个有效的源文件 (样例的副本) 与一个无法打开的文件
+    folder = os.path.dirname(ie_source)
+    paths = []
+    for name in ('a.xlsx', 'b.xlsx'):
+        path = os.path.join(folder, name)
+        shutil.copy(ie_source, path)
+        paths.append(path)
+    broken = os.path.join(folder, 'broken.xlsx')
+    with open(broken, 'w') as f:
+        f.write("not a workbook")
+    return paths + [broken]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_ie_batch_separate_outputs(batch_sources, quote_config, tmp_path, workers):
+    quote_config['options']['ie_workers'] = workers
+    progress = []
+    results = run_ie_batch(batch_sources, quote_config, progress=progress.append, output_dir=str(tmp_path))
+    assert [result.source_path for result in results] == batch_sources
+    a, b, broken = results
+    assert a.error is None and b.error is None and a.output_path != b.output_path
+    assert broken.output_path is None and broken.error is not None
+    assert output_values(a.output_path) == output_values(b.output_path)
+    assert progress[-1] == 100
+
+
+def test_ie_batch_merge(batch_sources, quote_config, tmp_path):
+    single = output_values(run_ie_quote(batch_sources[0], quote_config, output_dir=str(tmp_path)))
+    merged_dir = tmp_path / 'merged'
+    merged_dir.mkdir()
+    results = run_ie_batch(batch_sources, quote_config, output_dir=str(merged_dir), merge=True)
+    assert results[0].output_path == results[1].output_path and results[2].output_path is None
+    wb = load_workbook(results[0].output_path)
+    assert wb.sheetnames == ['a', 'b']
+    for ws in wb.worksheets:
+        assert [[cell.value for cell in row] for row in ws.iter_rows()] == single
+
+
+def test_ie_batch_cancel(batch_sources, quote_config, tmp_path):
+    quote_config['options']['ie_workers'] = 1
+    cancel = CancelToken()
+
+    def log(message):
+        if message.startswith("[1/3]"):
+            cancel.cancel()
+    with pytest.raises(Cancelled):
+        run_ie_batch(batch_sources, quote_config, log=log, output_dir=str(tmp_path), cancel=cancel)
+    assert len([name for name in os.listdir(tmp_path) if name.startswith('Output_IE_')]) == 1
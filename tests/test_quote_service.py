@@ -0,0 +1,150 @@
+import asyncio
+import http.client
+import io
+import json
+import os
+import threading
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+import quote_service
+from quote_service import QuoteService, check_loopback
+
+
+@pytest.fixture
+def service(quote_config):
+    # 在后台线程的事件循环中启动服务 (端口由系统分配)
+    service = QuoteService(quote_config, port=0, workers=1, max_queue=2, max_upload_mb=10)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(service.start())
+        started.set()
+        loop.run_forever()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(30)
+    yield service
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    loop.close()
+
+
+def request(service, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', service.port, timeout=60)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def me_zip(folder):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name in os.listdir(folder):
+            archive.write(os.path.join(folder, name), f"boards/{name}")
+        archive.writestr("boards/readme.txt", "ignored")
+    return buffer.getvalue()
+
+
+def test_health(service):
+    status, headers, body = request(service, 'GET', '/health')
+    assert status == 200 and headers['Content-Type'].startswith('application/json')
+    assert json.loads(body) == {'status': 'ok', 'running': 0, 'waiting': 0, 'workers': 1, 'max_queue': 2}
+
+
+def test_ie_xlsx(service, ie_source, tmp_path):
+    status, headers, body = request(service, 'POST', '/quote/ie', read(ie_source))
+    assert status == 200 and headers['Content-Type'] == quote_service.XLSX_CONTENT_TYPE
+    assert 'Output_IE_' in headers['Content-Disposition']
+    path = tmp_path / 'out.xlsx'
+    path.write_bytes(body)
+    ws = load_workbook(path).active
+    assert ws.max_row == 2 + len(load_workbook(ie_source, read_only=True).sheetnames)
+    assert ws['O3'].value == 34.3
+
+
+def test_ie_json_with_params(service, ie_source):
+    status, _, body = request(service, 'POST', '/quote/ie?format=json&upusdl=32&name=../IE.xlsx', read(ie_source))
+    assert status == 200
+    result = json.loads(body)
+    assert result['kind'] == 'ie' and result['params']['UPUSDL'] == 32
+    rows = result['tables']['ie_sheets']
+    assert len(rows) == len(load_workbook(ie_source, read_only=True).sheetnames)
+    assert {row['source_file'] for row in rows} == {'IE.xlsx'}
+    assert {row['up_dl'] for row in rows} == {32}
+    # 参数只对本次请求有效
+    assert service.config['params']['UPUSDL'] == 34.3
+
+
+def test_me_zip_json(service, me_source):
+    status, _, body = request(service, 'POST', '/quote/me?format=json', me_zip(me_source))
+    assert status == 200
+    tables = json.loads(body)['tables']
+    assert [row['board_no'] for row in tables['me_boards']] == list(range(1, len(os.listdir(me_source)) + 1))
+    assert all(row['total'] > 0 for row in tables['me_boards'])
+
+
+def test_non_finite_values_are_null(service, ie_source):
+    # 参数为 NaN 时各项成本无法计算，JSON 中为 null (而不是 500)
+    status, _, body = request(service, 'POST', '/quote/ie?format=json&UPUSDL=nan', read(ie_source))
+    assert status == 200
+    result = json.loads(body)
+    assert result['params']['UPUSDL'] is None
+    assert {row['dl_cost'] for row in result['tables']['ie_sheets']} == {None}
+    assert quote_service._json_body({'a': [float('inf'), 1.5, (float('-inf'), "x")]}) == b'{"a": [null, 1.5, [null, "x"]]}'
+
+
+@pytest.mark.parametrize('method, path, body, headers, status', [
+    ('GET', '/quote/ie', None, {}, 405),
+    ('POST', '/health', b'x', {}, 405),
+    ('GET', '/unknown', None, {}, 404),
+    ('POST', '/quote/ie?format=csv', b'x', {}, 400),
+    ('POST', '/quote/ie?Qty=abc', b'x', {}, 400),
+    ('POST', '/quote/ie', b'', {}, 400),
+    ('POST', '/quote/ie', None, {'Transfer-Encoding': 'chunked'}, 411),
+    ('POST', '/quote/me', b'not a zip', {}, 400),
+    ('POST', '/quote/ie', b'not an xlsx', {}, 422),
+])
+def test_errors(service, method, path, body, headers, status):
+    response_status, response_headers, response_body = request(service, method, path, body, headers)
+    assert response_status == status
+    assert json.loads(response_body)['error']
+    if status == 405:
+        assert response_headers['Allow'] in ('GET', 'POST')
+
+
+def test_request_config_forces_single_process(service):
+    service.config['options']['me_workers'] = 4
+    options = service._request_config({})['options']
+    assert options['me_workers'] == 1
+    assert options['checkpoint_interval'] == 0 and options['quote_history'] is False
+
+
+@pytest.mark.parametrize('host, allowed', [
+    ('127.0.0.1', True), ('127.1.2.3', True), ('::1', True), ('localhost', True),
+    ('0.0.0.0', False), ('192.168.1.10', False), ('example.com', False),
+])
+def test_check_loopback(host, allowed):
+    if allowed:
+        check_loopback(host)
+    else:
+        with pytest.raises(ValueError):
+            check_loopback(host)
+
+
+def test_service_rejects_public_host(quote_config):
+    with pytest.raises(ValueError):
+        QuoteService(quote_config, host='0.0.0.0')
@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+
+import formula_eval
+from quote_pipeline import run_ie_sweep
+from quote_sweep import (DETAIL_COLUMNS, SWEEP_COLUMNS, format_table, iter_detail_rows, parse_values,
+                         scenario_grid, write_csv)
+import quote_sweep
+
+
+@pytest.mark.parametrize('spec, values', [
+    ("34.3", [34.3]),
+    ("32, 34.3,36,", [32, 34.3, 36]),
+    ("30:40:2", [30, 32, 34, 36, 38, 40]),
+    ("0:0.3:0.1", [0, 0.1, 0.2, 0.3]),
+    ("1:2:5", [1]),
+    (60, [60]),
+])
+def test_parse_values(spec, values):
+    assert parse_values(spec) == values
+
+
+@pytest.mark.parametrize('spec', ["", "1:2", "1:2:0", "2:1:1", "a"])
+def test_parse_values_errors(spec):
+    with pytest.raises(ValueError):
+        parse_values(spec)
+
+
+def test_scenario_grid(monkeypatch):
+    # Handling 变化最慢
+    assert scenario_grid([1, 2], [3], [4, 5]) == [(1, 3, 4), (1, 3, 5), (2, 3, 4), (2, 3, 5)]
+    monkeypatch.setattr(quote_sweep, 'MAX_SCENARIOS', 3)
+    with pytest.raises(ValueError):
+        scenario_grid([1, 2], [3], [4, 5])
+
+
+def test_sweep_matches_per_scenario_evaluation(ie_source, quote_config):
+    scenarios = scenario_grid([50, 60], [30, 34.3], [150, 162.8, 170])
+    records, rows, sheet_columns = run_ie_sweep(ie_source, quote_config, scenarios)
+    assert [row['scenario'] for row in rows] == list(range(1, len(scenarios) + 1))
+    params = quote_config['params']
+    base = formula_eval.ie_columns(formula_eval.ie_record_inputs(records), params['Handling'], params['UPUSDL'],
+                                   params['UPUSOH'])
+    inputs = formula_eval.ie_record_inputs(records)
+    for row, scenario in zip(rows, scenarios):
+        columns = formula_eval.ie_columns(inputs, *scenario)
+        assert (row['handling'], row['upusdl'], row['upusoh']) == scenario
+        for name, column in (('dl_cost', 'P'), ('oh_cost', 'S'), ('dl_oh_cost', 'T'), ('ohlh', 'X'),
+                             ('sga', 'Y'), ('mva', 'Z')):
+            assert row[name] == pytest.approx(sum(columns[column]), rel=1e-12)
+        assert row['mva_change'] == pytest.approx(row['mva'] / sum(base['Z']) - 1)
+        assert list(sheet_columns['Z'][row['scenario'] - 1]) == pytest.approx(list(columns['Z']), rel=1e-12)
+    # 与当前参数相同的方案变化为 0
+    current = scenarios.index((60, 34.3, 162.8))
+    assert rows[current]['mva_change'] == pytest.approx(0)
+
+
+def test_detail_rows_and_output(ie_source, quote_config, tmp_path):
+    records, rows, sheet_columns = run_ie_sweep(ie_source, quote_config, [(60, 34.3, 162.8), (70, 34.3, 162.8)])
+    details = list(iter_detail_rows(records, sheet_columns))
+    assert len(details) == 2 * len(records)
+    assert [detail[:2] for detail in details[:2]] == [(1, records[0].sheet_name), (1, records[1].sheet_name)]
+    assert sum(detail[-1] for detail in details[:len(records)]) == pytest.approx(rows[0]['mva'])
+
+    path = str(tmp_path / 'sweep.csv')
+    write_csv(path, SWEEP_COLUMNS, rows)
+    write_csv(str(tmp_path / 'detail.csv'), DETAIL_COLUMNS, details)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        assert [line['scenario'] for line in csv.DictReader(f)] == ['1', '2']
+    lines = format_table(rows).splitlines()
+    assert lines[0].split() == SWEEP_COLUMNS and len(lines) == 3
+    assert lines[1].endswith("+0.00%")
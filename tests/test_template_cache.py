@@ -0,0 +1,117 @@
+import os
+import pickle
+import shutil
+
+import pytest
+
+import template_cache
+from config_manager import APP_DIR
+from template_cache import TemplateCache, get_template_cache
+
+
+@pytest.fixture
+def templates(tmp_path, logic_data):
+    for name in ('FormatIE.xlsx', 'DecorateIE.xlsx'):
+        shutil.copy(os.path.join(logic_data, name), tmp_path / name)
+    return str(tmp_path / 'FormatIE.xlsx'), str(tmp_path / 'DecorateIE.xlsx')
+
+
+def test_format_copies_are_independent(templates):
+    cache = TemplateCache()
+    first = cache.load_format(templates[0])
+    first.active['A1'] = "changed"
+    second = cache.load_format(templates[0])
+    assert second.active['A1'].value != "changed"
+    # 反序列化后的行高/列宽仍可按需新建 (DimensionHolder 保留 default_factory)
+    assert second.active.row_dimensions[5000].height is None
+
+
+def test_decorate_rows(templates):
+    cache = TemplateCache()
+    row_style, = cache.load_decorate(templates[1], rows=(3,))
+    again, = cache.load_decorate(templates[1], rows=(3,))
+    assert row_style is not again
+    assert row_style.styles == again.styles
+
+
+def test_changed_file_is_reloaded(templates, monkeypatch):
+    cache = TemplateCache()
+    cache.load_format(templates[0])
+    calls = []
+    compile_format = TemplateCache._compile_format
+    monkeypatch.setattr(TemplateCache, '_compile_format',
+                        staticmethod(lambda path, rows: calls.append(path) or compile_format(path, rows)))
+    cache.load_format(templates[0])
+    assert calls == []
+    stat = os.stat(templates[0])
+    os.utime(templates[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cache.load_format(templates[0])
+    assert calls == [os.path.abspath(templates[0])]
+
+
+def test_snapshot_is_shared_between_instances(templates, tmp_path, monkeypatch):
+    snapshot_dir = str(tmp_path / 'cache')
+    TemplateCache(snapshot_dir).load_format(templates[0])
+    assert any(name.startswith('template_format_') for name in os.listdir(snapshot_dir))
+
+    def fail(path, rows):
+        raise AssertionError("应从快照读取")
+    monkeypatch.setattr(TemplateCache, '_compile_format', staticmethod(fail))
+    assert TemplateCache(snapshot_dir).load_format(templates[0]).active.title
+
+
+def test_stale_snapshot_is_ignored(templates, tmp_path, monkeypatch):
+    snapshot_dir = str(tmp_path / 'cache')
+    TemplateCache(snapshot_dir).load_format(templates[0])
+    monkeypatch.setattr(template_cache, 'SNAPSHOT_VERSION', template_cache.SNAPSHOT_VERSION + 1)
+    calls = []
+    compile_format = TemplateCache._compile_format
+    monkeypatch.setattr(TemplateCache, '_compile_format',
+                        staticmethod(lambda path, rows: calls.append(path) or compile_format(path, rows)))
+    TemplateCache(snapshot_dir).load_format(templates[0])
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'not a pickle',
+    pickle.dumps(['not', 'a', 'snapshot']),
+    # 截断的快照
+    None,
+])
+def test_unreadable_snapshot_is_a_miss(templates, tmp_path, monkeypatch, content):
+    snapshot_dir = str(tmp_path / 'cache')
+    TemplateCache(snapshot_dir).load_format(templates[0])
+    snapshot_path, = [os.path.join(snapshot_dir, name) for name in os.listdir(snapshot_dir)]
+    with open(snapshot_path, 'rb') as f:
+        data = f.read()
+    with open(snapshot_path, 'wb') as f:
+        f.write(data[:len(data) // 2] if content is None else content)
+    calls = []
+    compile_format = TemplateCache._compile_format
+    monkeypatch.setattr(TemplateCache, '_compile_format',
+                        staticmethod(lambda path, rows: calls.append(path) or compile_format(path, rows)))
+    assert TemplateCache(snapshot_dir).load_format(templates[0]).active.title
+    assert len(calls) == 1
+    # 重新编译后覆盖损坏的快照
+    with open(snapshot_path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_unwritable_snapshot_dir(templates, tmp_path):
+    # 快照只是加速手段: 目录无法创建时照常返回模板
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    assert TemplateCache(str(blocker / 'cache')).load_format(templates[0]).active is not None
+
+
+def test_get_template_cache_is_shared(tmp_path):
+    assert get_template_cache(str(tmp_path)) is get_template_cache(str(tmp_path) + os.sep)
+    assert get_template_cache(None) is not get_template_cache(str(tmp_path))
+
+
+def test_relative_snapshot_dir_ignores_cwd(tmp_path, monkeypatch):
+    # 相对的 cache_dir 按程序所在目录解析，与启动时的工作目录无关
+    monkeypatch.chdir(tmp_path)
+    cache = get_template_cache('.quote_cache')
+    assert cache.snapshot_dir == os.path.join(APP_DIR, '.quote_cache')
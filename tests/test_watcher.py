@@ -0,0 +1,115 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+import watcher
+from watcher import FolderWatcher, PollingBackend
+
+
+@pytest.fixture
+def drop(tmp_path):
+    ie = tmp_path / 'IE'
+    me = tmp_path / 'ME'
+    ie.mkdir()
+    (me / 'ProjectA').mkdir(parents=True)
+    return str(ie), str(me)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # 不真正报价，只记录调用
+    calls = []
+
+    def fake(kind):
+        def pipeline(source, config, log=None, output_dir=None):
+            calls.append((kind, source))
+            path = os.path.join(output_dir or os.path.dirname(source), f"Output_{kind}_{len(calls)}.xlsx")
+            open(path, 'w').close()
+            return path
+        return pipeline
+    monkeypatch.setattr(watcher, 'run_ie_quote', fake('IE'))
+    monkeypatch.setattr(watcher, 'run_me_quote', fake('ME'))
+    return calls
+
+
+def touch(path, text='x'):
+    with open(path, 'w') as f:
+        f.write(text)
+    return str(path)
+
+
+def test_classify(drop):
+    ie, me = drop
+    w = FolderWatcher({}, ie_folders=[ie], me_folders=[me], backend='polling')
+    assert w._classify(os.path.join(ie, 'a.xlsx')) == ('ie', os.path.join(ie, 'a.xlsx'))
+    assert w._classify(os.path.join(ie, 'Output_IE_1.xlsx')) is None
+    assert w._classify(os.path.join(ie, '~$a.xlsx')) is None
+    assert w._classify(os.path.join(ie, 'a.xls')) is None
+    assert w._classify(os.path.join(me, 'b.xls')) == ('me', me)
+    assert w._classify(os.path.join(me, 'ProjectA', 'b.XLS')) == ('me', os.path.join(me, 'ProjectA'))
+    assert w._classify(os.path.join(me, 'ProjectA', 'deeper', 'b.xls')) is None
+
+
+def test_process_batches(drop, calls, tmp_path):
+    ie, me = drop
+    existing = touch(os.path.join(ie, 'old.xlsx'))
+    w = FolderWatcher({}, ie_folders=[ie], me_folders=[me], backend='polling', output_dir=str(tmp_path))
+    new = touch(os.path.join(ie, 'new.xlsx'))
+    boards = [touch(os.path.join(me, 'ProjectA', f'{i}.B_V1_PCBA.xls')) for i in (1, 2)]
+    w.process([existing, new] + boards)
+    assert calls == [('IE', new), ('ME', os.path.join(me, 'ProjectA'))]
+    # 未再改动的文件不重复报价
+    w.process([new] + boards)
+    assert len(calls) == 2
+    touch(new, 'changed content')
+    w.process([new])
+    assert calls[-1] == ('IE', new)
+
+
+def test_failure_is_counted(drop, monkeypatch):
+    ie, _ = drop
+
+    def fail(source, config, log=None, output_dir=None):
+        raise ValueError("bad source")
+    monkeypatch.setattr(watcher, 'run_ie_quote', fail)
+    logs = []
+    w = FolderWatcher({}, ie_folders=[ie], backend='polling', log=logs.append)
+    w.process([touch(os.path.join(ie, 'a.xlsx'))])
+    assert w.failed == 1
+    assert logs[-1].endswith("bad source")
+
+
+def test_missing_folder(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FolderWatcher({}, ie_folders=[str(tmp_path / 'missing')], backend='polling')
+
+
+def test_polling_backend_reports_changes(drop):
+    ie, me = drop
+    backend = PollingBackend([(ie, False), (me, True)], poll_interval=0)
+    assert backend.wait(0) == []
+    path = touch(os.path.join(me, 'ProjectA', '1.x.xls'))
+    assert backend.wait(0) == [path]
+    assert backend.wait(0) == []
+
+
+@pytest.mark.parametrize('backend', ['polling', 'auto'])
+def test_run_quotes_dropped_file(drop, ie_source, quote_config, backend):
+    ie, _ = drop
+    outputs = []
+    done = threading.Event()
+    w = FolderWatcher(quote_config, ie_folders=[ie], debounce=0.2, poll_interval=0.1, backend=backend,
+                      on_output=lambda path: (outputs.append(path), done.set()))
+    stop = threading.Event()
+    thread = threading.Thread(target=w.run, args=(stop,))
+    thread.start()
+    try:
+        shutil.copy(ie_source, os.path.join(ie, 'IE.xlsx'))
+        assert done.wait(60)
+    finally:
+        stop.set()
+        thread.join(10)
+    assert os.path.basename(outputs[0]).startswith('Output_IE_')
+    assert os.path.dirname(outputs[0]) == ie
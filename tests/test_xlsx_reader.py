@@ -0,0 +1,220 @@
+import datetime
+import os
+import re
+import zipfile
+
+import pytest
+
+from excel_tools import extract_ie_rows
+import xlsx_reader
+from xlsx_reader import XlsxColumnReader, open_column_reader
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+PARTS = {
+    '[Content_Types].xml': (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/sharedStrings.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'),
+    '_rels/.rels': (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        f'Type="{REL}/worksheet"/>'
+        f'<Relationship Id="rId2" Target="sharedStrings.xml" Type="{REL}/sharedStrings"/>'
+        f'<Relationship Id="rId3" Target="styles.xml" Type="{REL}/styles"/>'
+        '</Relationships>'),
+    # 样式: 0 常规, 1 日期 (内置 14), 2 时间间隔 (自定义 164), 3 非日期的数字格式 (内置 2)
+    'xl/styles.xml': (
+        f'<styleSheet xmlns="{MAIN}">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="[h]:mm:ss"/></numFmts>'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="2" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'),
+    # 共享字符串: 纯文本、富文本 (多个 <r>)、带注音 (<rPh> 不计入)、转义字符
+    'xl/sharedStrings.xml': (
+        f'<sst xmlns="{MAIN}" count="4" uniqueCount="4">'
+        '<si><t>SASM</t></si>'
+        '<si><r><rPr><b/></rPr><t>B    Labor </t></r><r><t xml:space="preserve">time(s/pcs)</t></r></si>'
+        '<si><t>金</t><rPh sb="0" eb="1"><t>きん</t></rPh></si>'
+        '<si><t>A &amp; B_x005F_</t></si>'
+        '</sst>'),
+}
+
+SHEET_ROWS = (
+    '<row r="1"><c r="A1" t="s"><v>3</v></c><c r="B1" t="s"><v>0</v></c><c r="C1"><v>12.5</v></c></row>'
+    '<row r="2"><c r="B2" t="s"><v>1</v></c><c r="C2"><v>7</v></c><c r="D2"><v>1</v></c></row>'
+    '<row r="4"><c r="B4" t="s"><v>2</v></c><c r="C4" s="1"><v>45000</v></c></row>'
+    '<row r="5"><c r="B5" t="inlineStr"><is><r><t>Inline </t></r><r><rPr><i/></rPr><t>rich</t></r></is></c>'
+    '<c r="C5" s="2"><v>1.5</v></c></row>'
+    '<row r="6"><c r="B6" t="b"><v>1</v></c><c r="C6" s="3"><v>2.25</v></c></row>'
+    '<row r="7"><c r="B7" t="str"><f>"x"&amp;"y"</f><v>xy</v></c><c r="C7" t="e"><v>#DIV/0!</v></c></row>'
+    '<row r="8"><c r="B8"><f>1+1</f></c><c r="C8" s="1"/></row>'
+    '<row r="9" spans="1:3"><c r="C9" s="1"><v>1.25E1</v></c><c r="B9" t="inlineStr"><is><t>x &lt; y</t></is></c></row>'
+    '<row r="11"><c r="E11"><v>1</v></c></row>'
+)
+
+
+def make_xlsx(path, date1904=False, transform=None):
+    # 手写最小的 xlsx 包；transform 改写工作表 XML
+    properties = '<workbookPr date1904="1"/>' if date1904 else ''
+    parts = dict(PARTS)
+    parts['xl/workbook.xml'] = (
+        f'<workbook xmlns="{MAIN}" xmlns:r="{REL}">{properties}'
+        '<sheets><sheet name="Data" sheetId="1" r:id="rId1"/></sheets></workbook>')
+    sheet = f'<worksheet xmlns="{MAIN}"><sheetData>{SHEET_ROWS}</sheetData></worksheet>'
+    parts['xl/worksheets/sheet1.xml'] = transform(sheet) if transform else sheet
+    with zipfile.ZipFile(path, 'w') as zf:
+        for name, content in parts.items():
+            zf.writestr(name, content)
+    return str(path)
+
+
+def read_rows(path, reader, sheet_name, columns=('B', 'C')):
+    reader = open_column_reader(path, reader)
+    try:
+        return list(reader.iter_rows(sheet_name, columns))
+    finally:
+        reader.close()
+
+
+def test_ie_sample_matches_openpyxl(logic_data):
+    path = os.path.join(logic_data, 'IE.xlsx')
+    xml, openpyxl = open_column_reader(path, 'xml'), open_column_reader(path, 'openpyxl')
+    try:
+        assert xml.sheetnames == openpyxl.sheetnames
+        for sheet_name in xml.sheetnames:
+            rows = list(xml.iter_rows(sheet_name, ('B', 'C')))
+            assert rows == list(openpyxl.iter_rows(sheet_name, ('B', 'C')))
+            assert extract_ie_rows(xml.iter_rows(sheet_name, ('B', 'C')), sheet_name) == \
+                extract_ie_rows(openpyxl.iter_rows(sheet_name, ('B', 'C')), sheet_name)
+    finally:
+        xml.close()
+        openpyxl.close()
+
+
+def test_synthetic_values(tmp_path):
+    rows = read_rows(make_xlsx(tmp_path / 'a.xlsx'), 'xml', 'Data')
+    assert rows == [
+        ("SASM", 12.5),
+        ("B    Labor time(s/pcs)", 7),
+        (None, None),
+        ("金", datetime.datetime(2023, 3, 15)),
+        ("Inline rich", datetime.timedelta(hours=36)),
+        (True, 2.25),
+        ("xy", "#DIV/0!"),
+        (None, None),
+        ("x < y", datetime.datetime(1900, 1, 12, 12)),
+        (None, None),
+        (None, None),
+    ]
+    assert read_rows(make_xlsx(tmp_path / 'a.xlsx'), 'xml', 'Data', ('A',))[0] == ("A & B_",)
+    assert isinstance(rows[1][1], int) and isinstance(rows[0][1], float)
+
+
+def prefixed(sheet):
+    # 所有元素使用命名空间前缀 x:
+    return re.sub(r'<(/?)(?=[a-zA-Z])', r'<\1x:', sheet).replace('xmlns=', 'xmlns:x=')
+
+
+def without_refs(sheet):
+    # 去掉行与单元格的 r 属性 (按顺序定位)；空行与空列需补上占位
+    rows = sheet.replace('<row r="2">', '<row r="2"><c r="A2"/>')
+    rows = rows.replace('<c r="C9" s="1"><v>1.25E1</v></c><c r="B9" t="inlineStr"><is><t>x &lt; y</t></is></c>',
+                        '<c r="A9"/><c r="B9" t="inlineStr"><is><t>x &lt; y</t></is></c><c r="C9" s="1"><v>1.25E1</v></c>')
+    rows = rows.replace('<row r="4">', '<row r="3"/><row r="4"><c r="A4"/>')
+    for n in (5, 6, 7, 8):
+        rows = rows.replace(f'<row r="{n}">', f'<row r="{n}"><c r="A{n}"/>')
+    rows = rows.replace('<row r="11">', '<row r="10"/><row r="11">')
+    return re.sub(r' r="[A-Z]*\d+"', '', rows)
+
+
+def spaced_refs(sheet):
+    # 元素名与 r 属性之间是换行或制表符 (合法的 XML)
+    sheet = sheet.replace('<c r="B', '<c\n r="B').replace('<c r="C', '<c\tr="C')
+    return sheet.replace('<row r="4">', '<row\r\n  r="4">')
+
+
+def loose_attrs(sheet):
+    # 属性的 = 两侧有空白、值用单引号
+    return sheet.replace('t="s"', 't = "s"').replace('s="1"', "s='1'")
+
+
+def trailing_rows(sheet):
+    # 最后一个 </row> 之后还有空行，sheetData 之后是 <rowBreaks>
+    return sheet.replace('</sheetData>', '<row r="12"/><row r="13" spans="1:3"/></sheetData>'
+                         '<rowBreaks count="1" manualBreakCount="1"><brk id="5" max="16383" man="1"/></rowBreaks>')
+
+
+@pytest.mark.parametrize('chunk_size', [1 << 20, 64])
+@pytest.mark.parametrize('date1904', [False, True])
+@pytest.mark.parametrize('transform', [None, prefixed, without_refs, spaced_refs, loose_attrs, trailing_rows])
+def test_synthetic_matches_openpyxl(tmp_path, monkeypatch, transform, date1904, chunk_size):
+    # 小的块大小: 行与标签跨越多个数据块
+    monkeypatch.setattr(xlsx_reader, '_CHUNK_SIZE', chunk_size)
+    path = make_xlsx(tmp_path / 'a.xlsx', date1904, transform)
+    for columns in (('B', 'C'), ('C',), ('A', 'E')):
+        assert read_rows(path, 'xml', 'Data', columns) == read_rows(path, 'openpyxl', 'Data', columns)
+    assert extract_ie_rows(read_rows(path, 'xml', 'Data'), 'Data') == \
+        extract_ie_rows(read_rows(path, 'openpyxl', 'Data'), 'Data')
+
+
+def test_fallback_used_only_when_needed(tmp_path, monkeypatch):
+    calls = []
+    parse_rows = XlsxColumnReader._parse_rows
+
+    def tracked(self, part, columns):
+        calls.append(part)
+        return parse_rows(self, part, columns)
+    monkeypatch.setattr(XlsxColumnReader, '_parse_rows', tracked)
+    expected = read_rows(make_xlsx(tmp_path / 'a.xlsx'), 'xml', 'Data')
+    assert calls == []
+    for transform in (prefixed, without_refs, loose_attrs):
+        assert read_rows(make_xlsx(tmp_path / 'a.xlsx', transform=transform), 'xml', 'Data') == expected
+    assert len(calls) == 3
+    # 换行/制表符分隔的属性用正则即可读取
+    assert read_rows(make_xlsx(tmp_path / 'a.xlsx', transform=spaced_refs), 'xml', 'Data') == expected
+    assert len(calls) == 3
+
+
+def test_labels_after_line_breaks(tmp_path):
+    # 元素名后换行的单元格不能被当作空行 (标签丢失时没有任何提示)
+    rows = ('<row r="1"><c\n r="B1" t="inlineStr"><is><t>Project name</t></is></c>'
+            '<c\n r="C1" t="inlineStr"><is><t>ABC</t></is></c></row>'
+            '<row r="2"><c\tr="B2" t="inlineStr"><is><t>Panel Qty</t></is></c><c\tr="C2"><v>4</v></c></row>')
+    path = make_xlsx(tmp_path / 'a.xlsx', transform=lambda sheet: sheet.replace(SHEET_ROWS, rows))
+    expected = [("Project name", "ABC"), ("Panel Qty", 4)]
+    assert read_rows(path, 'xml', 'Data') == read_rows(path, 'openpyxl', 'Data') == expected
+
+
+def test_1904_epoch(tmp_path):
+    rows = read_rows(make_xlsx(tmp_path / 'a.xlsx', date1904=True), 'xml', 'Data')
+    assert rows[3][1] == datetime.datetime(2027, 3, 16)
+    # 时间间隔与纪元无关
+    assert rows[4][1] == datetime.timedelta(hours=36)
+
+
+def test_unknown_reader(logic_data):
+    with pytest.raises(ValueError):
+        open_column_reader(os.path.join(logic_data, 'IE.xlsx'), 'pandas')
@@ -0,0 +1,273 @@
+"""
+投递文件夹监视: 新的 IE 源文件 / ME 板卡文件放入后自动报价，不依赖 PyQt5
+
+- IE 文件夹: 每个新增或改动的 .xlsx 单独报价，Output_IE_* 写在源文件旁边
+- ME 文件夹: 新增或改动的 .xls 按所在文件夹 (投递文件夹本身或其下一级项目文件夹) 分组，
+  只重新报价有变化的文件夹，Output_ME_* 写在该文件夹的上一级；
+  配合提取结果缓存，未改动的板卡文件不会重新解析
+Linux 下使用 inotify 接收文件事件，其它平台或 inotify 不可用时定时扫描目录。
+一批文件在 debounce 秒内没有新事件后才开始处理，避免复制到一半就读取。
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+from quote_pipeline import run_ie_quote, run_me_quote
+
+IE_EXTENSIONS = ('.xlsx', '.xlsm')
+ME_EXTENSIONS = ('.xls',)
+# 报价输出、Excel 锁文件与隐藏的临时文件不触发报价
+IGNORED_PREFIXES = ('Output_IE', 'Output_ME', '~$', '.')
+
+# inotify 常量 (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _ignore(*args):
+    pass
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _is_candidate(name, extensions):
+    return name.lower().endswith(extensions) and not name.startswith(IGNORED_PREFIXES)
+
+
+def _watched_dirs(folder, recursive):
+    # 投递文件夹本身，ME 另加其下一级子文件夹
+    dirs = [folder]
+    if recursive:
+        try:
+            dirs.extend(entry.path for entry in os.scandir(folder)
+                        if entry.is_dir() and not entry.name.startswith('.'))
+        except OSError:
+            pass
+    return dirs
+
+
+def _scan(dirs):
+    # {文件路径: (修改时间, 大小)}
+    files = {}
+    for directory in dirs:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class PollingBackend:
+    # 定时扫描目录，比较修改时间与大小
+    name = 'polling'
+
+    def __init__(self, folders, poll_interval=2.0):
+        # folders: [(文件夹, 是否包含下一级子文件夹)]
+        self.folders = folders
+        self.poll_interval = poll_interval
+        self._files = self._scan_all()
+        self._next_scan = time.monotonic() + poll_interval
+
+    def _scan_all(self):
+        dirs = [d for folder, recursive in self.folders for d in _watched_dirs(folder, recursive)]
+        return _scan(dirs)
+
+    def wait(self, timeout):
+        # 返回自上次扫描以来新增或改动的文件路径；未到扫描时间时最多等待 timeout 秒
+        delay = self._next_scan - time.monotonic()
+        if delay > 0:
+            time.sleep(min(timeout, delay))
+            if time.monotonic() < self._next_scan:
+                return []
+        self._next_scan = time.monotonic() + self.poll_interval
+        files = self._scan_all()
+        changed = [path for path, stamp in files.items() if self._files.get(path) != stamp]
+        self._files = files
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    # Linux inotify (通过 ctypes 调用 libc，无需第三方库)
+    name = 'inotify'
+
+    def __init__(self, folders):
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.folders = folders
+        self._dirs = {}  # watch descriptor -> (目录, 是否为投递文件夹且包含子文件夹)
+        try:
+            for folder, recursive in folders:
+                self._add_watch(folder, recursive)
+                if recursive:
+                    for directory in _watched_dirs(folder, True)[1:]:
+                        self._add_watch(directory, False)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory, recursive):
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"无法监视文件夹: {directory}")
+        self._dirs[wd] = (directory, recursive)
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # 事件队列溢出，丢失的事件通过整体扫描补回
+                changed.extend(self._rescan_all())
+                continue
+            directory, recursive = self._dirs.get(wd, (None, False))
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if recursive and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # 新建的项目文件夹: 加入监视，并补上监视建立前已经写入的文件
+                    self._add_watch(path, False)
+                    changed.extend(_scan([path]))
+                continue
+            changed.append(path)
+        return changed
+
+    def _rescan_all(self):
+        dirs = [d for folder, recursive in self.folders for d in _watched_dirs(folder, recursive)]
+        return list(_scan(dirs))
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_backend(folders, backend='auto', poll_interval=2.0):
+    # backend: auto (优先 inotify) / inotify / polling
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifyBackend(folders)
+        except (OSError, AttributeError, TypeError):
+            # 非 Linux 平台 libc 中没有 inotify_* 函数
+            if backend == 'inotify':
+                raise
+    return PollingBackend(folders, poll_interval)
+
+
+class FolderWatcher:
+    """
+    监视 IE/ME 投递文件夹，按批次调用现有报价流程
+    on_output(输出文件路径) 在每个输出文件生成后调用
+    """
+
+    def __init__(self, config, ie_folders=(), me_folders=(), debounce=2.0, poll_interval=2.0,
+                 backend='auto', log=_ignore, on_output=_ignore, output_dir=None):
+        self.config = config
+        self.ie_folders = [os.path.abspath(folder) for folder in ie_folders]
+        self.me_folders = [os.path.abspath(folder) for folder in me_folders]
+        self.debounce = debounce
+        self.log = log
+        self.on_output = on_output
+        self.output_dir = output_dir
+        self.failed = 0
+        for folder in self.ie_folders + self.me_folders:
+            if not os.path.isdir(folder):
+                raise FileNotFoundError(f"找不到监视文件夹: {folder}")
+        folders = [(folder, False) for folder in self.ie_folders] + [(folder, True) for folder in self.me_folders]
+        self.backend = make_backend(folders, backend, poll_interval)
+        # 启动时已存在的文件视为已处理，只报价之后新增或改动的文件
+        dirs = [d for folder, recursive in folders for d in _watched_dirs(folder, recursive)]
+        self._seen = _scan(dirs)
+
+    def _classify(self, path):
+        # 返回 ('ie', 源文件) / ('me', 板卡所在文件夹) / None
+        directory, name = os.path.split(path)
+        if directory in self.ie_folders and _is_candidate(name, IE_EXTENSIONS):
+            return 'ie', path
+        if _is_candidate(name, ME_EXTENSIONS):
+            parent = os.path.dirname(directory)
+            if directory in self.me_folders or parent in self.me_folders:
+                return 'me', directory
+        return None
+
+    def run(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        self.log(f"开始监视 ({self.backend.name}): IE {self.ie_folders or '-'}，ME {self.me_folders or '-'}")
+        pending = {}  # 文件路径 -> 最近一次事件时间
+        try:
+            while not stop_event.is_set():
+                for path in self.backend.wait(timeout=min(self.debounce, 0.5) or 0.5):
+                    pending[path] = time.monotonic()
+                if pending and time.monotonic() - max(pending.values()) >= self.debounce:
+                    batch, pending = list(pending), {}
+                    self.process(batch)
+        finally:
+            self.backend.close()
+
+    def process(self, paths):
+        # 处理一批已经稳定的文件: 跳过未变化的文件，IE 逐个报价，ME 按文件夹报价
+        ie_sources = []
+        me_folders = []
+        for path in sorted(paths):
+            stamp = _file_stamp(path)
+            if stamp is None or self._seen.get(path) == stamp:
+                continue
+            target = self._classify(path)
+            self._seen[path] = stamp
+            if target is None:
+                continue
+            kind, source = target
+            bucket = ie_sources if kind == 'ie' else me_folders
+            if source not in bucket:
+                bucket.append(source)
+
+        jobs = [(run_ie_quote, source) for source in ie_sources] + [(run_me_quote, folder) for folder in me_folders]
+        for pipeline, source in jobs:
+            self.log(f"检测到新输入，开始报价: {source}")
+            try:
+                output_path = pipeline(source, self.config, log=self.log, output_dir=self.output_dir)
+            except Exception as e:
+                self.failed += 1
+                self.log(f"处理失败: {source}: {e}")
+                continue
+            self._seen[output_path] = _file_stamp(output_path)
+            self.on_output(output_path)
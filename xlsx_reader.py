@@ -0,0 +1,389 @@
+"""
+xlsx 按列读取: IE 源工作表只需要 B/C 两列的值
+
+两种后端，接口相同 (sheetnames / iter_rows(工作表名, 列字母) / close):
+- XlsxColumnReader ('xml'): 直接从 zip 中分块读取工作表 XML，用正则只匹配指定列的 <c> 元素，
+  其余单元格不解析、不建对象；共享字符串只解析一次。
+  XML 使用命名空间前缀或单元格缺少 r 属性时 (极少见) 退回 ElementTree 逐元素解析
+- OpenpyxlColumnReader ('openpyxl'): 原来的 load_workbook 读取方式
+
+iter_rows 从第1行起每行产出一个元组 (XML 中缺少的行以 None 填充)，
+取值规则与 openpyxl 的 data_only 读取一致: 公式取缓存值，数字按格式转换为日期/时间，
+共享字符串与内联字符串取纯文本。
+"""
+import html
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from itertools import islice
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_ISO8601, from_excel
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_ROW = f'{_MAIN_NS}row'
+_VALUE = f'{_MAIN_NS}v'
+_INLINE = f'{_MAIN_NS}is'
+_TEXT = f'{_MAIN_NS}t'
+_RUN = f'{_MAIN_NS}r'
+_DIGITS = '0123456789'
+
+# 分块读取工作表 XML 的块大小；每块只处理到最后一个完整的 </row>
+_CHUNK_SIZE = 1 << 20
+# 缺少 r 属性的行/单元格、带命名空间前缀的元素: 正则扫描无法定位，退回 ElementTree
+_ROW_NO_REF = re.compile(rb'<row\b(?![^>]*?\br=")')
+_CELL_NO_REF = re.compile(rb'<c\b(?![^>]*?\br=")')
+# Excel 与 openpyxl 写出的单元格总是以 `<c r="` 开头，可用更快的正则；出现其它写法
+# (r 不在第一个属性、元素名后是换行或制表符等) 时改用 r 可在任意位置的正则
+_CELL_NOT_REF_FIRST = re.compile(rb'<c(?=[\s/>])(?! r=")')
+# 单元格属性的 = 两侧有空白或值用单引号: 按属性取 t / s 的正则无法识别，同样退回 ElementTree
+_LOOSE_ATTR = re.compile(rb"\s=|=\s|='")
+_PREFIXED = re.compile(rb'<[A-Za-z_][\w.-]*:(?:c|row)\b')
+_ROW_REF = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+# 行元素的开始标签 (不含 <rowBreaks> 等同样以 <row 开头的元素)
+_ROW_START = re.compile(rb'<row(?=[\s/>])')
+_TYPE_ATTR = re.compile(rb'\bt="([^"]*)"')
+_STYLE_ATTR = re.compile(rb'\bs="(\d+)"')
+_VALUE_RE = re.compile(rb'<v(?:\s[^>]*)?>(.*?)</v>', re.S)
+_INLINE_RE = re.compile(rb'<is\b[^>]*>(.*?)</is>', re.S)
+_PHONETIC_RE = re.compile(rb'<rPh\b.*?</rPh>', re.S)
+_TEXT_RE = re.compile(rb'<t(?:\s[^>]*)?>(.*?)</t>', re.S)
+# 正则扫描遇到需要退回 ElementTree 的内容时产出的标记
+_FALLBACK = object()
+
+READERS = ('xml', 'openpyxl')
+
+
+def _part_targets(zf):
+    # 工作簿关系: {关系ID: (类型, 部件路径)}
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join('xl', target))
+        targets[rel.get('Id')] = (rel.get('Type', ''), target)
+    return targets
+
+
+def sheet_parts(zf, workbook=None):
+    # 按工作簿中的顺序返回 [(工作表名, 部件路径)]
+    if workbook is None:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    targets = _part_targets(zf)
+    return [(sheet.get('name'), targets[sheet.get(f'{_REL_NS}id')][1])
+            for sheet in workbook.iter(f'{_MAIN_NS}sheet')]
+
+
+def _text_content(node):
+    # 与 openpyxl 的 Text.content 相同: <t> 加上各 <r> 中的 <t>，不含注音 <rPh>
+    snippets = []
+    plain = node.find(_TEXT)
+    if plain is not None and plain.text:
+        snippets.append(plain.text)
+    for run in node.iterfind(_RUN):
+        text = run.findtext(_TEXT)
+        if text:
+            snippets.append(text)
+    return "".join(snippets)
+
+
+def _xml_text(raw):
+    # 元素文本的字节 -> str (还原 &amp; 等实体)
+    text = raw.decode('utf-8')
+    return html.unescape(text) if '&' in text else text
+
+
+def _cast_number(value):
+    # 与 openpyxl 相同: 含小数点或指数的为 float，否则为 int
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _last_row_ref(data):
+    # 数据块中最后一个行元素的 r 属性匹配 (没有行元素时为 None)
+    start = data.rfind(b'<row')
+    while start >= 0:
+        if _ROW_START.match(data, start):
+            return _ROW_REF.match(data, start)
+        start = data.rfind(b'<row', 0, start)
+    return None
+
+
+class XlsxColumnReader:
+    def __init__(self, path):
+        self._zf = zipfile.ZipFile(path)
+        workbook = ET.fromstring(self._zf.read('xl/workbook.xml'))
+        properties = workbook.find(f'{_MAIN_NS}workbookPr')
+        date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+        self._parts = dict(sheet_parts(self._zf, workbook))
+        self.sheetnames = list(self._parts)
+        types = {kind.rsplit('/', 1)[-1]: target for kind, target in _part_targets(self._zf).values()}
+        self._strings_part = types.get('sharedStrings')
+        self._styles_part = types.get('styles')
+        self._strings = None
+        self._date_styles = None
+        self._patterns = {}
+
+    def _shared_strings(self):
+        if self._strings is None:
+            strings = []
+            if self._strings_part in self._zf.namelist():
+                with self._zf.open(self._strings_part) as f:
+                    for _, node in ET.iterparse(f):
+                        if node.tag == f'{_MAIN_NS}si':
+                            strings.append(_text_content(node).replace('x005F_', ''))
+                            node.clear()
+            self._strings = strings
+        return self._strings
+
+    def _styles(self):
+        # (日期格式的样式序号集合, 其中时间间隔格式的样式序号集合)
+        if self._date_styles is None:
+            date_styles, timedelta_styles = set(), set()
+            if self._styles_part in self._zf.namelist():
+                root = ET.fromstring(self._zf.read(self._styles_part))
+                custom = {int(fmt.get('numFmtId')): fmt.get('formatCode')
+                          for fmt in root.iter(f'{_MAIN_NS}numFmt')}
+                xfs = root.find(f'{_MAIN_NS}cellXfs')
+                for idx, xf in enumerate(xfs if xfs is not None else ()):
+                    fmt_id = int(xf.get('numFmtId', 0))
+                    fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+                    if fmt is None:
+                        continue
+                    if is_date_format(fmt):
+                        date_styles.add(idx)
+                    if is_timedelta_format(fmt):
+                        timedelta_styles.add(idx)
+            self._date_styles = (date_styles, timedelta_styles)
+        return self._date_styles
+
+    def _value(self, cell):
+        # ElementTree 元素 -> 值
+        data_type = cell.get('t', 'n')
+        if data_type == 'inlineStr':
+            child = cell.find(_INLINE)
+            return _text_content(child) if child is not None else None
+        style_id = int(cell.get('s', 0)) if data_type == 'n' else 0
+        return self._convert(data_type, cell.findtext(_VALUE) or None, style_id)
+
+    def _scanned_value(self, attrs, content):
+        # 正则匹配到的 <c> 的属性与内容字节 -> 值 (规则同 _value)；常见情况不走正则
+        if b't="' in attrs:
+            data_type = _TYPE_ATTR.search(attrs).group(1).decode('ascii')
+        else:
+            data_type = 'n'
+        if data_type == 'inlineStr':
+            match = _INLINE_RE.search(content) if content else None
+            if match is None:
+                return None
+            inline = _PHONETIC_RE.sub(b'', match.group(1))
+            return "".join(_xml_text(text) for text in _TEXT_RE.findall(inline))
+        if not content:
+            return None
+        if content.startswith(b'<v>'):
+            raw = content[3:content.find(b'</v>')]
+        else:
+            match = _VALUE_RE.search(content)
+            raw = match.group(1) if match else None
+        if not raw:
+            return None
+        if data_type == 'n':
+            # 数字不必先解码: int/float 可直接转换 ASCII 字节
+            value = float(raw) if b'.' in raw or b'E' in raw or b'e' in raw else int(raw)
+            if b's="' in attrs:
+                style_id = int(_STYLE_ATTR.search(attrs).group(1))
+                date_styles, timedelta_styles = self._styles()
+                if style_id in date_styles:
+                    try:
+                        return from_excel(value, self.epoch, timedelta=style_id in timedelta_styles)
+                    except (OverflowError, ValueError):
+                        return "#VALUE!"
+            return value
+        return self._convert(data_type, _xml_text(raw), 0)
+
+    def _convert(self, data_type, value, style_id):
+        # 与 openpyxl (data_only) 的 WorkSheetParser.parse_cell 取值一致
+        if value is None:
+            return None
+        if data_type == 'n':
+            value = _cast_number(value)
+            date_styles, timedelta_styles = self._styles()
+            if style_id in date_styles:
+                try:
+                    return from_excel(value, self.epoch, timedelta=style_id in timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == 's':
+            return self._shared_strings()[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            return from_ISO8601(value)
+        return value
+
+    def iter_rows(self, sheet_name, columns):
+        # columns: 列字母序列，如 ('B', 'C')；每行产出对应列的值元组
+        part = self._parts[sheet_name]
+        produced = 0
+        for row in self._scan_rows(part, columns):
+            if row is _FALLBACK:
+                # 已产出的行与 ElementTree 解析的结果相同，从下一行接着产出
+                yield from islice(self._parse_rows(part, columns), produced, None)
+                return
+            yield row
+            produced += 1
+
+    def _cell_patterns(self, columns):
+        # 只匹配指定列的 <c> 元素: 列字母、行号、属性、内容 (自闭合时为 None)
+        # (r 为第一个属性时用的正则, r 可在任意位置的正则)
+        patterns = self._patterns.get(columns)
+        if patterns is None:
+            letters = b'|'.join(re.escape(letter.encode('ascii')) for letter in columns)
+            tail = rb')(\d+)"([^>]*?)(?:/>|>(.*?)</c>)'
+            patterns = (re.compile(rb'<c r="(' + letters + tail, re.S),
+                        re.compile(rb'<c\b(?=[^>]*?\br="(' + letters + rb')(\d+)")([^>]*?)(?:/>|>(.*?)</c>)', re.S))
+            self._patterns[columns] = patterns
+        return patterns
+
+    def _scan_rows(self, part, columns):
+        ref_first, anywhere = self._cell_patterns(columns)
+        positions = {letter.encode('ascii'): i for i, letter in enumerate(columns)}
+        width = len(columns)
+        empty = (None,) * width
+        next_row = 1
+        last_row = 0
+        tail = b''
+        with self._zf.open(part) as f:
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                data = tail + chunk
+                if chunk:
+                    end = data.rfind(b'</row>')
+                    if end < 0:
+                        tail = data
+                        continue
+                    end += len(b'</row>')
+                    data, tail = data[:end], data[end:]
+                if _ROW_NO_REF.search(data) or _PREFIXED.search(data):
+                    yield _FALLBACK
+                    return
+                pattern = ref_first
+                if _CELL_NOT_REF_FIRST.search(data):
+                    if _CELL_NO_REF.search(data):
+                        yield _FALLBACK
+                        return
+                    pattern = anywhere
+                current = None
+                values = None
+                for match in pattern.finditer(data):
+                    letter, row_ref, attrs, content = match.groups()
+                    if attrs and _LOOSE_ATTR.search(attrs):
+                        # 已产出的行不受影响，从当前行起改用 ElementTree
+                        yield _FALLBACK
+                        return
+                    row_idx = int(row_ref)
+                    if row_idx != current:
+                        if values is not None:
+                            yield tuple(values)
+                            next_row = current + 1
+                        while next_row < row_idx:
+                            yield empty
+                            next_row += 1
+                        current = row_idx
+                        values = [None] * width
+                    values[positions[letter]] = self._scanned_value(attrs, content)
+                if values is not None:
+                    yield tuple(values)
+                    next_row = current + 1
+                # 没有指定列单元格的行 (包括末尾的行) 也要按行产出
+                match = _last_row_ref(data)
+                if match is not None:
+                    last_row = max(last_row, int(match.group(1)))
+                if not chunk:
+                    break
+        while next_row <= last_row:
+            yield empty
+            next_row += 1
+
+    def _parse_rows(self, part, columns):
+        positions = {column_index_from_string(letter): i for i, letter in enumerate(columns)}
+        width = len(columns)
+        empty = (None,) * width
+        column_of = {}
+        next_row = 1
+        with self._zf.open(part) as f:
+            for _, row in ET.iterparse(f):
+                if row.tag != _ROW:
+                    continue
+                ref = row.get('r')
+                row_idx = int(ref) if ref else next_row
+                while next_row < row_idx:
+                    yield empty
+                    next_row += 1
+                values = None
+                column = 0
+                for cell in row:
+                    ref = cell.get('r')
+                    if ref:
+                        letters = ref.rstrip(_DIGITS)
+                        column = column_of.get(letters)
+                        if column is None:
+                            column = column_of[letters] = column_index_from_string(letters)
+                    else:
+                        column += 1
+                    position = positions.get(column)
+                    if position is not None:
+                        if values is None:
+                            values = [None] * width
+                        values[position] = self._value(cell)
+                row.clear()
+                yield tuple(values) if values is not None else empty
+                next_row = row_idx + 1
+
+    def close(self):
+        self._zf.close()
+
+
+class OpenpyxlColumnReader:
+    def __init__(self, path, read_only=True):
+        from openpyxl import load_workbook
+
+        # 只读模式逐表解析XML，内存不随工作表数量增长
+        self.read_only = read_only
+        self._wb = load_workbook(path, read_only=read_only, data_only=True)
+        self.sheetnames = self._wb.sheetnames
+
+    def iter_rows(self, sheet_name, columns):
+        indexes = [column_index_from_string(letter) for letter in columns]
+        min_col = min(indexes)
+        offsets = [index - min_col for index in indexes]
+        ws = self._wb[sheet_name]
+        try:
+            for row in ws.iter_rows(min_col=min_col, max_col=max(indexes), values_only=True):
+                yield tuple(row[offset] for offset in offsets)
+        finally:
+            if not self.read_only:
+                # 非只读模式下读完即释放该表的单元格对象
+                self._wb.remove(ws)
+
+    def close(self):
+        self._wb.close()
+
+
+def open_column_reader(path, reader='openpyxl', read_only=True):
+    # reader: 'xml' / 'openpyxl' (options.ie_reader)；read_only 只用于 openpyxl 后端
+    if reader == 'xml':
+        return XlsxColumnReader(path)
+    if reader == 'openpyxl':
+        return OpenpyxlColumnReader(path, read_only)
+    raise ValueError(f"无效的 ie_reader 选项: {reader}")